@@ -3,6 +3,7 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from app.config.config import Config
 from app.middlewares.cors_middleware import init_cors
+from app.workers.avaliacao_worker import init_review_worker
 
 db = SQLAlchemy()
 migrate = Migrate()  
@@ -15,12 +16,18 @@ def create_app():
     migrate.init_app(app, db)
 
     init_cors(app)
+    init_review_worker(app)
 
 
     from app.models.usuario_model import User
     from app.models.empresa_model import Company
+    from app.models.arquivo_model import StoredFile
+    from app.models.upload_model import FinalizedUpload
     from app.models.projeto_model import Project
     from app.models.avaliacao_model import Review
+    from app.models.avaliacao_job_model import ReviewJob
+    from app.models.analise_cache_model import AnalysisCache
+    from app.models.avaliacao_metrica_model import ReviewMetric
 
 
     with app.app_context():
@@ -28,11 +35,17 @@ def create_app():
         from app.routes.empresa_routes import empresa_routes
         from app.routes.projeto_routes import projeto_routes
         from app.routes.avaliacao_routes import avaliacao_routes
+        from app.routes.ia_routes import ia_routes
+        from app.routes.metrics_routes import metrics_routes
+        from app.routes.arquivo_routes import arquivo_routes
 
         app.register_blueprint(usuario_routes)
         app.register_blueprint(empresa_routes)
         app.register_blueprint(projeto_routes)
         app.register_blueprint(avaliacao_routes)
+        app.register_blueprint(ia_routes)
+        app.register_blueprint(metrics_routes)
+        app.register_blueprint(arquivo_routes)
 
     return app
 
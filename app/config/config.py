@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -10,4 +11,81 @@ class Config:
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY')
     FIREBASE_CONFIG = os.getenv('FIREBASE_CONFIG')
     ENCRYPTION_KEY = os.getenv('ENCRYPTION_KEY')
-    DEBUG = os.getenv('FLASK_ENV') == 'development'
\ No newline at end of file
+    DEBUG = os.getenv('FLASK_ENV') == 'development'
+
+    # Integração com a IA
+    LLM_BACKEND = os.getenv('LLM_BACKEND', 'openai')                        # openai | stub
+    LLM_STUB_URL = os.getenv('LLM_STUB_URL', 'http://127.0.0.1:8089')
+    OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-3.5-turbo')
+    IA_CACHE_ENABLED = os.getenv('IA_CACHE_ENABLED', 'true').lower() == 'true'
+    IA_CONTEXT_TOKENS = int(os.getenv('IA_CONTEXT_TOKENS', 16385))           # janela de contexto do modelo
+    IA_MAX_OUTPUT_TOKENS = int(os.getenv('IA_MAX_OUTPUT_TOKENS', 4000))      # tamanho máximo do relatório final
+    IA_CHUNK_TOKENS = int(os.getenv('IA_CHUNK_TOKENS', 6000))                # tamanho dos trechos de documentos longos
+    IA_CHUNK_OUTPUT_TOKENS = int(os.getenv('IA_CHUNK_OUTPUT_TOKENS', 1200))  # resposta de cada análise parcial
+    IA_MAX_CONCURRENCY = int(os.getenv('IA_MAX_CONCURRENCY', 4))             # chamadas simultâneas por avaliação
+    IA_REQUEST_TIMEOUT = float(os.getenv('IA_REQUEST_TIMEOUT', 120))         # segundos por chamada à API
+    IA_RETRY_BASE_DELAY = float(os.getenv('IA_RETRY_BASE_DELAY', 1))         # backoff exponencial: base * 2^tentativa
+    IA_RETRY_MAX_DELAY = float(os.getenv('IA_RETRY_MAX_DELAY', 30))
+    IA_RETRY_MAX_WAIT = float(os.getenv('IA_RETRY_MAX_WAIT', 15))            # espera máxima dentro de uma chamada (só workers da fila)
+    IA_BREAKER_FAILURE_RATE = float(os.getenv('IA_BREAKER_FAILURE_RATE', 0.5))
+    IA_BREAKER_WINDOW = int(os.getenv('IA_BREAKER_WINDOW', 20))
+    IA_BREAKER_MIN_CALLS = int(os.getenv('IA_BREAKER_MIN_CALLS', 5))
+    IA_BREAKER_OPEN_SECONDS = int(os.getenv('IA_BREAKER_OPEN_SECONDS', 60))
+
+    # Extração de texto: mecanismos de PDF tentados em ordem até um deles retornar texto
+    PDF_EXTRACTION_ENGINES = os.getenv('PDF_EXTRACTION_ENGINES', 'pymupdf,pdfplumber,pypdf2')
+    PDF_PARALLEL_MIN_PAGES = int(os.getenv('PDF_PARALLEL_MIN_PAGES', 40))   # abaixo disso a extração é feita em série
+    PDF_EXTRACTION_WORKERS = int(os.getenv('PDF_EXTRACTION_WORKERS', 0))   # processos do pool; 0 = número de CPUs
+    # Sandbox: toda extração roda no pool com limites por tarefa; estourar um limite rejeita o arquivo
+    EXTRACTION_SANDBOX = os.getenv('EXTRACTION_SANDBOX', 'true').lower() == 'true'
+    EXTRACTION_TIMEOUT = int(os.getenv('EXTRACTION_TIMEOUT', 60))              # segundos de relógio por tarefa
+    EXTRACTION_CPU_SECONDS = int(os.getenv('EXTRACTION_CPU_SECONDS', 30))      # segundos de CPU por tarefa
+    EXTRACTION_MEMORY_MB = int(os.getenv('EXTRACTION_MEMORY_MB', 2048))       # espaço de endereçamento por processo
+
+    # Dados sensíveis no upload: 'reject' recusa o arquivo; 'redact' aceita e mascara CPF, CNPJ, e-mail e
+    # inscrições no texto armazenado e enviado à IA (o arquivo original é mantido, mas não é publicado)
+    SENSITIVE_DATA_MODE = os.getenv('SENSITIVE_DATA_MODE', 'reject').lower()
+
+    # Cache do texto extraído, chaveado pelo SHA-256 do arquivo e pela versão do extrator (0 desativa o nível)
+    EXTRACTION_CACHE_DIR = os.getenv('EXTRACTION_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'softex-extraction-cache'))
+    EXTRACTION_CACHE_MAX_BYTES = int(os.getenv('EXTRACTION_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+    EXTRACTION_CACHE_MEMORY_BYTES = int(os.getenv('EXTRACTION_CACHE_MEMORY_BYTES', 32 * 1024 * 1024))
+
+    # Armazenamento dos arquivos de projetos: firebase | local (disco) | memory (processo, para testes)
+    STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'firebase').lower()
+    LOCAL_STORAGE_DIR = os.getenv('LOCAL_STORAGE_DIR', os.path.join(tempfile.gettempdir(), 'softex-storage'))
+    STORAGE_PUBLIC_URL = os.getenv('STORAGE_PUBLIC_URL', 'http://127.0.0.1:5000')   # base das URLs de /files (local e memory)
+
+    # Conexões HTTP reaproveitadas pelo cliente de storage do Firebase
+    FIREBASE_POOL_SIZE = int(os.getenv('FIREBASE_POOL_SIZE', 10))
+    # Tamanho de cada bloco do upload resumível (múltiplo de 256 KB exigido pelo storage)
+    FIREBASE_UPLOAD_CHUNK_SIZE = max(1, int(os.getenv('FIREBASE_UPLOAD_CHUNK_SIZE', 8 * 1024 * 1024)) // (256 * 1024)) * 256 * 1024
+    # Upload direto ao bucket por URL assinada, finalizado depois em POST /projects/uploads/finalize
+    UPLOAD_URL_EXPIRATION = int(os.getenv('UPLOAD_URL_EXPIRATION', 15))              # minutos de validade da URL e do token
+    UPLOAD_MAX_BYTES = int(os.getenv('UPLOAD_MAX_BYTES', 50 * 1024 * 1024))          # tamanho máximo aceito pelo bucket
+    UPLOAD_PREFIX = os.getenv('UPLOAD_PREFIX', 'uploads')                            # pasta dos arquivos enviados pelo cliente
+    # Arquivos de projetos, armazenados uma única vez por conteúdo em FILES_PREFIX/<sha256>.<extensão>
+    FILES_PREFIX = os.getenv('FILES_PREFIX', 'arquivos')
+    # Quarentena: o arquivo é enviado (privado) enquanto é validado e só então promovido ou removido
+    QUARANTINE_PREFIX = os.getenv('QUARANTINE_PREFIX', 'quarentena')
+    UPLOAD_WORKERS = int(os.getenv('UPLOAD_WORKERS', 4))                             # envios simultâneos à quarentena por processo
+    UPLOAD_SPOOL_MAX_MEMORY = int(os.getenv('UPLOAD_SPOOL_MAX_MEMORY', 1024 * 1024))  # bytes do arquivo recebido mantidos em memória antes de ir para o disco
+
+    # Cache local dos arquivos de projetos baixados do storage
+    BLOB_CACHE_DIR = os.getenv('BLOB_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'softex-blob-cache'))
+    BLOB_CACHE_MAX_BYTES = int(os.getenv('BLOB_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+    BLOB_CACHE_CONNECT_TIMEOUT = float(os.getenv('BLOB_CACHE_CONNECT_TIMEOUT', 5))
+    BLOB_CACHE_READ_TIMEOUT = float(os.getenv('BLOB_CACHE_READ_TIMEOUT', 30))
+    BLOB_CACHE_POOL_SIZE = int(os.getenv('BLOB_CACHE_POOL_SIZE', 10))      # conexões reaproveitadas por host
+
+    # Fila de avaliações assíncronas (flask review-worker)
+    REVIEW_WORKERS = int(os.getenv('REVIEW_WORKERS', 2))
+    REVIEW_JOB_POLL_INTERVAL = float(os.getenv('REVIEW_JOB_POLL_INTERVAL', 2))
+    REVIEW_JOB_MAX_ATTEMPTS = int(os.getenv('REVIEW_JOB_MAX_ATTEMPTS', 3))
+    REVIEW_JOB_RETRY_DELAY = int(os.getenv('REVIEW_JOB_RETRY_DELAY', 60))        # segundos, dobra a cada tentativa
+    REVIEW_JOB_LEASE_SECONDS = int(os.getenv('REVIEW_JOB_LEASE_SECONDS', 900))   # job sem heartbeat volta para a fila
+    REVIEW_JOB_HEARTBEAT_SECONDS = int(os.getenv('REVIEW_JOB_HEARTBEAT_SECONDS', 60))  # intervalo de renovação do lease, menor que o lease
+
+    # Avaliação em lote (POST /reviews/batch)
+    REVIEW_BATCH_CONCURRENCY = int(os.getenv('REVIEW_BATCH_CONCURRENCY', 4))
+    REVIEW_BATCH_MAX_SIZE = int(os.getenv('REVIEW_BATCH_MAX_SIZE', 50))
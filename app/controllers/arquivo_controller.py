@@ -0,0 +1,79 @@
+import logging
+import os
+from datetime import datetime
+from io import BytesIO
+from flask import request, send_file
+from app.services.storage_backend import get_storage_backend
+from app.utils.jwt_manager import JWTManager
+from app.erros.error_handler import ErrorHandler
+from app.erros.custom_errors import NotFoundError, ValidationError, UnauthorizedError, InvalidTokenError
+
+logger = logging.getLogger(__name__)
+
+class FileController:
+    """Serve os arquivos dos backends de armazenamento local e em memória (STORAGE_BACKEND=local|memory)."""
+
+    @staticmethod
+    def _public_meta(storage, file_name):
+        meta = storage.stat(file_name) if storage.serves_files else None
+        if not meta or not meta.get("public"):
+            raise NotFoundError(resource="Arquivo", message="Arquivo não encontrado.")
+        return meta
+
+    @staticmethod
+    def get(file_name):
+        """Retorna o arquivo com ETag e Last-Modified; requisições condicionais recebem 304."""
+        try:
+            storage = get_storage_backend()
+            meta = FileController._public_meta(storage, file_name)
+            return send_file(
+                storage.open_file(file_name),
+                mimetype=meta.get("content_type") or "application/octet-stream",
+                download_name=os.path.basename(file_name),
+                conditional=True,
+                etag=meta["etag"],
+                last_modified=datetime.fromisoformat(meta["atualizado_em"]),
+                max_age=0
+            )
+        except ValidationError as e:
+            return ErrorHandler.handle_validation_error(e)
+        except (NotFoundError, FileNotFoundError) as e:
+            if isinstance(e, FileNotFoundError):
+                e = NotFoundError(resource="Arquivo", message="Arquivo não encontrado.")
+            return ErrorHandler.handle_not_found_error(e)
+        except Exception as e:
+            logger.error(f"Erro inesperado ao servir o arquivo {file_name}.", exc_info=True)
+            return ErrorHandler.handle_generic_exception(e)
+
+
+    @staticmethod
+    def put(file_name):
+        """Recebe o arquivo enviado com a URL de upload direto (token de upload no lugar da assinatura)."""
+        try:
+            storage = get_storage_backend()
+            if not storage.serves_files:
+                raise NotFoundError(resource="Arquivo", message="Upload direto indisponível neste armazenamento.")
+
+            # só o token da URL de upload (audiência própria) é aceito, não o de finalização
+            upload = JWTManager.decode_upload_token(request.args.get("token", ""), audience=JWTManager.UPLOAD_PUT_AUDIENCE)
+            if upload.get("objeto") != file_name:
+                raise UnauthorizedError(action="enviar arquivo", message="O token não corresponde a este arquivo.")
+
+            max_bytes = upload["tamanho_maximo"]
+            content = request.stream.read(max_bytes + 1)
+            if len(content) > max_bytes:
+                raise ValidationError(field="arquivo", message="O arquivo excede o tamanho máximo permitido.")
+
+            storage.upload_stream(BytesIO(content), file_name, content_type=request.mimetype or None, public=False)
+            return '', 200
+        except ValidationError as e:
+            return ErrorHandler.handle_validation_error(e)
+        except NotFoundError as e:
+            return ErrorHandler.handle_not_found_error(e)
+        except UnauthorizedError as e:
+            return ErrorHandler.handle_unauthorized_error(e)
+        except InvalidTokenError as e:
+            return ErrorHandler.handle_invalid_token_error(e)
+        except Exception as e:
+            logger.error(f"Erro inesperado ao receber o arquivo {file_name}.", exc_info=True)
+            return ErrorHandler.handle_generic_exception(e)
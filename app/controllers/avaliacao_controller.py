@@ -1,8 +1,9 @@
 import logging
-from flask import request, jsonify
+from flask import request, jsonify, Response, stream_with_context
 from app.services.avaliacao_service import ReviewService
+from app.services.avaliacao_job_service import ReviewJobService
 from app.erros.error_handler import ErrorHandler
-from app.erros.custom_errors import NotFoundError, ValidationError, ConflictError, ExternalAPIError
+from app.erros.custom_errors import NotFoundError, ValidationError, ConflictError, ExternalAPIError, InternalServerError
 
 logger = logging.getLogger(__name__)
 
@@ -42,9 +43,9 @@ class ReviewController:
             data = request.get_json()
             if not data or not isinstance(data, dict):
                 raise ValidationError(field="data", message="Dados de entrada inválidos.")
-            avaliacao = ReviewService().create(data)
-            logger.info("Avaliação criada com sucesso.")
-            return jsonify(avaliacao.to_dict()), 201
+            job = ReviewJobService().enqueue(data)
+            logger.info(f"Avaliação enfileirada no job {job.id}.")
+            return jsonify(job.to_dict()), 202, {"Location": f"/reviews/jobs/{job.id}"}
         except NotFoundError as e:
             return ErrorHandler.handle_not_found_error(e)
         except ValidationError as e:
@@ -57,6 +58,79 @@ class ReviewController:
             logger.error("Erro inesperado ao criar avaliação.", exc_info=True)
             return ErrorHandler.handle_generic_exception(e)
 
+    @staticmethod
+    def create_batch():
+        try:
+            data = request.get_json()
+            if not data or not isinstance(data, dict):
+                raise ValidationError(field="data", message="Dados de entrada inválidos.")
+            resultados = ReviewService().create_batch(data)
+            resumo = {}
+            for resultado in resultados:
+                resumo[resultado["status"]] = resumo.get(resultado["status"], 0) + 1
+            logger.info(f"Lote de avaliações processado: {resumo}.")
+            return jsonify({"resumo": resumo, "resultados": resultados}), 200
+        except ValidationError as e:
+            return ErrorHandler.handle_validation_error(e)
+        except Exception as e:
+            logger.error("Erro inesperado ao criar avaliações em lote.", exc_info=True)
+            return ErrorHandler.handle_generic_exception(e)
+
+    @staticmethod
+    def get_job(id):
+        try:
+            if not id:
+                return ErrorHandler.handle_validation_error(
+                    ValidationError(field="id", message="ID inválido.")
+                )
+
+            job = ReviewJobService().get_by_id(str(id))
+            return jsonify(job.to_dict()), 200
+        except ValidationError as e:
+            return ErrorHandler.handle_validation_error(e)
+        except NotFoundError as e:
+            return ErrorHandler.handle_not_found_error(e)
+        except Exception as e:
+            logger.error(f"Erro inesperado ao buscar job de avaliação {id}.", exc_info=True)
+            return ErrorHandler.handle_generic_exception(e)
+
+    @staticmethod
+    def get_metrics():
+        try:
+            resumo = ReviewService().get_metrics(request.args.get("dias", 30))
+            return jsonify(resumo), 200
+        except ValidationError as e:
+            return ErrorHandler.handle_validation_error(e)
+        except InternalServerError as e:
+            return ErrorHandler.handle_internal_server_error(e)
+        except Exception as e:
+            logger.error("Erro inesperado ao buscar métricas das avaliações.", exc_info=True)
+            return ErrorHandler.handle_generic_exception(e)
+
+    @staticmethod
+    def stream(projeto_id):
+        try:
+            if not projeto_id:
+                return ErrorHandler.handle_validation_error(
+                    ValidationError(field="projeto_id", message="ID inválido.")
+                )
+
+            eventos = ReviewService().stream(str(projeto_id))
+            return Response(
+                stream_with_context(eventos),
+                mimetype="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
+        except NotFoundError as e:
+            return ErrorHandler.handle_not_found_error(e)
+        except ValidationError as e:
+            return ErrorHandler.handle_validation_error(e)
+        except ConflictError as e:
+            return ErrorHandler.handle_conflict_error(e)
+        except Exception as e:
+            logger.error(f"Erro inesperado ao iniciar avaliação em streaming do projeto {projeto_id}.", exc_info=True)
+            return ErrorHandler.handle_generic_exception(e)
+
     @staticmethod
     def update(id):
         try:
@@ -0,0 +1,48 @@
+import logging
+from flask import request, jsonify
+from app.services.analise_cache_service import AnalysisCacheService
+from app.erros.error_handler import ErrorHandler
+from app.erros.custom_errors import NotFoundError, ValidationError, InternalServerError
+
+logger = logging.getLogger(__name__)
+
+class IaController:
+    @staticmethod
+    def get_cache_stats():
+        try:
+            stats = AnalysisCacheService().stats()
+            return jsonify(stats), 200
+        except InternalServerError as e:
+            return ErrorHandler.handle_internal_server_error(e)
+        except Exception as e:
+            logger.error("Erro inesperado ao buscar estatísticas do cache.", exc_info=True)
+            return ErrorHandler.handle_generic_exception(e)
+
+    @staticmethod
+    def invalidate_cache():
+        try:
+            modelo = request.args.get("modelo")
+            removidas = AnalysisCacheService().invalidate(modelo=modelo)
+            logger.info(f"Cache de análises invalidado ({removidas} entradas).")
+            return jsonify({"removidas": removidas}), 200
+        except InternalServerError as e:
+            return ErrorHandler.handle_internal_server_error(e)
+        except Exception as e:
+            logger.error("Erro inesperado ao invalidar o cache de análises.", exc_info=True)
+            return ErrorHandler.handle_generic_exception(e)
+
+    @staticmethod
+    def invalidate_cache_entry(chave):
+        try:
+            AnalysisCacheService().invalidate(chave=chave)
+            logger.info(f"Análise em cache {chave} invalidada.")
+            return '', 204
+        except ValidationError as e:
+            return ErrorHandler.handle_validation_error(e)
+        except NotFoundError as e:
+            return ErrorHandler.handle_not_found_error(e)
+        except InternalServerError as e:
+            return ErrorHandler.handle_internal_server_error(e)
+        except Exception as e:
+            logger.error(f"Erro inesperado ao invalidar a análise em cache {chave}.", exc_info=True)
+            return ErrorHandler.handle_generic_exception(e)
@@ -0,0 +1,26 @@
+import logging
+from flask import jsonify
+from app.services.ia_service import openai_circuit_breaker, project_file_cache
+from app.utils.text_extractor import extraction_cache
+from app.services.analise_cache_service import AnalysisCacheService
+from app.erros.error_handler import ErrorHandler
+from app.erros.custom_errors import InternalServerError
+
+logger = logging.getLogger(__name__)
+
+class MetricsController:
+    @staticmethod
+    def get_all():
+        try:
+            metricas = {
+                "openai_circuit_breaker": openai_circuit_breaker.snapshot(),
+                "cache_analises": AnalysisCacheService().stats(),
+                "cache_arquivos": project_file_cache.stats(),
+                "cache_extracao": extraction_cache.stats()
+            }
+            return jsonify(metricas), 200
+        except InternalServerError as e:
+            return ErrorHandler.handle_internal_server_error(e)
+        except Exception as e:
+            logger.error("Erro inesperado ao coletar métricas.", exc_info=True)
+            return ErrorHandler.handle_generic_exception(e)
@@ -2,7 +2,9 @@ import logging
 from flask import request, jsonify
 from app.services.projeto_service import ProjectService
 from app.erros.error_handler import ErrorHandler
-from app.erros.custom_errors import NotFoundError, ValidationError, ConflictError, InternalServerError, ExternalAPIError
+from app.erros.custom_errors import (
+    NotFoundError, ValidationError, ConflictError, InternalServerError, ExternalAPIError, UnauthorizedError, InvalidTokenError
+)
 
 logger = logging.getLogger(__name__)
 
@@ -63,6 +65,51 @@ class ProjectController:
             return ErrorHandler.handle_generic_exception(e)
 
 
+    @staticmethod
+    def create_upload():
+        try:
+            data = request.get_json(silent=True) or {}
+            nome_arquivo = data.get("nome_arquivo")
+            if not nome_arquivo:
+                raise ValidationError(field="nome_arquivo", message="Nome do arquivo é obrigatório.")
+
+            upload = ProjectService().create_upload(nome_arquivo, request.user.id)
+            return jsonify(upload), 201
+        except ValidationError as e:
+            return ErrorHandler.handle_validation_error(e)
+        except ExternalAPIError as e:
+            return ErrorHandler.handle_external_api_error(e)
+        except Exception as e:
+            logger.error("Erro inesperado ao autorizar upload.", exc_info=True)
+            return ErrorHandler.handle_generic_exception(e)
+
+
+    @staticmethod
+    def finalize_upload():
+        try:
+            data = request.get_json(silent=True) or request.form.to_dict()
+            upload_token = data.pop("upload_token", None)
+            if not upload_token:
+                raise ValidationError(field="upload_token", message="Token de upload é obrigatório.")
+
+            projeto = ProjectService().finalize_upload(data, upload_token, request.user.id)
+            logger.info("Projeto criado com sucesso a partir de upload direto.")
+            return jsonify(projeto.to_dict()), 201
+        except ValidationError as e:
+            return ErrorHandler.handle_validation_error(e)
+        except UnauthorizedError as e:
+            return ErrorHandler.handle_unauthorized_error(e)
+        except InvalidTokenError as e:
+            return ErrorHandler.handle_invalid_token_error(e)
+        except ExternalAPIError as e:
+            return ErrorHandler.handle_external_api_error(e)
+        except ConflictError as e:
+            return ErrorHandler.handle_conflict_error(e)
+        except Exception as e:
+            logger.error("Erro inesperado ao finalizar upload.", exc_info=True)
+            return ErrorHandler.handle_generic_exception(e)
+
+
     @staticmethod
     def update(id):
         try:
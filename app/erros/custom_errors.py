@@ -31,8 +31,10 @@ class UnauthorizedError(AppError):
 
 class ExternalAPIError(AppError):
     """Erro para falhas em chamadas de APIs externas."""
-    def __init__(self, service, message="Failed to connect to external service"):
+    def __init__(self, service, message="Failed to connect to external service", retry_after=None, retryable=True):
         self.service = service
+        self.retry_after = retry_after  # segundos sugeridos antes de nova tentativa, quando conhecidos
+        self.retryable = retryable  # False quando repetir a chamada não adianta (requisição inválida, credenciais)
         self.message = f"{message}: {service}"
         super().__init__(self.message)
 
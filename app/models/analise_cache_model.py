@@ -0,0 +1,39 @@
+from app import db
+from sqlalchemy.sql import func
+
+
+class AnalysisCache(db.Model):
+    __tablename__ = 'analises_cache'
+
+    # sha256(texto_hash + modelo + pontos_hash + hash da configuração do prompt)
+    chave = db.Column(db.String(64), primary_key=True)
+    texto_hash = db.Column(db.String(64), nullable=False, index=True)
+    modelo = db.Column(db.String(100), nullable=False)
+    pontos_hash = db.Column(db.String(64), nullable=False)
+    feedback_qualitativo = db.Column(db.Text, nullable=False)
+    hits = db.Column(db.Integer, nullable=False, server_default='0')
+    data_criacao = db.Column(db.TIMESTAMP, server_default=func.now())
+    ultimo_acesso = db.Column(db.TIMESTAMP, server_default=func.now())
+
+    def to_dict(self):
+        return {
+            "chave": self.chave,
+            "texto_hash": self.texto_hash,
+            "modelo": self.modelo,
+            "pontos_hash": self.pontos_hash,
+            "hits": self.hits,
+            "data_criacao": self.data_criacao.isoformat() if self.data_criacao else None,
+            "ultimo_acesso": self.ultimo_acesso.isoformat() if self.ultimo_acesso else None
+        }
+
+
+    def __init__(self, chave, texto_hash, modelo, pontos_hash, feedback_qualitativo):
+        self.chave = chave
+        self.texto_hash = texto_hash
+        self.modelo = modelo
+        self.pontos_hash = pontos_hash
+        self.feedback_qualitativo = feedback_qualitativo
+        self.hits = 0
+
+    def __repr__(self):
+        return f'<AnalysisCache: {self.chave[:12]}..., Modelo: {self.modelo}, Hits: {self.hits}>'
@@ -0,0 +1,36 @@
+from app import db
+from sqlalchemy.sql import func
+
+
+class StoredFile(db.Model):
+    __tablename__ = 'arquivos'
+
+    # SHA-256 do conteúdo: arquivos idênticos são armazenados uma única vez no bucket
+    digest = db.Column(db.String(64), primary_key=True)
+    caminho = db.Column(db.String(500), nullable=False)
+    tamanho = db.Column(db.BigInteger, nullable=False)
+    content_type = db.Column(db.String(255))
+    # projetos que usam o arquivo; ao chegar a zero o objeto é removido do bucket
+    referencias = db.Column(db.Integer, nullable=False, server_default='0')
+    data_criacao = db.Column(db.TIMESTAMP, server_default=func.now())
+
+    def to_dict(self):
+        return {
+            "digest": self.digest,
+            "caminho": self.caminho,
+            "tamanho": self.tamanho,
+            "content_type": self.content_type,
+            "referencias": self.referencias,
+            "data_criacao": self.data_criacao.isoformat() if self.data_criacao else None
+        }
+
+
+    def __init__(self, digest, caminho, tamanho, content_type=None):
+        self.digest = digest
+        self.caminho = caminho
+        self.tamanho = tamanho
+        self.content_type = content_type
+        self.referencias = 0
+
+    def __repr__(self):
+        return f'<StoredFile: {self.digest[:12]}..., Referências: {self.referencias}>'
@@ -0,0 +1,71 @@
+from app import db
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import CheckConstraint, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+import uuid
+
+
+class ReviewJob(db.Model):
+    __tablename__ = 'avaliacao_jobs'
+
+    id = db.Column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+        server_default=db.text("gen_random_uuid()")
+    )
+    projeto_id = db.Column(UUID(as_uuid=True), ForeignKey('projetos.id', ondelete='CASCADE'), nullable=False)
+    avaliacao_id = db.Column(UUID(as_uuid=True), ForeignKey('avaliacoes.id', ondelete='SET NULL'))
+    status = db.Column(
+        db.Enum('pendente', 'processando', 'concluido', 'erro', name='status_avaliacao_job'),
+        nullable=False,
+        server_default='pendente'
+    )
+    etapa = db.Column(db.String(100), nullable=False, server_default='na fila')
+    progresso = db.Column(db.Integer, nullable=False, server_default='0')
+    tentativas = db.Column(db.Integer, nullable=False, server_default='0')
+    erro = db.Column(db.Text)
+    disponivel_em = db.Column(db.TIMESTAMP, nullable=False, server_default=func.now())  # só pode ser reivindicado após este instante
+    data_criacao = db.Column(db.TIMESTAMP, server_default=func.now())
+    data_atualizacao = db.Column(db.TIMESTAMP, server_default=func.now(), onupdate=func.now())  # também serve de heartbeat do worker
+
+    # Relacionamentos
+    projeto = relationship('Project')
+    avaliacao = relationship('Review')
+
+    __table_args__ = (
+        CheckConstraint("status IN ('pendente', 'processando', 'concluido', 'erro')", name='check_status_job'),
+        Index('ix_avaliacao_jobs_status_disponivel_em', 'status', 'disponivel_em'),
+        Index('ix_avaliacao_jobs_projeto_id', 'projeto_id'),
+        # no máximo um job pendente ou em processamento por projeto (enfileiramentos simultâneos)
+        Index(
+            'uq_avaliacao_jobs_projeto_ativo', 'projeto_id', unique=True,
+            postgresql_where=db.text("status IN ('pendente', 'processando')")
+        ),
+    )
+
+    def to_dict(self):
+        return {
+            "id": str(self.id),
+            "projeto_id": str(self.projeto_id),
+            "avaliacao_id": str(self.avaliacao_id) if self.avaliacao_id else None,
+            "status": self.status,
+            "etapa": self.etapa,
+            "progresso": self.progresso,
+            "tentativas": self.tentativas,
+            "erro": self.erro,
+            "data_criacao": self.data_criacao.isoformat() if self.data_criacao else None,
+            "data_atualizacao": self.data_atualizacao.isoformat() if self.data_atualizacao else None
+        }
+
+
+    def __init__(self, projeto_id):
+        self.projeto_id = projeto_id
+        self.status = 'pendente'
+        self.etapa = 'na fila'
+        self.progresso = 0
+        self.tentativas = 0
+
+    def __repr__(self):
+        return f'<ReviewJob: Projeto ID {self.projeto_id}, Status: {self.status}>'
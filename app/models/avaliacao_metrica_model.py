@@ -0,0 +1,79 @@
+from app import db
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import ForeignKey, Index
+from sqlalchemy.sql import func
+import uuid
+
+
+class ReviewMetric(db.Model):
+    __tablename__ = 'avaliacao_metricas'
+
+    id = db.Column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+        server_default=db.text("gen_random_uuid()")
+    )
+    # mantidas após a remoção do projeto/avaliação para não distorcer o histórico de custos
+    projeto_id = db.Column(UUID(as_uuid=True), ForeignKey('projetos.id', ondelete='SET NULL'))
+    avaliacao_id = db.Column(UUID(as_uuid=True), ForeignKey('avaliacoes.id', ondelete='SET NULL'))
+    origem = db.Column(db.String(20), nullable=False)  # job, lote ou stream
+    modelo = db.Column(db.String(100), nullable=False)
+    backend = db.Column(db.String(50), nullable=False)
+    sucesso = db.Column(db.Boolean, nullable=False)
+    erro = db.Column(db.String(100))  # tipo do erro, quando a avaliação falhou
+    prompt_tokens = db.Column(db.Integer, nullable=False, server_default='0')
+    completion_tokens = db.Column(db.Integer, nullable=False, server_default='0')
+    tokens_estimados = db.Column(db.Boolean, nullable=False, server_default='false')  # streaming não informa o uso
+    chamadas_llm = db.Column(db.Integer, nullable=False, server_default='0')
+    retentativas = db.Column(db.Integer, nullable=False, server_default='0')
+    cache_hit = db.Column(db.Boolean, nullable=False, server_default='false')
+    texto_armazenado = db.Column(db.Boolean, nullable=False, server_default='false')
+    tempo_download_ms = db.Column(db.Integer, nullable=False, server_default='0')
+    tempo_extracao_ms = db.Column(db.Integer, nullable=False, server_default='0')
+    tempo_llm_ms = db.Column(db.Integer, nullable=False, server_default='0')
+    tempo_total_ms = db.Column(db.Integer, nullable=False, server_default='0')
+    data_criacao = db.Column(db.TIMESTAMP, server_default=func.now())
+
+    __table_args__ = (
+        Index('ix_avaliacao_metricas_data_criacao', 'data_criacao'),
+    )
+
+    def to_dict(self):
+        return {
+            "id": str(self.id),
+            "projeto_id": str(self.projeto_id) if self.projeto_id else None,
+            "avaliacao_id": str(self.avaliacao_id) if self.avaliacao_id else None,
+            "origem": self.origem,
+            "modelo": self.modelo,
+            "backend": self.backend,
+            "sucesso": self.sucesso,
+            "erro": self.erro,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "tokens_estimados": self.tokens_estimados,
+            "chamadas_llm": self.chamadas_llm,
+            "retentativas": self.retentativas,
+            "cache_hit": self.cache_hit,
+            "texto_armazenado": self.texto_armazenado,
+            "tempo_download_ms": self.tempo_download_ms,
+            "tempo_extracao_ms": self.tempo_extracao_ms,
+            "tempo_llm_ms": self.tempo_llm_ms,
+            "tempo_total_ms": self.tempo_total_ms,
+            "data_criacao": self.data_criacao.isoformat() if self.data_criacao else None
+        }
+
+
+    def __init__(self, origem, modelo, backend, sucesso, projeto_id=None, avaliacao_id=None, erro=None, **medidas):
+        self.origem = origem
+        self.modelo = modelo
+        self.backend = backend
+        self.sucesso = sucesso
+        self.projeto_id = projeto_id
+        self.avaliacao_id = avaliacao_id
+        self.erro = erro
+        for campo, valor in medidas.items():
+            setattr(self, campo, valor)
+
+    def __repr__(self):
+        return f'<ReviewMetric: Projeto ID {self.projeto_id}, Origem: {self.origem}, Sucesso: {self.sucesso}>'
@@ -1,6 +1,6 @@
 from app import db
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy import CheckConstraint, ForeignKey
 from sqlalchemy.sql import func
 import uuid
@@ -19,6 +19,10 @@ class Project(db.Model):
     data_submissao = db.Column(db.TIMESTAMP, server_default=func.now())
     status = db.Column(db.Enum('em avaliação', 'aprovado', 'reprovado', name='status_projeto'), nullable=False)
     arquivo = db.Column(db.String(500), nullable=False)
+    # conteúdo do arquivo no storage (tabela arquivos); nulo nos projetos anteriores ao armazenamento por conteúdo
+    arquivo_digest = db.Column(db.String(64), ForeignKey('arquivos.digest'), index=True)
+    # texto extraído e validado no upload; carregado sob demanda para não pesar nas listagens
+    texto_extraido = deferred(db.Column(db.Text))
 
     # Foreign keys
     avaliador_id = db.Column(UUID(as_uuid=True), ForeignKey('usuarios.id', ondelete='SET NULL'))
@@ -52,10 +56,12 @@ class Project(db.Model):
         }
 
 
-    def __init__(self, titulo_projeto, status, arquivo, avaliador_id, empresa_id):
+    def __init__(self, titulo_projeto, status, arquivo, avaliador_id, empresa_id, texto_extraido=None, arquivo_digest=None):
         self.titulo_projeto = titulo_projeto.lower()
         self.status = status.lower()
         self.arquivo = arquivo
+        self.arquivo_digest = arquivo_digest
+        self.texto_extraido = texto_extraido
         self.avaliador_id = avaliador_id
         self.empresa_id = empresa_id
 
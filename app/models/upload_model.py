@@ -0,0 +1,23 @@
+from app import db
+from sqlalchemy.sql import func
+
+
+class FinalizedUpload(db.Model):
+    __tablename__ = 'uploads_finalizados'
+
+    # caminho do upload direto no bucket: cada token de upload só pode ser finalizado uma vez
+    objeto = db.Column(db.String(500), primary_key=True)
+    data_criacao = db.Column(db.TIMESTAMP, server_default=func.now())
+
+    def to_dict(self):
+        return {
+            "objeto": self.objeto,
+            "data_criacao": self.data_criacao.isoformat() if self.data_criacao else None
+        }
+
+
+    def __init__(self, objeto):
+        self.objeto = objeto
+
+    def __repr__(self):
+        return f'<FinalizedUpload: {self.objeto}>'
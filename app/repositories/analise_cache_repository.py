@@ -0,0 +1,91 @@
+import logging
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.sql import func
+from app.models.analise_cache_model import AnalysisCache
+from app import db
+from app.erros.custom_errors import NotFoundError, InternalServerError
+
+logger = logging.getLogger("AnalysisCacheRepository")
+
+class AnalysisCacheRepository:
+    """Repositório para o cache persistente de análises da IA"""
+
+    # Retorna a entrada do cache pela chave, ou None.
+    @staticmethod
+    def get(chave):
+        try:
+            return db.session.get(AnalysisCache, chave)
+        except SQLAlchemyError as e:
+            logger.error(f"Erro ao buscar análise em cache {chave}: {e}")
+            raise InternalServerError(message="Erro ao buscar análise em cache.")
+
+    # Incrementa o contador de hits da entrada de forma atômica.
+    @staticmethod
+    def register_hit(chave):
+        try:
+            db.session.query(AnalysisCache).filter_by(chave=chave).update(
+                {AnalysisCache.hits: AnalysisCache.hits + 1, AnalysisCache.ultimo_acesso: func.now()},
+                synchronize_session=False
+            )
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logger.error(f"Erro ao registrar hit da análise em cache {chave}: {e}")
+            raise InternalServerError(message="Erro ao atualizar análise em cache.")
+
+    # Grava uma análise; se outro worker já gravou a mesma chave, mantém a existente.
+    @staticmethod
+    def save(data):
+        try:
+            db.session.execute(
+                insert(AnalysisCache).values(**data).on_conflict_do_nothing(index_elements=['chave'])
+            )
+            db.session.commit()
+            logger.info(f"Análise armazenada em cache: {data['chave']}")
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logger.error(f"Erro ao armazenar análise em cache: {e}")
+            raise InternalServerError(message="Erro ao armazenar análise em cache.")
+
+    # Retorna o total de entradas e a soma dos hits persistidos.
+    @staticmethod
+    def stats():
+        try:
+            entradas, hits = db.session.query(
+                func.count(AnalysisCache.chave), func.coalesce(func.sum(AnalysisCache.hits), 0)
+            ).one()
+            return {"entradas": entradas, "hits_persistidos": int(hits)}
+        except SQLAlchemyError as e:
+            logger.error(f"Erro ao calcular estatísticas do cache de análises: {e}")
+            raise InternalServerError(message="Erro ao buscar estatísticas do cache.")
+
+    # Remove uma entrada específica do cache.
+    @staticmethod
+    def delete(chave):
+        try:
+            removidas = db.session.query(AnalysisCache).filter_by(chave=chave).delete(synchronize_session=False)
+            if not removidas:
+                raise NotFoundError(resource="Análise em cache", message="Análise em cache não encontrada.")
+            db.session.commit()
+            logger.info(f"Análise em cache {chave} invalidada.")
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logger.error(f"Erro ao invalidar análise em cache {chave}: {e}")
+            raise InternalServerError(message="Erro ao invalidar análise em cache.")
+
+    # Remove todas as entradas (opcionalmente apenas de um modelo) e retorna a quantidade removida.
+    @staticmethod
+    def delete_all(modelo=None):
+        try:
+            query = db.session.query(AnalysisCache)
+            if modelo:
+                query = query.filter_by(modelo=modelo)
+            removidas = query.delete(synchronize_session=False)
+            db.session.commit()
+            logger.info(f"{removidas} análises removidas do cache.")
+            return removidas
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logger.error(f"Erro ao limpar o cache de análises: {e}")
+            raise InternalServerError(message="Erro ao limpar o cache de análises.")
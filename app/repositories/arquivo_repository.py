@@ -0,0 +1,52 @@
+import logging
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from app.models.arquivo_model import StoredFile
+from app import db
+from app.erros.custom_errors import InternalServerError
+
+logger = logging.getLogger("StoredFileRepository")
+
+class StoredFileRepository:
+    """Repositório da contagem de referências dos arquivos armazenados por conteúdo"""
+
+    # Registra uma nova referência ao arquivo (criando a entrada se preciso) e retorna o caminho no bucket.
+    @staticmethod
+    def acquire(digest, caminho, tamanho, content_type=None):
+        try:
+            caminho = db.session.execute(
+                insert(StoredFile)
+                .values(digest=digest, caminho=caminho, tamanho=tamanho, content_type=content_type, referencias=1)
+                .on_conflict_do_update(index_elements=['digest'], set_={'referencias': StoredFile.referencias + 1})
+                .returning(StoredFile.caminho)
+            ).scalar_one()
+            db.session.commit()
+            return caminho
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logger.error(f"Erro ao registrar referência ao arquivo {digest}: {e}")
+            raise InternalServerError(message="Erro ao registrar o arquivo.")
+
+    # Remove uma referência; na última, chama `remove_blob(caminho)` com a linha ainda bloqueada, de modo
+    # que um novo upload do mesmo conteúdo espera a remoção terminar e envia o arquivo de novo.
+    @staticmethod
+    def release(digest, remove_blob):
+        try:
+            arquivo = db.session.query(StoredFile).filter_by(digest=digest).with_for_update().first()
+            if not arquivo:
+                logger.warning(f"Arquivo {digest} não encontrado ao liberar referência.")
+                db.session.rollback()
+                return
+            arquivo.referencias -= 1
+            if arquivo.referencias <= 0:
+                remove_blob(arquivo.caminho)
+                db.session.delete(arquivo)
+                logger.info(f"Arquivo {digest} sem referências removido.")
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logger.error(f"Erro ao liberar referência ao arquivo {digest}: {e}")
+            raise InternalServerError(message="Erro ao liberar o arquivo.")
+        except Exception:
+            db.session.rollback()
+            raise
@@ -0,0 +1,156 @@
+import logging
+from datetime import timedelta
+from sqlalchemy import and_, or_, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+from sqlalchemy.sql import func
+from app.models.avaliacao_job_model import ReviewJob
+from app import db
+from app.erros.custom_errors import NotFoundError, ConflictError, InternalServerError
+
+logger = logging.getLogger("ReviewJobRepository")
+
+class ReviewJobRepository:
+    """Repositório para a fila de jobs de avaliação (tabela avaliacao_jobs)"""
+
+    # Retorna um job específico pelo ID.
+    @staticmethod
+    def get_by_id(id):
+        try:
+            job = db.session.query(ReviewJob).filter_by(id=id).first()
+            if not job:
+                logger.warning(f"Job de avaliação com ID {id} não encontrado.")
+                raise NotFoundError(resource="Job de avaliação", message="Job de avaliação não encontrado.")
+            return job
+        except SQLAlchemyError as e:
+            logger.error(f"Erro ao buscar job de avaliação com ID {id}: {e}")
+            raise InternalServerError(message="Erro ao buscar job de avaliação pelo ID.")
+
+    # Retorna o job pendente ou em processamento de um projeto, se existir.
+    @staticmethod
+    def get_active_by_projeto(projeto_id):
+        try:
+            return db.session.query(ReviewJob).filter(
+                ReviewJob.projeto_id == projeto_id,
+                ReviewJob.status.in_(('pendente', 'processando'))
+            ).first()
+        except SQLAlchemyError as e:
+            logger.error(f"Erro ao buscar job ativo do projeto {projeto_id}: {e}")
+            raise InternalServerError(message="Erro ao buscar job de avaliação do projeto.")
+
+    # Adiciona um novo job à fila.
+    @staticmethod
+    def create(data):
+        try:
+            job = ReviewJob(**data)
+            db.session.add(job)
+            db.session.commit()
+            logger.info(f"Job de avaliação enfileirado: {job.id}")
+            return job
+        except IntegrityError as e:
+            db.session.rollback()
+            logger.warning(f"Projeto {data.get('projeto_id')} já possui um job de avaliação ativo: {e}")
+            raise ConflictError(resource="Job de avaliação", message="O projeto já possui uma avaliação em andamento.")
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logger.error(f"Erro ao enfileirar job de avaliação: {e}")
+            raise InternalServerError(message="Erro ao enfileirar avaliação.")
+
+    # Reserva os projetos para uma avaliação síncrona (lote ou streaming), inserindo para cada um
+    # um job já em processamento. Com o índice único parcial, o INSERT ... ON CONFLICT DO NOTHING
+    # descarta os projetos que já têm job ativo, então requisições concorrentes nunca avaliam o mesmo
+    # projeto. Retorna {projeto_id: job_id} apenas dos projetos reservados.
+    @staticmethod
+    def reserve(projeto_ids, etapa):
+        try:
+            rows = db.session.execute(
+                insert(ReviewJob)
+                .values([
+                    {"projeto_id": projeto_id, "status": 'processando', "etapa": etapa, "progresso": 0, "tentativas": 1}
+                    for projeto_id in projeto_ids
+                ])
+                .on_conflict_do_nothing(
+                    index_elements=['projeto_id'],
+                    index_where=text("status IN ('pendente', 'processando')")
+                )
+                .returning(ReviewJob.projeto_id, ReviewJob.id)
+            ).all()
+            db.session.commit()
+            return {row.projeto_id: row.id for row in rows}
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logger.error(f"Erro ao reservar projetos para avaliação: {e}")
+            raise InternalServerError(message="Erro ao reservar projetos para avaliação.")
+
+    # Reivindica o próximo job disponível com SELECT ... FOR UPDATE SKIP LOCKED.
+    # Jobs em processamento sem heartbeat há mais de `lease_seconds` (worker morto) voltam a ser elegíveis
+    # enquanto tiverem menos de `max_attempts` tentativas; os que já as esgotaram são marcados como falhos.
+    @staticmethod
+    def claim_next(lease_seconds, max_attempts):
+        try:
+            abandoned = and_(
+                ReviewJob.status == 'processando',
+                ReviewJob.data_atualizacao < func.now() - timedelta(seconds=lease_seconds)
+            )
+            exhausted = db.session.query(ReviewJob).filter(abandoned, ReviewJob.tentativas >= max_attempts).update({
+                ReviewJob.status: 'erro',
+                ReviewJob.etapa: 'falhou',
+                ReviewJob.erro: 'O processamento foi interrompido e as tentativas se esgotaram.',
+                ReviewJob.data_atualizacao: func.now()
+            }, synchronize_session=False)
+            if exhausted:
+                logger.error(f"{exhausted} job(s) de avaliação abandonado(s) sem tentativas restantes marcado(s) como falho(s).")
+
+            job = db.session.query(ReviewJob).filter(
+                or_(
+                    and_(ReviewJob.status == 'pendente', ReviewJob.disponivel_em <= func.now()),
+                    and_(abandoned, ReviewJob.tentativas < max_attempts)
+                )
+            ).order_by(ReviewJob.disponivel_em).with_for_update(skip_locked=True).first()
+
+            if not job:
+                db.session.commit()  # encerra a transação e libera a conexão
+                return None
+
+            job.status = 'processando'
+            job.etapa = 'iniciando'
+            job.progresso = 0
+            job.tentativas += 1
+            db.session.commit()
+            logger.info(f"Job de avaliação {job.id} reivindicado (tentativa {job.tentativas}).")
+            return job
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logger.error(f"Erro ao reivindicar job de avaliação: {e}")
+            raise InternalServerError(message="Erro ao reivindicar job de avaliação.")
+
+    # Atualiza o job com `values` e renova o seu heartbeat, desde que ele continue em processamento na
+    # tentativa `tentativas` (fencing): se o lease expirou e outro worker o reivindicou, nada é alterado
+    # e o retorno é False. Com commit=False, a alteração entra na transação de quem chamou.
+    @staticmethod
+    def touch(job_id, tentativas, values=None, commit=True):
+        try:
+            updated = db.session.query(ReviewJob).filter(
+                ReviewJob.id == job_id,
+                ReviewJob.tentativas == tentativas,
+                ReviewJob.status == 'processando'
+            ).update({**(values or {}), "data_atualizacao": func.now()}, synchronize_session=False)
+            if commit:
+                db.session.commit()
+            return updated == 1
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logger.error(f"Erro ao atualizar job de avaliação com ID {job_id}: {e}")
+            raise InternalServerError(message="Erro ao atualizar job de avaliação.")
+
+    # Atualiza um job existente (progresso, status ou erro).
+    @staticmethod
+    def update(job):
+        try:
+            job.data_atualizacao = func.now()
+            db.session.commit()
+            return job
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logger.error(f"Erro ao atualizar job de avaliação com ID {job.id}: {e}")
+            raise InternalServerError(message="Erro ao atualizar job de avaliação.")
@@ -0,0 +1,56 @@
+import logging
+from datetime import timedelta
+from sqlalchemy import Integer, case, cast
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.sql import func
+from app.models.avaliacao_metrica_model import ReviewMetric
+from app import db
+from app.erros.custom_errors import InternalServerError
+
+logger = logging.getLogger("ReviewMetricRepository")
+
+class ReviewMetricRepository:
+    """Repositório para as métricas de custo e latência das avaliações (tabela avaliacao_metricas)"""
+
+    TEMPOS = ("tempo_download_ms", "tempo_extracao_ms", "tempo_llm_ms", "tempo_total_ms")
+
+    # Registra as métricas de uma avaliação.
+    @staticmethod
+    def create(data):
+        try:
+            metrica = ReviewMetric(**data)
+            db.session.add(metrica)
+            db.session.commit()
+            return metrica
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logger.error(f"Erro ao registrar métricas da avaliação: {e}")
+            raise InternalServerError(message="Erro ao registrar métricas da avaliação.")
+
+    # Agrega as métricas por dia dos últimos `dias` dias: totais, tokens e p50/p95 de cada etapa (percentile_cont).
+    @staticmethod
+    def daily_summary(dias):
+        try:
+            dia = func.date_trunc('day', ReviewMetric.data_criacao).label("dia")
+            colunas = [
+                dia,
+                func.count(ReviewMetric.id).label("avaliacoes"),
+                func.sum(case((ReviewMetric.sucesso.is_(False), 1), else_=0)).label("falhas"),
+                func.sum(cast(ReviewMetric.cache_hit, Integer)).label("cache_hits"),
+                func.sum(ReviewMetric.prompt_tokens).label("prompt_tokens"),
+                func.sum(ReviewMetric.completion_tokens).label("completion_tokens"),
+                func.sum(ReviewMetric.chamadas_llm).label("chamadas_llm"),
+                func.sum(ReviewMetric.retentativas).label("retentativas"),
+            ]
+            for campo in ReviewMetricRepository.TEMPOS:
+                coluna = getattr(ReviewMetric, campo)
+                colunas.append(func.percentile_cont(0.5).within_group(coluna).label(f"{campo}_p50"))
+                colunas.append(func.percentile_cont(0.95).within_group(coluna).label(f"{campo}_p95"))
+
+            rows = db.session.query(*colunas).filter(
+                ReviewMetric.data_criacao >= func.date_trunc('day', func.now()) - timedelta(days=dias - 1)
+            ).group_by(dia).order_by(dia.desc()).all()
+            return [row._asdict() for row in rows]
+        except SQLAlchemyError as e:
+            logger.error(f"Erro ao agregar métricas das avaliações: {e}")
+            raise InternalServerError(message="Erro ao buscar métricas das avaliações.")
@@ -1,6 +1,6 @@
 import logging
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, undefer
 from app.models.projeto_model import Project
 from app import db
 from app.erros.custom_errors import NotFoundError, InternalServerError, ConflictError
@@ -44,6 +44,20 @@ class ProjectRepository:
             logger.error(f"Erro ao buscar projeto com ID {id}: {e}")
             raise InternalServerError(message="Erro ao buscar projeto pelo ID.")
 
+    # Retorna, em uma única consulta, os projetos dos IDs informados com suas avaliações e o texto extraído.
+    @staticmethod
+    def get_by_ids(ids):
+        try:
+            projetos = db.session.query(Project).filter(Project.id.in_(ids)).options(
+                joinedload(Project.avaliacao),
+                undefer(Project.texto_extraido)
+            ).all()
+            logger.info(f"{len(projetos)} de {len(ids)} projetos encontrados.")
+            return projetos
+        except SQLAlchemyError as e:
+            logger.error(f"Erro ao buscar projetos em lote: {e}")
+            raise InternalServerError(message="Erro ao buscar projetos.")
+
     # Adiciona um novo projeto ao banco de dados.
     @staticmethod
     def create(data):
@@ -0,0 +1,42 @@
+import logging
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from app.models.upload_model import FinalizedUpload
+from app import db
+from app.erros.custom_errors import ConflictError, InternalServerError
+
+logger = logging.getLogger("FinalizedUploadRepository")
+
+class FinalizedUploadRepository:
+    """Repositório dos uploads diretos já finalizados (tabela uploads_finalizados)"""
+
+    # Reserva o upload para uma finalização, antes de qualquer outro trabalho. A inserção é atômica:
+    # entre finalizações simultâneas (ou repetidas) do mesmo token, só a primeira prossegue.
+    @staticmethod
+    def claim(objeto):
+        try:
+            claimed = db.session.execute(
+                insert(FinalizedUpload)
+                .values(objeto=objeto)
+                .on_conflict_do_nothing(index_elements=['objeto'])
+                .returning(FinalizedUpload.objeto)
+            ).scalar_one_or_none()
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logger.error(f"Erro ao reservar o upload {objeto}: {e}")
+            raise InternalServerError(message="Erro ao finalizar o upload.")
+        if claimed is None:
+            logger.warning(f"Upload {objeto} já finalizado ou em finalização.")
+            raise ConflictError(resource="Upload", message="Este upload já foi finalizado.")
+
+    # Desfaz a reserva quando a finalização falha por um erro transitório, para que o cliente possa repeti-la.
+    @staticmethod
+    def release(objeto):
+        try:
+            db.session.query(FinalizedUpload).filter_by(objeto=objeto).delete()
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logger.error(f"Erro ao liberar a reserva do upload {objeto}: {e}")
+            raise InternalServerError(message="Erro ao liberar o upload.")
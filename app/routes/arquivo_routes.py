@@ -0,0 +1,14 @@
+from flask import Blueprint
+from app.controllers.arquivo_controller import FileController
+
+arquivo_routes = Blueprint("arquivo_routes", __name__)
+
+# Arquivos públicos dos armazenamentos local e em memória - acesso livre, como as URLs do Firebase
+@arquivo_routes.route('/files/<path:file_name>', methods=['GET'])
+def get_file(file_name):
+    return FileController.get(file_name)
+
+# Upload direto ao armazenamento local/em memória - autorizado pelo token da URL de upload
+@arquivo_routes.route('/files/<path:file_name>', methods=['PUT'])
+def put_file(file_name):
+    return FileController.put(file_name)
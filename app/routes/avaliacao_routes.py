@@ -1,6 +1,6 @@
 from flask import Blueprint
 from app.controllers.avaliacao_controller import ReviewController
-from app.middlewares.auth import jwt_required, avaliador_required
+from app.middlewares.auth import jwt_required, avaliador_required, admin_required
 
 avaliacao_routes = Blueprint("avaliacao_routes", __name__)
 
@@ -18,13 +18,41 @@ def get_all_reviews():
 def get_by_id_review(id):
     return ReviewController.get_by_id(id)
 
-# Cria uma nova avaliação - somente avaliadores
+# Enfileira uma nova avaliação (processada pelos workers) - somente avaliadores
 @avaliacao_routes.route('/reviews', methods=['POST'])
 @jwt_required
 @avaliador_required
 def create_review():
     return ReviewController.create()
 
+# Cria avaliações para uma lista de projetos, com concorrência limitada - somente administradores
+@avaliacao_routes.route('/reviews/batch', methods=['POST'])
+@jwt_required
+@admin_required
+def create_review_batch():
+    return ReviewController.create_batch()
+
+# Consulta o andamento de um job de avaliação - somente avaliadores
+@avaliacao_routes.route('/reviews/jobs/<uuid:id>', methods=['GET'])
+@jwt_required
+@avaliador_required
+def get_review_job(id):
+    return ReviewController.get_job(id)
+
+# Métricas agregadas por dia (tokens e p50/p95 por etapa) das avaliações - somente administradores
+@avaliacao_routes.route('/reviews/metrics', methods=['GET'])
+@jwt_required
+@admin_required
+def get_review_metrics():
+    return ReviewController.get_metrics()
+
+# Gera a avaliação de um projeto transmitindo os tokens da IA via Server-Sent Events - somente avaliadores
+@avaliacao_routes.route('/reviews/stream/<uuid:projeto_id>', methods=['GET'])
+@jwt_required
+@avaliador_required
+def stream_review(projeto_id):
+    return ReviewController.stream(projeto_id)
+
 # Atualiza uma avaliação específica pelo ID - somente avaliadores
 @avaliacao_routes.route('/reviews/<uuid:id>', methods=['PUT'])
 @jwt_required
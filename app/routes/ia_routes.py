@@ -0,0 +1,26 @@
+from flask import Blueprint
+from app.controllers.ia_controller import IaController
+from app.middlewares.auth import jwt_required, admin_required
+
+ia_routes = Blueprint("ia_routes", __name__)
+
+# Estatísticas do cache de análises da IA - somente administradores
+@ia_routes.route('/ia/cache', methods=['GET'])
+@jwt_required
+@admin_required
+def get_ia_cache_stats():
+    return IaController.get_cache_stats()
+
+# Invalida todo o cache de análises (ou apenas de um modelo, via ?modelo=) - somente administradores
+@ia_routes.route('/ia/cache', methods=['DELETE'])
+@jwt_required
+@admin_required
+def invalidate_ia_cache():
+    return IaController.invalidate_cache()
+
+# Invalida uma análise específica do cache - somente administradores
+@ia_routes.route('/ia/cache/<string:chave>', methods=['DELETE'])
+@jwt_required
+@admin_required
+def invalidate_ia_cache_entry(chave):
+    return IaController.invalidate_cache_entry(chave)
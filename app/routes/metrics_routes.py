@@ -0,0 +1,12 @@
+from flask import Blueprint
+from app.controllers.metrics_controller import MetricsController
+from app.middlewares.auth import jwt_required, admin_required
+
+metrics_routes = Blueprint("metrics_routes", __name__)
+
+# Métricas operacionais do processo (circuit breaker, caches) - somente administradores
+@metrics_routes.route('/metrics', methods=['GET'])
+@jwt_required
+@admin_required
+def get_metrics():
+    return MetricsController.get_all()
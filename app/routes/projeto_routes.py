@@ -25,6 +25,20 @@ def get_by_id_project(id):
 def create_project():
     return ProjectController.create()
 
+# Gera a URL assinada para enviar o arquivo direto ao bucket - apenas avaliadores
+@projeto_routes.route('/projects/uploads', methods=['POST'])
+@jwt_required
+@avaliador_required
+def create_project_upload():
+    return ProjectController.create_upload()
+
+# Valida o arquivo enviado pela URL assinada e cria o projeto - apenas avaliadores
+@projeto_routes.route('/projects/uploads/finalize', methods=['POST'])
+@jwt_required
+@avaliador_required
+def finalize_project_upload():
+    return ProjectController.finalize_upload()
+
 # Atualiza um projeto específico pelo ID - apenas avaliadores
 @projeto_routes.route('/projects/<uuid:id>', methods=['PUT'])
 @jwt_required
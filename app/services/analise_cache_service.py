@@ -0,0 +1,88 @@
+import hashlib
+import json
+import logging
+import threading
+from app.repositories.analise_cache_repository import AnalysisCacheRepository
+from app.erros.custom_errors import NotFoundError, InternalServerError, ValidationError
+
+logger = logging.getLogger(__name__)
+
+class AnalysisCacheService:
+    """Cache de análises da IA endereçado pelo conteúdo do texto, modelo, pontos de análise e configuração do prompt."""
+
+    # contadores do processo atual (cada worker/gunicorn mantém os seus)
+    _lock = threading.Lock()
+    _hits = 0
+    _misses = 0
+
+    @staticmethod
+    def _sha256(value):
+        return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def build_entry(cls, texto, modelo, pontos_analise, configuracao):
+        """Calcula os hashes que identificam uma análise. `configuracao` reúne os prompts e os limites de
+        tokens/trechos: ao alterá-los, as análises antigas deixam de ser reaproveitadas."""
+        texto_hash = cls._sha256(texto)
+        pontos_hash = cls._sha256(json.dumps(list(pontos_analise), ensure_ascii=False))
+        configuracao_hash = cls._sha256(json.dumps(configuracao, ensure_ascii=False, sort_keys=True))
+        chave = cls._sha256(f"{texto_hash}:{modelo}:{pontos_hash}:{configuracao_hash}")
+        return {"chave": chave, "texto_hash": texto_hash, "modelo": modelo, "pontos_hash": pontos_hash}
+
+    @classmethod
+    def _count(cls, hit):
+        with cls._lock:
+            if hit:
+                cls._hits += 1
+            else:
+                cls._misses += 1
+
+    def get(self, entry):
+        """Retorna o feedback em cache ou None. Falhas do cache não interrompem a análise."""
+        try:
+            cached = AnalysisCacheRepository.get(entry["chave"])
+            if not cached:
+                self._count(hit=False)
+                return None
+
+            self._count(hit=True)
+            AnalysisCacheRepository.register_hit(entry["chave"])
+            logger.info(f"Análise encontrada em cache: {entry['chave']}")
+            return cached.feedback_qualitativo
+        except InternalServerError as e:
+            logger.warning(f"Cache de análises indisponível, seguindo sem cache: {e.message}")
+            return None
+
+    def put(self, entry, feedback_qualitativo):
+        """Armazena uma análise concluída."""
+        try:
+            AnalysisCacheRepository.save({**entry, "feedback_qualitativo": feedback_qualitativo})
+        except InternalServerError as e:
+            logger.warning(f"Não foi possível armazenar a análise em cache: {e.message}")
+
+    def stats(self):
+        """Retorna os contadores de hit/miss do processo e os totais persistidos."""
+        with self._lock:
+            hits, misses = self._hits, self._misses
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+            **AnalysisCacheRepository.stats()
+        }
+
+    def invalidate(self, chave=None, modelo=None):
+        """Invalida uma entrada específica ou todo o cache (opcionalmente por modelo)."""
+        try:
+            if chave is not None:
+                if not isinstance(chave, str) or len(chave) != 64:
+                    raise ValidationError(field="chave", message="Chave de cache inválida.")
+                AnalysisCacheRepository.delete(chave)
+                return 1
+            return AnalysisCacheRepository.delete_all(modelo)
+        except (ValidationError, NotFoundError, InternalServerError):
+            raise
+        except Exception as e:
+            logger.error(f"Erro inesperado ao invalidar o cache de análises: {e}")
+            raise InternalServerError("Erro inesperado ao invalidar o cache de análises.")
@@ -0,0 +1,226 @@
+import hashlib
+import io
+import logging
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from app.config.config import Config
+from app.repositories.arquivo_repository import StoredFileRepository
+from app.services.storage_backend import get_storage_backend
+from app.erros.custom_errors import AppError
+
+logger = logging.getLogger(__name__)
+
+
+class SpooledUpload:
+    """Cópia do arquivo recebido, feita uma única vez a partir do stream da requisição em blocos de
+    CHUNK_SIZE bytes, com o SHA-256 e o tamanho calculados durante a cópia.
+
+    A cópia é um SpooledTemporaryFile: fica em memória até UPLOAD_SPOOL_MAX_MEMORY bytes e vai para o
+    disco acima disso. Cada `reader()` tem a sua própria posição, então o envio à quarentena (em outra
+    thread) e a extração leem o conteúdo ao mesmo tempo, cada um desde o início.
+    """
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, stream):
+        self._file = tempfile.SpooledTemporaryFile(max_size=Config.UPLOAD_SPOOL_MAX_MEMORY)
+        self._lock = threading.Lock()
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: stream.read(self.CHUNK_SIZE), b""):
+            digest.update(chunk)
+            self._file.write(chunk)
+        self.digest = digest.hexdigest()
+        self.size = self._file.tell()
+
+    def reader(self):
+        return _SpoolReader(self)
+
+    def read_at(self, position, size):
+        with self._lock:
+            self._file.seek(position)
+            return self._file.read(size)
+
+    def close(self):
+        self._file.close()
+
+
+class _SpoolReader(io.RawIOBase):
+    """Leitor de um SpooledUpload com posição própria (as leituras do arquivo compartilhado são serializadas)."""
+
+    def __init__(self, spool):
+        self._spool = spool
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: self._spool.size}[whence]
+        self._position = max(0, base + offset)
+        return self._position
+
+    def readinto(self, buffer):
+        data = self._spool.read_at(self._position, len(buffer))
+        buffer[:len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+    def readall(self):
+        data = self._spool.read_at(self._position, max(0, self._spool.size - self._position))
+        self._position += len(data)
+        return data
+
+
+class QuarantinedUpload:
+    """Envio de um arquivo para a quarentena, em andamento em segundo plano enquanto o arquivo é validado.
+
+    `promote` aguarda o envio e move o objeto para o caminho definitivo; `discard` o descarta sem
+    bloquear a requisição. Se o conteúdo já estava armazenado, nada é enviado à quarentena. A cópia
+    do arquivo (SpooledUpload) é fechada quando o envio deixa de precisar dela.
+    """
+
+    def __init__(self, service, future, spool, filename, content_type):
+        self.service = service
+        self.future = future
+        self.spool = spool
+        self.filename = filename
+        self.content_type = content_type
+
+    def promote(self):
+        """Aguarda o envio e retorna (url pública, digest), como StoredFileService.store."""
+        try:
+            quarantine_name = self.future.result()
+            if quarantine_name is None:
+                return self.service.store(self.spool.reader(), self.filename, self.content_type)
+            return self.service.store_uploaded(
+                quarantine_name, self.spool.digest, self.spool.size, self.filename, self.content_type
+            )
+        finally:
+            self.spool.close()
+
+    def discard(self):
+        """Cancela o envio se ainda não começou; senão, remove o objeto da quarentena quando ele terminar."""
+        if self.future.cancel():
+            self.spool.close()
+            return
+        self.future.add_done_callback(self._delete_quarantined)
+
+    def _delete_quarantined(self, future):
+        self.spool.close()
+        try:
+            quarantine_name = future.result()
+            if quarantine_name is not None:
+                get_storage_backend().delete_file(quarantine_name)
+        except Exception as e:
+            logger.warning(f"Não foi possível remover o arquivo da quarentena: {e}")
+
+
+class StoredFileService:
+    """Armazenamento dos arquivos de projetos endereçado pelo conteúdo.
+
+    Cada arquivo fica no bucket em FILES_PREFIX/<sha256>.<extensão>, de modo que nomes iguais enviados
+    por empresas diferentes não se sobrescrevem e conteúdos idênticos são armazenados (e transferidos)
+    uma única vez. A tabela `arquivos` conta quantos projetos usam cada objeto; `release` remove o
+    objeto do bucket quando a última referência é liberada.
+
+    Com SENSITIVE_DATA_MODE=redact, os dados sensíveis são mascarados só no texto extraído; o arquivo
+    original pode contê-los, então é armazenado privado (a URL registrada não é acessível publicamente).
+    """
+    _executor = None
+    _executor_lock = threading.Lock()
+
+    @classmethod
+    def _get_executor(cls):
+        with cls._executor_lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(max_workers=Config.UPLOAD_WORKERS, thread_name_prefix="upload")
+            return cls._executor
+
+    @staticmethod
+    def _path(digest, filename):
+        return f"{Config.FILES_PREFIX}/{digest}.{filename.rsplit('.', 1)[1].lower()}"
+
+    @staticmethod
+    def _public():
+        return Config.SENSITIVE_DATA_MODE != "redact"
+
+    @staticmethod
+    def _stream_digest(stream, chunk_size=1024 * 1024):
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: stream.read(chunk_size), b""):
+            digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _stream_size(stream):
+        position = stream.tell()
+        stream.seek(0, 2)
+        size = stream.tell()
+        stream.seek(position)
+        return size
+
+    def store(self, stream, filename, content_type=None):
+        """Armazena o conteúdo do stream e retorna (url pública, digest), registrando uma referência.
+
+        O digest é calculado lendo o stream em blocos, sem carregá-lo inteiro em memória.
+        """
+        stream.seek(0)
+        digest = self._stream_digest(stream)
+        caminho = StoredFileRepository.acquire(digest, self._path(digest, filename), self._stream_size(stream), content_type)
+        try:
+            url = get_storage_backend().upload_stream_if_absent(stream, caminho, content_type=content_type, public=self._public())
+        except Exception:
+            self.release(digest)
+            raise
+        logger.info(f"Arquivo {filename} armazenado como {caminho}.")
+        return url, digest
+
+    def store_uploaded(self, source_name, digest, size, filename, content_type=None):
+        """Move para o caminho endereçado pelo conteúdo um objeto já enviado ao bucket (upload direto ou
+        quarentena), cujo SHA-256 e tamanho já são conhecidos, e retorna (url pública, digest)."""
+        caminho = StoredFileRepository.acquire(digest, self._path(digest, filename), size, content_type)
+        try:
+            url = get_storage_backend().move_if_absent(source_name, caminho, public=self._public())
+        except Exception:
+            self.release(digest)
+            raise
+        logger.info(f"Upload {source_name} armazenado como {caminho}.")
+        return url, digest
+
+    def quarantine(self, spool, filename, content_type=None):
+        """Começa a enviar o arquivo (um SpooledUpload), privado, para QUARANTINE_PREFIX em segundo plano
+        e retorna um QuarantinedUpload, para que o envio ocorra enquanto o arquivo é validado.
+
+        Antes do envio, uma consulta de metadados verifica se o conteúdo já está armazenado no caminho
+        definitivo; nesse caso nada é transferido.
+        """
+        digest = spool.digest
+        quarantine_name = f"{Config.QUARANTINE_PREFIX}/{uuid.uuid4()}/{digest}"
+
+        def upload():
+            storage = get_storage_backend()
+            if storage.exists(self._path(digest, filename)):
+                return None
+            storage.upload_stream(spool.reader(), quarantine_name, content_type=content_type, public=False)
+            return quarantine_name
+
+        return QuarantinedUpload(self, self._get_executor().submit(upload), spool, filename, content_type)
+
+    def release(self, digest):
+        """Libera uma referência ao arquivo. Falhas são registradas e não interrompem a operação
+        principal: no pior caso o objeto permanece no bucket com a referência ainda contada."""
+        if not digest:
+            return
+        try:
+            StoredFileRepository.release(digest, get_storage_backend().delete_file)
+        except AppError as e:
+            logger.warning(f"Não foi possível liberar o arquivo {digest}: {e.message}")
+        except Exception as e:
+            logger.error(f"Erro inesperado ao liberar o arquivo {digest}: {e}")
@@ -0,0 +1,72 @@
+import logging
+import threading
+from app import db
+from app.config.config import Config
+from app.repositories.avaliacao_job_repository import ReviewJobRepository
+from app.erros.custom_errors import ConflictError, InternalServerError
+
+logger = logging.getLogger(__name__)
+
+class ReviewJobLease:
+    """Posse de um job de avaliação por uma tentativa (worker, lote ou streaming).
+
+    Usado como gerenciador de contexto, renova o heartbeat do job em uma thread própria a cada
+    REVIEW_JOB_HEARTBEAT_SECONDS. Todas as escritas são condicionadas à tentativa (fencing): se o lease
+    expirou e outro worker reivindicou o job, elas não alteram nada.
+    """
+
+    def __init__(self, app, job_id, tentativas):
+        self.app = app
+        self.job_id = job_id
+        self.tentativas = tentativas
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._heartbeat, name=f"review-heartbeat-{self.job_id}", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+    def _heartbeat(self):
+        with self.app.app_context():
+            try:
+                while not self._stop.wait(Config.REVIEW_JOB_HEARTBEAT_SECONDS):
+                    try:
+                        if not ReviewJobRepository.touch(self.job_id, self.tentativas):
+                            logger.warning(f"Heartbeat do job de avaliação {self.job_id} encerrado: job reivindicado por outro worker.")
+                            return
+                    except InternalServerError as e:
+                        logger.warning(f"Falha no heartbeat do job de avaliação {self.job_id}: {e.message}")
+            finally:
+                db.session.remove()
+
+    def update(self, values=None, commit=True):
+        """Atualiza o job se esta tentativa ainda for a dona. Retorna False se outro worker o reivindicou."""
+        return ReviewJobRepository.touch(self.job_id, self.tentativas, values, commit=commit)
+
+    def ensure(self, values=None, commit=True):
+        """Como `update`, mas interrompe o processamento (ConflictError) se o job foi reivindicado por outro worker.
+        Com commit=False, antes de gravar a avaliação, a checagem entra na mesma transação e trava a linha do job."""
+        if not self.update(values, commit=commit):
+            logger.warning(f"Job de avaliação {self.job_id} (tentativa {self.tentativas}) foi reivindicado por outro worker.")
+            raise ConflictError(resource="Job de avaliação", message="O job foi reivindicado por outro worker.")
+
+    def finish(self, avaliacao_id):
+        """Marca o job como concluído com a avaliação gerada."""
+        return self.update({
+            "status": 'concluido',
+            "etapa": 'concluído',
+            "progresso": 100,
+            "erro": None,
+            "avaliacao_id": avaliacao_id
+        })
+
+    def fail(self, message):
+        """Marca o job como falho, liberando o projeto para uma nova avaliação."""
+        return self.update({"status": 'erro', "etapa": 'falhou', "erro": message})
@@ -0,0 +1,128 @@
+import logging
+import random
+from datetime import timedelta
+from flask import current_app
+from sqlalchemy.sql import func
+from app import db
+from app.config.config import Config
+from app.repositories.avaliacao_job_repository import ReviewJobRepository
+from app.repositories.projeto_repository import ProjectRepository
+from app.services.avaliacao_service import ReviewService
+from app.services.ia_service import IaService
+from app.services.avaliacao_job_lease import ReviewJobLease
+from app.erros.custom_errors import NotFoundError, ConflictError, InternalServerError, ValidationError, ExternalAPIError
+
+logger = logging.getLogger(__name__)
+
+class ReviewJobService:
+    """Fila de avaliações assíncronas: enfileira no request HTTP e processa nos workers."""
+
+    # erros transitórios que justificam nova tentativa do job (ExternalAPIError só com retryable=True)
+    RETRYABLE_ERRORS = (ExternalAPIError, InternalServerError)
+
+    def __init__(self):
+        self.review_service = ReviewService(ia_service=IaService(aguardar_retentativas=True))
+
+    def enqueue(self, data):
+        """Valida o projeto e enfileira um job de avaliação, sem chamar a IA no request."""
+        try:
+            projeto_id = data.get("projeto_id")
+
+            if not projeto_id or not isinstance(projeto_id, str):
+                raise ValidationError(field="projeto_id", message="ID inválido.")
+
+            projeto = ProjectRepository.get_by_id(projeto_id)
+
+            if projeto.avaliacao:
+                logger.warning(f"Projeto {projeto_id} já possui uma avaliação.")
+                raise ConflictError(resource="Projeto", message="O projeto já possui uma avaliação.")
+
+            if ReviewJobRepository.get_active_by_projeto(projeto.id):
+                logger.warning(f"Projeto {projeto_id} já possui uma avaliação em andamento.")
+                raise ConflictError(resource="Job de avaliação", message="O projeto já possui uma avaliação em andamento.")
+
+            job = ReviewJobRepository.create({"projeto_id": projeto.id})
+            logger.info(f"Avaliação do projeto {projeto_id} enfileirada no job {job.id}.")
+            return job
+
+        except (ValidationError, NotFoundError, ConflictError):
+            raise
+        except Exception as e:
+            logger.error(f"Erro inesperado ao enfileirar avaliação: {e}")
+            raise InternalServerError("Erro inesperado ao enfileirar avaliação.")
+
+    def get_by_id(self, job_id):
+        """Busca o status de um job de avaliação."""
+        try:
+            if not job_id or not isinstance(job_id, str):
+                raise ValidationError(field="job_id", message="ID inválido.")
+            return ReviewJobRepository.get_by_id(job_id)
+        except (ValidationError, NotFoundError):
+            raise
+        except Exception as e:
+            logger.error(f"Erro inesperado ao buscar job de avaliação {job_id}: {e}")
+            raise InternalServerError("Erro inesperado ao buscar job de avaliação.")
+
+    def process_next(self):
+        """Reivindica e processa o próximo job disponível. Retorna False se a fila estiver vazia."""
+        job = ReviewJobRepository.claim_next(Config.REVIEW_JOB_LEASE_SECONDS, Config.REVIEW_JOB_MAX_ATTEMPTS)
+        if not job:
+            return False
+
+        job_id, tentativas, projeto_id = job.id, job.tentativas, str(job.projeto_id)
+        lease = ReviewJobLease(current_app._get_current_object(), job_id, tentativas)
+
+        def on_progress(etapa, progresso):
+            lease.ensure({"etapa": etapa, "progresso": progresso})
+
+        try:
+            with lease:
+                avaliacao = self.review_service.create(
+                    {"projeto_id": projeto_id},
+                    on_progress=on_progress,
+                    before_save=lambda: lease.ensure(commit=False)
+                )
+            if lease.finish(avaliacao.id):
+                logger.info(f"Job de avaliação {job_id} concluído: avaliação {avaliacao.id}.")
+            else:
+                logger.warning(f"Job de avaliação {job_id} gerou a avaliação {avaliacao.id}, mas foi reivindicado por outro worker.")
+        except Exception as e:
+            db.session.rollback()
+            self._handle_failure(lease, e)
+        return True
+
+    @staticmethod
+    def _retry_delay(tentativas, error):
+        """Backoff exponencial com jitter, respeitando o tempo indicado pela API (Retry-After/circuito aberto)."""
+        delay = Config.REVIEW_JOB_RETRY_DELAY * 2 ** (tentativas - 1)
+        delay = random.uniform(delay / 2, delay)
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def _handle_failure(self, lease, error):
+        """Reagenda o job em erros transitórios ou o marca como falho."""
+        job_id, tentativas = lease.job_id, lease.tentativas
+        message = getattr(error, "message", str(error))
+        values = {"erro": message}
+
+        retryable = isinstance(error, self.RETRYABLE_ERRORS) and getattr(error, "retryable", True)
+        if retryable and tentativas < Config.REVIEW_JOB_MAX_ATTEMPTS:
+            delay = self._retry_delay(tentativas, error)
+            values.update({
+                "status": 'pendente',
+                "etapa": 'aguardando nova tentativa',
+                "disponivel_em": func.now() + timedelta(seconds=delay)
+            })
+        else:
+            values.update({"status": 'erro', "etapa": 'falhou'})
+
+        # se o lease expirou e outro worker assumiu o job, a falha desta tentativa não sobrescreve o estado dele
+        if not lease.update(values):
+            logger.warning(f"Falha da tentativa {tentativas} do job de avaliação {job_id} ignorada: job reivindicado por outro worker.")
+        elif values["status"] == 'pendente':
+            logger.warning(f"Job de avaliação {job_id} falhou ({message}); nova tentativa em {delay:.0f} segundos.")
+        else:
+            logger.error(f"Job de avaliação {job_id} falhou definitivamente: {message}")
+
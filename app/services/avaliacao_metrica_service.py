@@ -0,0 +1,51 @@
+import logging
+from app.repositories.avaliacao_metrica_repository import ReviewMetricRepository
+from app.erros.custom_errors import InternalServerError, ValidationError
+
+logger = logging.getLogger(__name__)
+
+class ReviewMetricService:
+    """Persistência e agregação das métricas de custo e latência das avaliações."""
+
+    MAX_DIAS = 365
+
+    def record(self, metricas, projeto_id, avaliacao=None, erro=None):
+        """Grava as métricas coletadas de uma avaliação. Falhas aqui não afetam a avaliação."""
+        try:
+            ReviewMetricRepository.create({
+                **metricas.as_dict(),
+                "projeto_id": projeto_id,
+                "avaliacao_id": avaliacao.id if avaliacao else None,
+                "sucesso": erro is None,
+                "erro": type(erro).__name__ if erro else None
+            })
+        except InternalServerError as e:
+            logger.warning(f"Não foi possível registrar as métricas da avaliação do projeto {projeto_id}: {e.message}")
+        except Exception as e:
+            logger.warning(f"Erro inesperado ao registrar métricas da avaliação do projeto {projeto_id}: {e}")
+
+    def daily_summary(self, dias=30):
+        """Retorna, por dia, volume, tokens e percentis p50/p95 dos tempos de cada etapa."""
+        try:
+            try:
+                dias = int(dias)
+            except (TypeError, ValueError):
+                raise ValidationError(field="dias", message="Número de dias inválido.")
+            if not 1 <= dias <= self.MAX_DIAS:
+                raise ValidationError(field="dias", message=f"O período deve estar entre 1 e {self.MAX_DIAS} dias.")
+
+            resumo = []
+            for row in ReviewMetricRepository.daily_summary(dias):
+                item = {"dia": row.pop("dia").date().isoformat()}
+                for campo, valor in row.items():
+                    if campo.endswith(("_p50", "_p95")):
+                        item[campo] = round(float(valor), 1) if valor is not None else None
+                    else:
+                        item[campo] = int(valor or 0)
+                resumo.append(item)
+            return resumo
+        except (ValidationError, InternalServerError):
+            raise
+        except Exception as e:
+            logger.error(f"Erro inesperado ao agregar métricas das avaliações: {e}")
+            raise InternalServerError("Erro inesperado ao buscar métricas das avaliações.")
@@ -1,10 +1,18 @@
+import json
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from flask import current_app
 import marshmallow
+from app import db
+from app.config.config import Config
 from app.repositories.avaliacao_repository import ReviewRepository
 from app.repositories.projeto_repository import ProjectRepository
+from app.repositories.avaliacao_job_repository import ReviewJobRepository
+from app.services.avaliacao_job_lease import ReviewJobLease
 from app.services.projeto_service import ProjectService
+from app.services.avaliacao_metrica_service import ReviewMetricService
 from app.validators.avaliacao_validator import ReviewSchema
-from app.erros.custom_errors import NotFoundError, ConflictError, InternalServerError, ValidationError, ExternalAPIError
+from app.erros.custom_errors import AppError, NotFoundError, ConflictError, InternalServerError, ValidationError, ExternalAPIError
 from app.erros.error_handler import ErrorHandler
 import uuid
 from app.services.ia_service import IaService 
@@ -12,9 +20,10 @@ from app.services.ia_service import IaService
 logger = logging.getLogger(__name__)
 
 class ReviewService:
-    def __init__(self):
+    def __init__(self, ia_service=None):
         self.schema = ReviewSchema()
-        self.ia_service = IaService()  
+        self.ia_service = ia_service or IaService()
+        self.metric_service = ReviewMetricService()
 
     def get_all(self):
         """Retorna todas as avaliações cadastradas com seus projetos e avaliadores."""
@@ -26,6 +35,10 @@ class ReviewService:
             logger.error(f"Erro inesperado ao buscar avaiações: {e}")
             raise InternalServerError("Erro inesperado ao buscar avaliações.")
 
+    def get_metrics(self, dias=30):
+        """Retorna as métricas agregadas por dia (tokens e p50/p95 de download, extração e IA)."""
+        return self.metric_service.daily_summary(dias)
+
     def get_by_id(self, review_id):
         """Busca uma avaliação específica pelo ID."""
         try:
@@ -47,8 +60,18 @@ class ReviewService:
             logger.error(f"Erro inesperado ao buscar avaliação {review_id}: {e}")
             raise InternalServerError("Erro inesperado ao buscar avaliação.")
 
-    def create(self, data):
-        """Cria uma nova avaliação para um projeto específico."""
+    @staticmethod
+    def _report_progress(on_progress, etapa, progresso):
+        """Notifica o andamento da avaliação (usado pelos workers da fila de jobs)."""
+        if on_progress:
+            on_progress(etapa, progresso)
+
+    def create(self, data, on_progress=None, before_save=None):
+        """Cria uma nova avaliação para um projeto específico.
+
+        `before_save`, se informado, é chamado logo antes de gravar a avaliação, na mesma transação
+        (a fila de jobs o usa para confirmar que o worker ainda é o dono do job).
+        """
         try:
             logger.info(f"Dados recebidos para criar avaliação: {data}")
 
@@ -67,21 +90,32 @@ class ReviewService:
                 logger.warning(f"Projeto {projeto_id} já possui uma avaliação.")
                 raise ConflictError(resource="Projeto", message="O projeto já possui uma avaliação.")
 
-            projeto_texto = self.ia_service.obter_texto_projeto(projeto.id)
+            metricas = self.ia_service.nova_metrica("job")
             try:
-                feedback_qualitativo = self.ia_service.enviar_para_analise(projeto_texto)
-            except ExternalAPIError as api_error:
-                logger.error(f"Erro ao utilizar a API da OpenAI: {api_error.message}")
-                raise
+                self._report_progress(on_progress, "extraindo texto", 10)
+                projeto_texto = self.ia_service.texto_do_projeto(projeto, metricas)
+                self._report_progress(on_progress, "analisando com IA", 40)
+                try:
+                    feedback_qualitativo = self.ia_service.enviar_para_analise(projeto_texto, metricas)
+                except ExternalAPIError as api_error:
+                    logger.error(f"Erro ao utilizar a API da OpenAI: {api_error.message}")
+                    raise
 
-            data['feedback_qualitativo'] = feedback_qualitativo
+                data['feedback_qualitativo'] = feedback_qualitativo
+                self._report_progress(on_progress, "salvando avaliação", 90)
+                try:
+                    avaliacao_data = self.schema.load(data)
+                except marshmallow.exceptions.ValidationError as marshmallow_error:
+                    ErrorHandler.handle_marshmallow_errors(marshmallow_error.messages)
 
-            try:
-                avaliacao_data = self.schema.load(data)
-            except marshmallow.exceptions.ValidationError as marshmallow_error:
-                ErrorHandler.handle_marshmallow_errors(marshmallow_error.messages)
+                if before_save:
+                    before_save()
+                avaliacao = ReviewRepository.create(avaliacao_data)
+            except Exception as e:
+                self.metric_service.record(metricas, projeto.id, erro=e)
+                raise
 
-            avaliacao = ReviewRepository.create(avaliacao_data)
+            self.metric_service.record(metricas, projeto.id, avaliacao=avaliacao)
             logger.info(f"Avaliação criada com sucesso para o projeto {projeto.id}.")
             return avaliacao
 
@@ -103,6 +137,209 @@ class ReviewService:
 
 
 
+    def create_batch(self, data):
+        """Cria avaliações para vários projetos com concorrência limitada.
+
+        Projetos inexistentes ou já avaliados são resolvidos antes, com consultas em lote; os demais são
+        reservados com um job de avaliação (ReviewJobRepository.reserve), e só os reservados têm extração
+        de texto e análise executadas em paralelo (REVIEW_BATCH_CONCURRENCY). Projetos com avaliação em
+        andamento ficam de fora. Retorna o resultado de cada projeto na ordem recebida.
+        """
+        try:
+            projeto_ids = data.get("projeto_ids")
+            if not projeto_ids or not isinstance(projeto_ids, list):
+                raise ValidationError(field="projeto_ids", message="Informe uma lista de IDs de projetos.")
+            if len(projeto_ids) > Config.REVIEW_BATCH_MAX_SIZE:
+                raise ValidationError(field="projeto_ids", message=f"Máximo de {Config.REVIEW_BATCH_MAX_SIZE} projetos por lote.")
+
+            resultados = {}
+            ordem = []  # IDs normalizados, sem duplicados, na ordem recebida
+            ids_validos = []
+            for projeto_id in map(str, projeto_ids):
+                try:
+                    chave = str(uuid.UUID(projeto_id))
+                except ValueError:
+                    chave = projeto_id
+                    resultados[chave] = self._batch_error(ValidationError(field="projeto_id", message="ID inválido."))
+                if chave in ordem:
+                    continue
+                ordem.append(chave)
+                if chave not in resultados:
+                    ids_validos.append(uuid.UUID(chave))
+
+            projetos = {projeto.id: projeto for projeto in ProjectRepository.get_by_ids(ids_validos)}
+
+            candidatos = []
+            for projeto_id in ids_validos:
+                projeto = projetos.get(projeto_id)
+                if not projeto:
+                    resultados[str(projeto_id)] = self._batch_error(NotFoundError(resource="Projeto", message="Projeto não encontrado."))
+                elif projeto.avaliacao:
+                    resultados[str(projeto_id)] = {"status": "ignorado", "message": "O projeto já possui uma avaliação."}
+                else:
+                    candidatos.append(projeto)
+
+            reservas = ReviewJobRepository.reserve([projeto.id for projeto in candidatos], "avaliação em lote") if candidatos else {}
+            pendentes = []
+            for projeto in candidatos:
+                if projeto.id in reservas:
+                    pendentes.append((projeto.id, reservas[projeto.id], projeto.texto_extraido))
+                else:
+                    resultados[str(projeto.id)] = {"status": "ignorado", "message": "O projeto já possui uma avaliação em andamento."}
+
+            logger.info(f"Lote de avaliações: {len(pendentes)} projetos a avaliar de {len(projeto_ids)} recebidos.")
+
+            if pendentes:
+                app = current_app._get_current_object()
+                max_workers = min(Config.REVIEW_BATCH_CONCURRENCY, len(pendentes))
+                with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="review-batch") as executor:
+                    futures = {
+                        executor.submit(self._create_batch_item, app, projeto_id, job_id, texto_extraido): projeto_id
+                        for projeto_id, job_id, texto_extraido in pendentes
+                    }
+                    for future in as_completed(futures):
+                        resultados[str(futures[future])] = future.result()
+
+            return [{"projeto_id": chave, **resultados[chave]} for chave in ordem]
+
+        except ValidationError as err:
+            logger.warning(f"Erro na validação do lote: {err.message}")
+            raise
+        except Exception as e:
+            logger.error(f"Erro inesperado ao criar avaliações em lote: {e}")
+            raise InternalServerError("Erro inesperado ao criar avaliações em lote.")
+
+    @staticmethod
+    def _batch_error(error):
+        return {"status": "erro", "error_type": type(error).__name__, "message": getattr(error, "message", str(error))}
+
+    def _create_batch_item(self, app, projeto_id, job_id, texto_extraido):
+        """Avalia um projeto do lote em uma thread própria, com app context e sessão do banco independentes.
+        O texto já vem da consulta em lote; só projetos sem texto armazenado são buscados e extraídos.
+        Ao final, o job que reservou o projeto é concluído ou, em caso de erro, marcado como falho."""
+        with app.app_context():
+            metricas = self.ia_service.nova_metrica("lote")
+            lease = ReviewJobLease(app, job_id, 1)
+            try:
+                with lease:
+                    if texto_extraido and texto_extraido.strip():
+                        metricas.texto_armazenado = True
+                        projeto_texto = texto_extraido
+                    else:
+                        projeto_texto = self.ia_service.obter_texto_projeto(projeto_id, metricas)
+                    feedback_qualitativo = self.ia_service.enviar_para_analise(projeto_texto, metricas)
+
+                    try:
+                        avaliacao_data = self.schema.load({
+                            "projeto_id": str(projeto_id),
+                            "feedback_qualitativo": feedback_qualitativo
+                        })
+                    except marshmallow.exceptions.ValidationError as marshmallow_error:
+                        ErrorHandler.handle_marshmallow_errors(marshmallow_error.messages)
+
+                    lease.ensure(commit=False)
+                    avaliacao = ReviewRepository.create(avaliacao_data)
+
+                lease.finish(avaliacao.id)
+                self.metric_service.record(metricas, projeto_id, avaliacao=avaliacao)
+                logger.info(f"Avaliação em lote criada com sucesso para o projeto {projeto_id}.")
+                return {"status": "criada", "avaliacao": avaliacao.to_dict()}
+            except AppError as err:
+                logger.warning(f"Falha ao avaliar o projeto {projeto_id} no lote: {err.message}")
+                db.session.rollback()
+                lease.fail(err.message)
+                self.metric_service.record(metricas, projeto_id, erro=err)
+                return self._batch_error(err)
+            except Exception as e:
+                logger.error(f"Erro inesperado ao avaliar o projeto {projeto_id} no lote: {e}")
+                db.session.rollback()
+                lease.fail("Erro inesperado ao criar avaliação.")
+                self.metric_service.record(metricas, projeto_id, erro=e)
+                return self._batch_error(InternalServerError("Erro inesperado ao criar avaliação."))
+
+    def stream(self, projeto_id):
+        """Valida o projeto e retorna um gerador de eventos SSE com a avaliação gerada em streaming.
+
+        As validações e a reserva do projeto (um job de avaliação em processamento, como no lote) rodam
+        antes do início da resposta, para que erros cheguem com o status HTTP correto; a extração de
+        texto e a chamada à IA acontecem já dentro do stream.
+        """
+        try:
+            if not projeto_id or not isinstance(projeto_id, str):
+                raise ValidationError(field="projeto_id", message="ID inválido.")
+
+            projeto = ProjectRepository.get_by_id(projeto_id)
+
+            if projeto.avaliacao:
+                logger.warning(f"Projeto {projeto_id} já possui uma avaliação.")
+                raise ConflictError(resource="Projeto", message="O projeto já possui uma avaliação.")
+
+            job_id = ReviewJobRepository.reserve([projeto.id], "avaliação em streaming").get(projeto.id)
+            if not job_id:
+                logger.warning(f"Projeto {projeto_id} já possui uma avaliação em andamento.")
+                raise ConflictError(resource="Job de avaliação", message="O projeto já possui uma avaliação em andamento.")
+
+            return self._stream_events(projeto.id, ReviewJobLease(current_app._get_current_object(), job_id, 1))
+
+        except (ValidationError, NotFoundError, ConflictError):
+            raise
+        except Exception as e:
+            logger.error(f"Erro inesperado ao iniciar avaliação em streaming: {e}")
+            raise InternalServerError("Erro inesperado ao iniciar avaliação.")
+
+    @staticmethod
+    def _sse(evento, dados):
+        return f"event: {evento}\ndata: {json.dumps(dados, ensure_ascii=False)}\n\n"
+
+    def _stream_events(self, projeto_id, lease):
+        """Gera os eventos SSE: status, tokens da IA e, ao final, a avaliação persistida.
+        O job que reservou o projeto é concluído com a avaliação ou, se o stream falhar ou for
+        interrompido pelo cliente, liberado como falho no `finally`."""
+        metricas = self.ia_service.nova_metrica("stream")
+        avaliacao = None
+        motivo = "Avaliação em streaming interrompida."
+        try:
+            with lease:
+                yield self._sse("status", {"etapa": "extraindo texto"})
+                projeto_texto = self.ia_service.obter_texto_projeto(projeto_id, metricas)
+
+                yield self._sse("status", {"etapa": "analisando com IA"})
+                partes = []
+                for conteudo in self.ia_service.enviar_para_analise_stream(projeto_texto, metricas):
+                    partes.append(conteudo)
+                    yield self._sse("token", {"conteudo": conteudo})
+
+                try:
+                    avaliacao_data = self.schema.load({
+                        "projeto_id": str(projeto_id),
+                        "feedback_qualitativo": "".join(partes)
+                    })
+                except marshmallow.exceptions.ValidationError as marshmallow_error:
+                    ErrorHandler.handle_marshmallow_errors(marshmallow_error.messages)
+
+                lease.ensure(commit=False)
+                avaliacao = ReviewRepository.create(avaliacao_data)
+                lease.finish(avaliacao.id)
+
+            self.metric_service.record(metricas, projeto_id, avaliacao=avaliacao)
+            logger.info(f"Avaliação em streaming criada com sucesso para o projeto {projeto_id}.")
+            yield self._sse("concluido", avaliacao.to_dict())
+
+        except AppError as err:
+            logger.warning(f"Avaliação em streaming interrompida ({type(err).__name__}): {err.message}")
+            motivo = err.message
+            self.metric_service.record(metricas, projeto_id, erro=err)
+            yield self._sse("erro", {"error_type": type(err).__name__, "message": err.message})
+        except Exception as e:
+            logger.error(f"Erro inesperado durante avaliação em streaming: {e}")
+            motivo = "Erro inesperado ao criar avaliação."
+            self.metric_service.record(metricas, projeto_id, erro=e)
+            yield self._sse("erro", {"error_type": "Exception", "message": "Internal server error"})
+        finally:
+            if avaliacao is None:
+                db.session.rollback()
+                lease.fail(motivo)
+
     def update(self, review_id, data):
         """Atualiza os dados de uma avaliação existente."""
         try:
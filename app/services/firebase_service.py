@@ -1,68 +1,199 @@
 import firebase_admin
-from firebase_admin import credentials, storage, exceptions
+from firebase_admin import credentials, exceptions
+from google.api_core import exceptions as google_exceptions
+from google.auth.transport.requests import AuthorizedSession
+from google.cloud import storage as gcs
+from requests.adapters import HTTPAdapter
 import os
 import logging
-from app.erros.custom_errors import InternalServerError, ExternalAPIError
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+from app.config.config import Config
+from app.services.storage_backend import StorageBackend
+from app.erros.custom_errors import AppError, InternalServerError, ExternalAPIError, ValidationError
 
 logger = logging.getLogger(__name__)
 
-cred = credentials.Certificate(os.getenv('FIREBASE_CONFIG'))
-firebase_admin.initialize_app(cred, {'storageBucket': os.getenv('STORAGE_BUCKET')})
 
-class FirebaseService:
-    
+class FirebaseService(StorageBackend):
+    name = "firebase"
+    _bucket = None
+    _bucket_lock = threading.Lock()
+
     @staticmethod
-    def upload_file(file_path, file_name):
+    def _get_app():
+        """App do Firebase, inicializado na primeira utilização (e não na importação do módulo)."""
         try:
-            bucket = storage.bucket()
-            if not bucket.exists():
-                raise exceptions.NotFoundError("O bucket especificado não existe.")
+            return firebase_admin.get_app()
+        except ValueError:
+            cred = credentials.Certificate(os.getenv('FIREBASE_CONFIG'))
+            return firebase_admin.initialize_app(cred, {'storageBucket': os.getenv('STORAGE_BUCKET')})
 
-            blob = bucket.blob(file_name)
-            blob.upload_from_filename(file_path)
-            blob.make_public()  
-            logger.info(f"Arquivo '{file_name}' enviado com sucesso. URL: {blob.public_url}")
-            return blob.public_url
+    @classmethod
+    def get_bucket(cls):
+        """Bucket do app, criado uma única vez por processo.
+
+        O cliente de storage usa uma sessão HTTP autenticada com pool de conexões (FIREBASE_POOL_SIZE),
+        reaproveitada por todos os uploads e downloads, e a existência do bucket é verificada só na
+        primeira utilização (uma falha nessa verificação é repetida na chamada seguinte).
+        """
+        if cls._bucket is not None:
+            return cls._bucket
+        with cls._bucket_lock:
+            if cls._bucket is None:
+                app = FirebaseService._get_app()
+                credential = app.credential.get_credential()
+                session = AuthorizedSession(credential)
+                adapter = HTTPAdapter(pool_connections=Config.FIREBASE_POOL_SIZE, pool_maxsize=Config.FIREBASE_POOL_SIZE)
+                session.mount("https://", adapter)
+                client = gcs.Client(project=app.project_id, credentials=credential, _http=session)
+                bucket = client.bucket(app.options.get('storageBucket'))
+                if not bucket.exists():
+                    raise exceptions.NotFoundError("O bucket especificado não existe.")
+                cls._bucket = bucket
+                logger.info(f"Bucket '{bucket.name}' verificado; cliente de storage reutilizável criado.")
+        return cls._bucket
+
+    @staticmethod
+    @contextmanager
+    def _storage_errors(file_name, action):
+        """Converte os erros do Firebase/Cloud Storage nos erros da aplicação."""
+        try:
+            yield
+        except AppError:
+            raise
 
-        except exceptions.NotFoundError as e:
+        except (exceptions.NotFoundError, google_exceptions.NotFound) as e:
             logger.error(f"Bucket não encontrado para o arquivo '{file_name}'. Detalhes: {e}")
-            raise ExternalAPIError(service="Firebase", message="Bucket não encontrado.") from e
+            raise ExternalAPIError(service="Firebase", message="Bucket não encontrado.", retryable=False) from e
 
-        except exceptions.PermissionDeniedError as e:
-            logger.error(f"Permissão negada para acessar o bucket ao enviar '{file_name}'. Detalhes: {e}")
-            raise ExternalAPIError(service="Firebase", message="Permissão negada.") from e
+        except (exceptions.PermissionDeniedError, google_exceptions.Forbidden) as e:
+            logger.error(f"Permissão negada para acessar o bucket ao {action} '{file_name}'. Detalhes: {e}")
+            raise ExternalAPIError(service="Firebase", message="Permissão negada.", retryable=False) from e
 
-        except exceptions.FirebaseError as e:
-            logger.error(f"Erro geral do Firebase ao enviar '{file_name}'. Detalhes: {e}")
+        except (exceptions.FirebaseError, google_exceptions.GoogleAPIError) as e:
+            logger.error(f"Erro geral do Firebase ao {action} '{file_name}'. Detalhes: {e}")
             raise ExternalAPIError(service="Firebase", message=f"Erro do Firebase: {e}") from e
 
         except Exception as e:
-            logger.error(f"Erro inesperado ao fazer upload do arquivo '{file_name}'. Detalhes: {e}")
-            raise InternalServerError("Erro inesperado ao fazer upload do arquivo.") from e
+            logger.error(f"Erro inesperado ao {action} o arquivo '{file_name}'. Detalhes: {e}")
+            raise InternalServerError(f"Erro inesperado ao {action} o arquivo.") from e
+
+    @staticmethod
+    def upload_file(file_path, file_name):
+        with open(file_path, "rb") as file_obj:
+            return FirebaseService.upload_stream(file_obj, file_name)
 
+    @staticmethod
+    def upload_stream(file_obj, file_name, content_type=None, public=True):
+        """Envia o conteúdo de um objeto arquivo em um upload resumível, em blocos de
+        FIREBASE_UPLOAD_CHUNK_SIZE bytes, sem copiá-lo antes para a memória ou para o disco.
+        Com `public=False` o objeto fica privado (ex.: quarentena)."""
+        with FirebaseService._storage_errors(file_name, "enviar"):
+            bucket = FirebaseService.get_bucket()
+
+            blob = bucket.blob(file_name, chunk_size=Config.FIREBASE_UPLOAD_CHUNK_SIZE)
+            blob.upload_from_file(file_obj, rewind=True, content_type=content_type)
+            if public:
+                blob.make_public()
+            logger.info(f"Arquivo '{file_name}' enviado com sucesso. URL: {blob.public_url}")
+            return blob.public_url
+
+    @staticmethod
+    def exists(file_name):
+        """Indica se o objeto existe no bucket (uma consulta de metadados)."""
+        with FirebaseService._storage_errors(file_name, "consultar"):
+            return FirebaseService.get_bucket().get_blob(file_name) is not None
 
     @staticmethod
     def download_file(file_name, destination):
-        try:
-            bucket = storage.bucket()
-            if not bucket.exists():
-                raise exceptions.NotFoundError("O bucket especificado não existe.")
+        with FirebaseService._storage_errors(file_name, "baixar"):
+            bucket = FirebaseService.get_bucket()
 
             blob = bucket.blob(file_name)
             blob.download_to_filename(destination)
 
-        except exceptions.NotFoundError as e:
-            logger.error(f"Bucket não encontrado para o arquivo '{file_name}'. Detalhes: {e}")
-            raise ExternalAPIError(service="Firebase", message="Bucket não encontrado.") from e
+    @staticmethod
+    def generate_upload_url(file_name, content_type, expires_in, max_bytes):
+        """URL assinada (V4) para o cliente enviar o arquivo com PUT direto ao bucket.
 
-        except exceptions.PermissionDeniedError as e:
-            logger.error(f"Permissão negada para acessar o bucket ao enviar '{file_name}'. Detalhes: {e}")
-            raise ExternalAPIError(service="Firebase", message="Permissão negada.") from e
+        A URL vale por `expires_in` minutos e exige os cabeçalhos Content-Type e
+        x-goog-content-length-range, que limita o tamanho aceito pelo storage a `max_bytes`.
+        """
+        with FirebaseService._storage_errors(file_name, "assinar o upload de"):
+            blob = FirebaseService.get_bucket().blob(file_name)
+            headers = {"x-goog-content-length-range": f"0,{max_bytes}"}
+            url = blob.generate_signed_url(
+                version="v4", expiration=timedelta(minutes=expires_in), method="PUT",
+                content_type=content_type, headers=headers
+            )
+            logger.info(f"URL de upload assinada gerada para '{file_name}' (válida por {expires_in} minutos).")
+            return url, {"Content-Type": content_type, **headers}
 
-        except exceptions.FirebaseError as e:
-            logger.error(f"Erro geral do Firebase ao enviar '{file_name}'. Detalhes: {e}")
-            raise ExternalAPIError(service="Firebase", message=f"Erro do Firebase: {e}") from e
+    @staticmethod
+    def read_upload(file_name, max_bytes):
+        """Baixa uma única vez o arquivo enviado pelo cliente, recusando-o se não existir ou se
+        ultrapassar `max_bytes` (nesse caso o objeto é removido sem ser baixado)."""
+        with FirebaseService._storage_errors(file_name, "baixar"):
+            blob = FirebaseService.get_bucket().get_blob(file_name)
+            if blob is None:
+                raise ValidationError(field="arquivo", message="Arquivo não encontrado. Envie o arquivo antes de finalizar.")
+            if blob.size is not None and blob.size > max_bytes:
+                blob.delete()
+                raise ValidationError(field="arquivo", message="O arquivo excede o tamanho máximo permitido.")
+            return blob.download_as_bytes()
 
-        except Exception as e:
-            logger.error(f"Erro inesperado ao fazer upload do arquivo '{file_name}'. Detalhes: {e}")
-            raise InternalServerError("Erro inesperado ao fazer upload do arquivo.") from e    
+    @staticmethod
+    def upload_stream_if_absent(file_obj, file_name, content_type=None, public=True):
+        """Como upload_stream, mas só transfere o conteúdo se o objeto ainda não existir no bucket
+        (uma consulta de metadados). A criação é condicional (if_generation_match=0), então dois envios
+        simultâneos do mesmo objeto não se sobrescrevem. Com `public=True`, um objeto já existente também
+        é tornado público (ele pode ter sido gravado privado, por exemplo no modo redact)."""
+        with FirebaseService._storage_errors(file_name, "enviar"):
+            bucket = FirebaseService.get_bucket()
+            blob = bucket.get_blob(file_name)
+            if blob is not None:
+                logger.info(f"Arquivo '{file_name}' já existe no bucket; envio ignorado.")
+            else:
+                blob = bucket.blob(file_name, chunk_size=Config.FIREBASE_UPLOAD_CHUNK_SIZE)
+                try:
+                    blob.upload_from_file(file_obj, rewind=True, content_type=content_type, if_generation_match=0)
+                    logger.info(f"Arquivo '{file_name}' enviado com sucesso.")
+                except google_exceptions.PreconditionFailed:
+                    logger.info(f"Arquivo '{file_name}' enviado por outra requisição ao mesmo tempo.")
+            if public:
+                blob.make_public()
+            return blob.public_url
+
+    @staticmethod
+    def move_if_absent(source_name, file_name, public=True):
+        """Move um objeto do bucket para `file_name` sem trafegar o conteúdo pela API (cópia no próprio
+        storage); se o destino já existir, apenas remove a origem. Retorna a URL pública do destino
+        (com `public=False` o objeto copiado continua privado, como o da quarentena; com `public=True`,
+        um destino já existente também é tornado público)."""
+        with FirebaseService._storage_errors(file_name, "mover"):
+            bucket = FirebaseService.get_bucket()
+            blob = bucket.get_blob(file_name)
+            if blob is None:
+                try:
+                    blob = bucket.copy_blob(bucket.blob(source_name), bucket, file_name, if_generation_match=0)
+                    logger.info(f"Arquivo '{source_name}' movido para '{file_name}'.")
+                except google_exceptions.PreconditionFailed:
+                    blob = bucket.blob(file_name)
+            else:
+                logger.info(f"Arquivo '{file_name}' já existe no bucket; cópia ignorada.")
+            if public:
+                blob.make_public()
+            FirebaseService.delete_file(source_name)
+            return blob.public_url
+
+    @staticmethod
+    def delete_file(file_name):
+        """Remove o arquivo do bucket; um arquivo inexistente é ignorado."""
+        with FirebaseService._storage_errors(file_name, "remover"):
+            try:
+                FirebaseService.get_bucket().blob(file_name).delete()
+                logger.info(f"Arquivo '{file_name}' removido do bucket.")
+            except google_exceptions.NotFound:
+                logger.info(f"Arquivo '{file_name}' já não existia no bucket.")
@@ -1,16 +1,43 @@
-import openai
 import requests
-from io import BytesIO
-import os
+import random
 import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from app.config.config import Config
 from app.repositories.projeto_repository import ProjectRepository
+from app.services.analise_cache_service import AnalysisCacheService
+from app.services.llm_backend import LLMBackendError, create_llm_backend
+from app.utils.blob_cache import BlobCache
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.review_metrics import ReviewMetrics
+from app.utils.sensitive_scanner import sensitive_scanner
 from app.utils.text_extractor import TextExtractor
 from app.erros.custom_errors import NotFoundError, ValidationError, InternalServerError, ExternalAPIError
 
-openai.api_key = os.environ.get('OPENAI_KEY')
 logger = logging.getLogger(__name__)
 
+# backend de LLM escolhido por LLM_BACKEND (API da OpenAI ou stub local para testes de carga)
+llm_backend = create_llm_backend()
+
+# compartilhado por todas as threads do processo (requests, workers e map-reduce)
+openai_circuit_breaker = CircuitBreaker(
+    service=llm_backend.name,
+    failure_rate_threshold=Config.IA_BREAKER_FAILURE_RATE,
+    window_size=Config.IA_BREAKER_WINDOW,
+    min_calls=Config.IA_BREAKER_MIN_CALLS,
+    open_seconds=Config.IA_BREAKER_OPEN_SECONDS
+)
+
+# arquivos de projetos baixados do storage, revalidados por ETag/Last-Modified
+project_file_cache = BlobCache(
+    directory=Config.BLOB_CACHE_DIR,
+    max_bytes=Config.BLOB_CACHE_MAX_BYTES,
+    connect_timeout=Config.BLOB_CACHE_CONNECT_TIMEOUT,
+    read_timeout=Config.BLOB_CACHE_READ_TIMEOUT,
+    pool_size=Config.BLOB_CACHE_POOL_SIZE
+)
+
 class IaService:
     PONTOS_ANALISE = [
         "Mérito da Inovação",
@@ -34,42 +61,93 @@ class IaService:
         "Recomendações de melhoria"
     ]
     MAX_RETRIES = 3
+    MODEL = Config.OPENAI_MODEL
+    SYSTEM_PROMPT = "Você é um assistente especializado em avaliar projetos de inovação tecnológica."
+    CHARS_PER_TOKEN = 3
+    PROMPT_OVERHEAD_TOKENS = 600  # prompt de sistema, instruções e lista de pontos de análise
+    PROMPT_ANALISE = "Texto do projeto para análise:\n\n{texto}\n\nPontos a serem analisados:\n{pontos}"
+    PROMPT_TRECHO = (
+        "O texto abaixo é o trecho {indice} de {total} de um mesmo projeto. "
+        "Registre de forma objetiva as evidências encontradas neste trecho para cada ponto de análise, "
+        "omitindo pontos sem evidência. Não emita conclusões sobre o projeto como um todo.\n\n"
+        "Trecho:\n\n{trecho}\n\nPontos a serem analisados:\n{pontos}"
+    )
+    PROMPT_AGRUPAMENTO = (
+        "Consolide as evidências parciais abaixo, de trechos consecutivos de um mesmo projeto, "
+        "mantendo-as organizadas por ponto de análise e sem descartar informações relevantes.\n\n{parciais}"
+    )
+    PROMPT_CONSOLIDACAO = (
+        "O projeto foi analisado em trechos. Com base nas análises parciais abaixo, produza a avaliação "
+        "final do projeto como um todo, respondendo a cada um dos pontos de análise.\n\n"
+        "{evidencias}\n\nPontos a serem analisados:\n{pontos}"
+    )
 
-    def __init__(self, projeto_repository=ProjectRepository()):
+    def __init__(self, projeto_repository=ProjectRepository(), analysis_cache=None, backend=None, aguardar_retentativas=False):
         self.projeto_repository = projeto_repository
+        self.analysis_cache = analysis_cache or AnalysisCacheService()
+        self.backend = backend or llm_backend
+        # só os workers da fila esperam entre tentativas; threads de request (streaming, lote) falham na hora
+        self.aguardar_retentativas = aguardar_retentativas
 
-    def obter_texto_projeto(self, project_id):
-        """Obtém e extrai o texto do arquivo do projeto para análise."""
+    def nova_metrica(self, origem):
+        """Coletor de métricas de uma avaliação, já identificado com o modelo e o backend em uso."""
+        return ReviewMetrics(origem, modelo=self.MODEL, backend=self.backend.name)
+
+    def obter_texto_projeto(self, project_id, metricas=None):
+        """Obtém o texto do projeto para análise, reaproveitando o texto extraído no upload."""
         projeto = self.projeto_repository.get_by_id(project_id)
         if not projeto:
             logger.warning(f"Projeto com ID {project_id} não encontrado.")
             raise NotFoundError("Projeto", "Projeto não encontrado")
-        
-        if not projeto.arquivo or not isinstance(projeto.arquivo, str):
+
+        return self.texto_do_projeto(projeto, metricas)
+
+    def texto_do_projeto(self, projeto, metricas=None):
+        """Retorna o texto armazenado do projeto; projetos anteriores ao armazenamento têm o
+        arquivo baixado e extraído uma única vez, e o texto é gravado para as próximas análises."""
+        if projeto.texto_extraido and projeto.texto_extraido.strip():
+            logger.info(f"Usando texto armazenado do projeto ID {projeto.id}.")
+            if metricas:
+                metricas.texto_armazenado = True
+            return projeto.texto_extraido
+
+        texto = self.extrair_texto_arquivo(projeto.id, projeto.arquivo, metricas)
+        try:
+            projeto.texto_extraido = texto
+            self.projeto_repository.update(projeto)
+        except InternalServerError as e:
+            logger.warning(f"Não foi possível armazenar o texto extraído do projeto {projeto.id}: {e.message}")
+        return texto
+
+    def extrair_texto_arquivo(self, project_id, arquivo, metricas=None):
+        """Baixa (via cache local de arquivos) e extrai o texto do arquivo de um projeto já carregado."""
+        if not arquivo or not isinstance(arquivo, str):
             logger.error(f"O caminho do arquivo é inválido para o projeto {project_id}.")
             raise ValidationError("arquivo", "Caminho do arquivo inválido.")
         
+        metricas = metricas or self.nova_metrica("avulsa")
         try:
-            response = requests.get(projeto.arquivo)
-            if response.status_code != 200:
-                logger.error(f"Erro ao baixar o arquivo: {response.status_code}")
-                raise ValidationError("arquivo", "Não foi possível baixar o arquivo do projeto.")
-
-            file_content = BytesIO(response.content)  
-
-            if projeto.arquivo.endswith('.pdf'):
+            if arquivo.endswith('.pdf'):
                 file_type = "pdf"
-            elif projeto.arquivo.endswith(('.doc', '.docx')):
+            elif arquivo.endswith(('.doc', '.docx')):
                 file_type = "docx"
             else:
-                logger.error(f"Tipo de arquivo não suportado: {projeto.arquivo}")
+                logger.error(f"Tipo de arquivo não suportado: {arquivo}")
                 raise ValidationError("arquivo", "Tipo de arquivo não suportado para análise.")
-            
-            texto = TextExtractor.extract_text(file_content.read(), file_type)
+
+            with metricas.measure("download"):
+                with project_file_cache.open(arquivo) as file_content:
+                    conteudo = file_content.read()
+
+            with metricas.measure("extracao"):
+                texto = TextExtractor.extract_text(conteudo, file_type)
 
             if not texto.strip():
                 logger.error(f"O arquivo do projeto {project_id} não contém texto válido.")
                 raise ValidationError("arquivo", "O arquivo do projeto não contém texto válido para análise.")
+
+            if Config.SENSITIVE_DATA_MODE == "redact":
+                texto = sensitive_scanner.redact(texto)  # o arquivo original não passou pela validação atual
             
             logger.info(f"Texto extraído com sucesso para o projeto ID {project_id}.")
             return texto
@@ -83,28 +161,253 @@ class IaService:
             logger.error(f"Erro ao processar o arquivo do projeto {project_id}: {e}")
             raise InternalServerError("Erro ao processar o arquivo do projeto.")
 
-    def enviar_para_analise(self, projeto_texto):
-        """Envia o texto do projeto para a API do ChatGPT para avaliação."""
+    def _cache_lookup(self, projeto_texto):
+        """Retorna (entrada do cache, feedback em cache ou None)."""
+        if not Config.IA_CACHE_ENABLED:
+            return None, None
+        cache_entry = AnalysisCacheService.build_entry(
+            projeto_texto, self.MODEL, self.PONTOS_ANALISE, self._configuracao_prompt()
+        )
+        return cache_entry, self.analysis_cache.get(cache_entry)
+
+    @classmethod
+    def _configuracao_prompt(cls):
+        """Tudo, além do texto, do modelo e dos pontos, que altera a análise gerada: prompts e divisão em trechos."""
+        return {
+            "system_prompt": cls.SYSTEM_PROMPT,
+            "prompts": [cls.PROMPT_ANALISE, cls.PROMPT_TRECHO, cls.PROMPT_AGRUPAMENTO, cls.PROMPT_CONSOLIDACAO],
+            "chars_por_token": cls.CHARS_PER_TOKEN,
+            "overhead_tokens": cls.PROMPT_OVERHEAD_TOKENS,
+            "context_tokens": Config.IA_CONTEXT_TOKENS,
+            "max_output_tokens": Config.IA_MAX_OUTPUT_TOKENS,
+            "chunk_tokens": Config.IA_CHUNK_TOKENS,
+            "chunk_output_tokens": Config.IA_CHUNK_OUTPUT_TOKENS
+        }
+
+    def enviar_para_analise(self, projeto_texto, metricas=None):
+        """Envia o texto do projeto para a API do ChatGPT para avaliação, reaproveitando análises em cache."""
+        metricas = metricas or self.nova_metrica("avulsa")
+        with metricas.measure("llm"):
+            cache_entry, cached_feedback = self._cache_lookup(projeto_texto)
+            if cached_feedback:
+                metricas.cache_hit = True
+                return cached_feedback
+
+            mensagens = self._preparar_mensagens(projeto_texto, metricas)
+            feedback = self._chamar_api(mensagens, Config.IA_MAX_OUTPUT_TOKENS, metricas)
+
+        if cache_entry:
+            self.analysis_cache.put(cache_entry, feedback)
+        return feedback
+
+    def enviar_para_analise_stream(self, projeto_texto, metricas=None):
+        """Versão em streaming de enviar_para_analise: gera os trechos da resposta conforme chegam da API.
+        O tempo de LLM inclui o consumo do stream pelo cliente."""
+        metricas = metricas or self.nova_metrica("avulsa")
+        with metricas.measure("llm"):
+            cache_entry, cached_feedback = self._cache_lookup(projeto_texto)
+            if cached_feedback:
+                metricas.cache_hit = True
+                yield cached_feedback
+                return
+
+            partes = []
+            mensagens = self._preparar_mensagens(projeto_texto, metricas)
+            for conteudo in self._stream_api(mensagens, Config.IA_MAX_OUTPUT_TOKENS, metricas):
+                partes.append(conteudo)
+                yield conteudo
+
+        if cache_entry:
+            self.analysis_cache.put(cache_entry, "".join(partes))
+
+    @classmethod
+    def _estimar_tokens(cls, texto):
+        """Estimativa conservadora de tokens: CHARS_PER_TOKEN (3) caracteres por token, abaixo da média do português."""
+        return len(texto) // cls.CHARS_PER_TOKEN + 1
+
+    @classmethod
+    def _orcamento_entrada(cls):
+        """Tokens disponíveis para o texto em uma chamada, descontando prompt fixo e resposta."""
+        return Config.IA_CONTEXT_TOKENS - Config.IA_MAX_OUTPUT_TOKENS - cls.PROMPT_OVERHEAD_TOKENS
+
+    def _pontos_formatados(self):
+        return "- " + "\n- ".join(self.PONTOS_ANALISE)
+
+    def _preparar_mensagens(self, projeto_texto, metricas):
+        """Monta as mensagens da chamada final: o texto completo ou, se exceder o contexto,
+        as análises parciais dos trechos (etapa map, executada aqui em paralelo)."""
+        if self._estimar_tokens(projeto_texto) <= self._orcamento_entrada():
+            return [
+                {"role": "system", "content": self.SYSTEM_PROMPT},
+                {"role": "user", "content": self.PROMPT_ANALISE.format(texto=projeto_texto, pontos=self._pontos_formatados())}
+            ]
+
+        trechos = self._dividir_texto(projeto_texto, Config.IA_CHUNK_TOKENS)
+        logger.info(f"Texto excede o contexto do modelo; analisando {len(trechos)} trechos em paralelo.")
+        parciais = self._mapear(partial(self._analisar_trecho, metricas=metricas), trechos)
+        return self._mensagens_consolidacao(parciais, metricas)
+
+    def _mapear(self, funcao, itens):
+        """Executa `funcao(indice, total, item)` em paralelo, limitado por IA_MAX_CONCURRENCY, preservando a ordem."""
+        total = len(itens)
+        max_workers = max(1, min(Config.IA_MAX_CONCURRENCY, total))
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ia-map") as executor:
+            futures = [executor.submit(funcao, indice, total, item) for indice, item in enumerate(itens, 1)]
+            return [future.result() for future in futures]
+
+    @classmethod
+    def _dividir_texto(cls, texto, max_tokens):
+        """Divide o texto em trechos de até `max_tokens`, preferindo quebras de parágrafo e de palavra."""
+        limite = max_tokens * cls.CHARS_PER_TOKEN
+        trechos, atual, tamanho = [], [], 0
+
+        for paragrafo in texto.split("\n"):
+            while len(paragrafo) > limite:
+                corte = paragrafo.rfind(" ", 0, limite)
+                corte = corte if corte > 0 else limite
+                pedaco, paragrafo = paragrafo[:corte], paragrafo[corte:].lstrip()
+                if atual:
+                    trechos.append("\n".join(atual))
+                    atual, tamanho = [], 0
+                trechos.append(pedaco)
+
+            if tamanho + len(paragrafo) + 1 > limite and atual:
+                trechos.append("\n".join(atual))
+                atual, tamanho = [], 0
+            atual.append(paragrafo)
+            tamanho += len(paragrafo) + 1
+
+        if atual and "".join(atual).strip():
+            trechos.append("\n".join(atual))
+        return trechos
+
+    def _analisar_trecho(self, indice, total, trecho, metricas):
+        """Etapa map: levanta evidências de um trecho para cada ponto de análise."""
+        return self._chamar_api(
+            [
+                {"role": "system", "content": self.SYSTEM_PROMPT},
+                {"role": "user", "content": self.PROMPT_TRECHO.format(
+                    indice=indice, total=total, trecho=trecho, pontos=self._pontos_formatados()
+                )}
+            ],
+            Config.IA_CHUNK_OUTPUT_TOKENS,
+            metricas
+        )
+
+    def _agrupar_parciais(self, indice, total, parciais, metricas):
+        """Etapa de redução intermediária, usada quando as análises parciais não cabem em uma chamada."""
+        return self._chamar_api(
+            [
+                {"role": "system", "content": self.SYSTEM_PROMPT},
+                {"role": "user", "content": self.PROMPT_AGRUPAMENTO.format(parciais="\n\n---\n\n".join(parciais))}
+            ],
+            Config.IA_CHUNK_OUTPUT_TOKENS,
+            metricas
+        )
+
+    def _mensagens_consolidacao(self, parciais, metricas):
+        """Etapa reduce: agrupa as análises parciais até caberem no contexto e monta o pedido do relatório final."""
+        orcamento = self._orcamento_entrada()
+        while len(parciais) > 1 and self._estimar_tokens("".join(parciais)) > orcamento:
+            grupos, grupo = [], []
+            for parcial in parciais:
+                if grupo and self._estimar_tokens("".join(grupo + [parcial])) > orcamento:
+                    grupos.append(grupo)
+                    grupo = []
+                grupo.append(parcial)
+            grupos.append(grupo)
+            if len(grupos) == len(parciais):
+                break  # cada parcial já ocupa o orçamento sozinha; não há como agrupar mais
+            parciais = self._mapear(partial(self._agrupar_parciais, metricas=metricas), grupos)
+
+        evidencias = "\n\n".join(
+            f"Análise parcial {indice}:\n{parcial}" for indice, parcial in enumerate(parciais, 1)
+        )
+        return [
+            {"role": "system", "content": self.SYSTEM_PROMPT},
+            {"role": "user", "content": self.PROMPT_CONSOLIDACAO.format(evidencias=evidencias, pontos=self._pontos_formatados())}
+        ]
+
+    @classmethod
+    def _calcular_espera(cls, attempt, error):
+        """Backoff exponencial com jitter total, respeitando o mínimo indicado pelo serviço."""
+        espera = random.uniform(0, min(Config.IA_RETRY_MAX_DELAY, Config.IA_RETRY_BASE_DELAY * 2 ** attempt))
+        if error.retry_after is not None:
+            espera = max(espera, error.retry_after)
+        return espera
+
+    def _tokens_mensagens(self, messages):
+        return sum(self._estimar_tokens(message["content"]) for message in messages)
+
+    def _chamar_api(self, messages, max_tokens, metricas):
+        """Chama o backend de LLM e retorna o conteúdo completo da resposta, registrando o uso de tokens."""
+        resultado = self._executar_com_retentativas(self.backend.complete, messages, max_tokens, metricas)
+        if resultado.prompt_tokens is None or resultado.completion_tokens is None:
+            metricas.add_usage(self._tokens_mensagens(messages), self._estimar_tokens(resultado.content), estimated=True)
+        else:
+            metricas.add_usage(resultado.prompt_tokens, resultado.completion_tokens)
+        logger.info(f"Análise realizada com sucesso pelo backend {self.backend.name}.")
+        return resultado.content
+
+    def _stream_api(self, messages, max_tokens, metricas):
+        """Chama o backend de LLM em modo streaming e gera o conteúdo de cada delta.
+
+        As novas tentativas valem apenas para abrir o stream; uma falha após o primeiro
+        token interrompe a geração com ExternalAPIError.
+        """
+        deltas = self._executar_com_retentativas(self.backend.stream, messages, max_tokens, metricas)
+        partes = []
+        try:
+            for conteudo in deltas:
+                partes.append(conteudo)
+                yield conteudo
+            # o streaming não informa o uso de tokens; registra uma estimativa
+            metricas.add_usage(self._tokens_mensagens(messages), self._estimar_tokens("".join(partes)), estimated=True)
+            logger.info(f"Análise em streaming concluída pelo backend {self.backend.name}.")
+        except LLMBackendError as e:
+            openai_circuit_breaker.record_failure()
+            logger.error(f"Stream do backend {self.backend.name} interrompido: {e.message}")
+            raise ExternalAPIError(service=self.backend.name, message=e.message, retryable=e.retryable)
+
+    def _executar_com_retentativas(self, operacao, messages, max_tokens, metricas):
+        """Executa `operacao` do backend protegida pelo circuit breaker, com backoff exponencial e jitter.
+
+        Só instâncias criadas com aguardar_retentativas=True (workers da fila) dormem entre as tentativas,
+        e no máximo IA_RETRY_MAX_WAIT segundos; se o serviço pedir mais tempo, a chamada falha com
+        ExternalAPIError(retry_after=...) para que a fila reagende a avaliação. Nas threads de request
+        (streaming, lote), a primeira falha transitória já retorna ExternalAPIError(retry_after=...),
+        sem prender a thread em `sleep`.
+        """
+        prazo = time.monotonic() + Config.IA_RETRY_MAX_WAIT
         for attempt in range(self.MAX_RETRIES):
+            openai_circuit_breaker.before_call()
             try:
-                response = openai.ChatCompletion.create(
-                    model="gpt-3.5-turbo",  
-                    messages=[
-                        {"role": "system", "content": "Você é um assistente especializado em avaliar projetos de inovação tecnológica."},
-                        {"role": "user", "content": f"Texto do projeto para análise:\n\n{projeto_texto}\n\nPontos a serem analisados:\n- " + "\n- ".join(self.PONTOS_ANALISE)}
-                    ],
-                    max_tokens=4000
-                )
-                logger.info("Análise realizada com sucesso pela API da OpenAI.")
-                return response.choices[0].message["content"]
-            except openai.error.OpenAIError as e:
-                logger.error(f"Erro ao acessar a API da OpenAI: {e}")
-                if attempt < self.MAX_RETRIES - 1:
-                    logger.info("Tentando novamente em 60 segundos...")
-                    time.sleep(30)
-                else:
+                resultado = operacao(messages, self.MODEL, max_tokens, Config.IA_REQUEST_TIMEOUT)
+                openai_circuit_breaker.record_success()
+                return resultado
+            except LLMBackendError as e:
+                if not e.retryable:
+                    # requisição inválida, autenticação etc.: o serviço respondeu, então não conta como falha no circuito
+                    openai_circuit_breaker.record_success()
+                    logger.error(f"Erro não recuperável do backend {self.backend.name}: {e.message}")
+                    raise ExternalAPIError(service=self.backend.name, message=e.message, retryable=False)
+
+                openai_circuit_breaker.record_failure()
+                espera = self._calcular_espera(attempt, e)
+                logger.error(f"Erro ao acessar o backend {self.backend.name}: {e.message}")
+                if attempt == self.MAX_RETRIES - 1:
                     logger.error("Número máximo de tentativas atingido. Não foi possível concluir a análise.")
-                    raise ExternalAPIError(service="OpenAI", message=str(e))
+                    raise ExternalAPIError(service=self.backend.name, message=e.message, retry_after=espera)
+                if not self.aguardar_retentativas:
+                    logger.warning(f"Falha transitória fora da fila de jobs; nova tentativa sugerida em {espera:.1f} segundos.")
+                    raise ExternalAPIError(service=self.backend.name, message=e.message, retry_after=espera)
+                if time.monotonic() + espera > prazo:
+                    logger.warning(f"Espera de {espera:.1f} segundos excede o limite do request; a avaliação será reagendada.")
+                    raise ExternalAPIError(service=self.backend.name, message=e.message, retry_after=espera)
+                logger.info(f"Tentando novamente em {espera:.1f} segundos...")
+                metricas.add_retry()
+                time.sleep(espera)
             except Exception as e:
-                logger.error(f"Erro inesperado ao acessar a API: {e}")
+                openai_circuit_breaker.record_failure()
+                logger.error(f"Erro inesperado ao acessar o backend {self.backend.name}: {e}")
                 raise InternalServerError("Erro inesperado ao acessar o serviço de IA.")
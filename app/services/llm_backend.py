@@ -0,0 +1,224 @@
+import json
+import logging
+import os
+import re
+from abc import ABC, abstractmethod
+import openai
+import requests
+from requests.adapters import HTTPAdapter
+from app.config.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class LLMBackendError(Exception):
+    """Falha normalizada de um backend de LLM.
+
+    `retryable` indica falhas transitórias (rate limit, 5xx, timeout, conexão) que justificam nova
+    tentativa e contam como falha no circuit breaker; `retry_after` é o tempo de espera sugerido
+    pelo serviço, em segundos, quando informado.
+    """
+    def __init__(self, message, retryable=False, retry_after=None):
+        self.message = message
+        self.retryable = retryable
+        self.retry_after = retry_after
+        super().__init__(self.message)
+
+
+def parse_duration(value):
+    """Converte durações de cabeçalhos ('20', '1.5s', '250ms', '6m0s') em segundos."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    match = re.fullmatch(r"(?:(\d+(?:\.\d+)?)h)?(?:(\d+(?:\.\d+)?)m(?!s))?(?:(\d+(?:\.\d+)?)s)?(?:(\d+(?:\.\d+)?)ms)?", value)
+    if not match or not any(match.groups()):
+        return None
+    horas, minutos, segundos, milissegundos = (float(group or 0) for group in match.groups())
+    return horas * 3600 + minutos * 60 + segundos + milissegundos / 1000
+
+
+def retry_after_from_headers(headers):
+    """Extrai o tempo de espera indicado pelo serviço (Retry-After ou cabeçalhos de rate limit)."""
+    headers = headers or {}
+    for header in ("retry-after", "x-ratelimit-reset-requests", "x-ratelimit-reset-tokens"):
+        segundos = parse_duration(headers.get(header) or headers.get(header.title()))
+        if segundos is not None:
+            return segundos
+    return None
+
+
+class LLMResult:
+    """Resposta completa de um backend: conteúdo e uso de tokens (None quando o serviço não informa)."""
+    def __init__(self, content, prompt_tokens=None, completion_tokens=None):
+        self.content = content
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+
+
+class LLMBackend(ABC):
+    """Interface dos backends de chat completion usados pelo IaService.
+
+    - `complete` retorna um LLMResult com o conteúdo completo e o uso de tokens;
+    - `stream` abre a geração (falhas de conexão surgem já na chamada) e retorna um iterador
+      com o conteúdo de cada delta.
+
+    Ambos levantam apenas LLMBackendError.
+    """
+    name = "LLM"
+
+    @abstractmethod
+    def complete(self, messages, model, max_tokens, timeout):
+        raise NotImplementedError
+
+    @abstractmethod
+    def stream(self, messages, model, max_tokens, timeout):
+        raise NotImplementedError
+
+
+class OpenAIBackend(LLMBackend):
+    """Backend da API da OpenAI (SDK openai 0.28)."""
+    name = "OpenAI"
+    RETRYABLE_ERRORS = (
+        openai.error.RateLimitError,
+        openai.error.APIError,
+        openai.error.Timeout,
+        openai.error.APIConnectionError,
+        openai.error.ServiceUnavailableError,
+        openai.error.TryAgain,
+    )
+
+    def __init__(self, api_key=None):
+        openai.api_key = api_key or os.environ.get('OPENAI_KEY')
+
+    def _normalize(self, error):
+        return LLMBackendError(
+            str(error),
+            retryable=isinstance(error, self.RETRYABLE_ERRORS),
+            retry_after=retry_after_from_headers(getattr(error, "headers", None))
+        )
+
+    def _create(self, messages, model, max_tokens, timeout, stream):
+        try:
+            return openai.ChatCompletion.create(
+                model=model,
+                messages=messages,
+                max_tokens=max_tokens,
+                request_timeout=timeout,
+                stream=stream
+            )
+        except openai.error.OpenAIError as e:
+            raise self._normalize(e)
+
+    def complete(self, messages, model, max_tokens, timeout):
+        response = self._create(messages, model, max_tokens, timeout, stream=False)
+        usage = response.get("usage") or {}
+        return LLMResult(
+            response.choices[0].message["content"],
+            usage.get("prompt_tokens"),
+            usage.get("completion_tokens")
+        )
+
+    def stream(self, messages, model, max_tokens, timeout):
+        return self._iter_deltas(self._create(messages, model, max_tokens, timeout, stream=True))
+
+    def _iter_deltas(self, response):
+        try:
+            for chunk in response:
+                conteudo = chunk.choices[0].delta.get("content") if chunk.choices else None
+                if conteudo:
+                    yield conteudo
+        except openai.error.OpenAIError as e:
+            raise self._normalize(e)
+
+
+class StubHTTPBackend(LLMBackend):
+    """Backend para o servidor local de testes (python -m app.utils.llm_stub_server).
+
+    Fala o mesmo formato de /v1/chat/completions da OpenAI, inclusive o streaming em
+    Server-Sent Events, de modo que todo o caminho de avaliação é exercitado sem custo nem rede.
+    """
+    name = "LLM stub"
+    RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+    def __init__(self, base_url, pool_size=10):
+        self.url = base_url.rstrip("/") + "/v1/chat/completions"
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _post(self, messages, model, max_tokens, timeout, stream):
+        try:
+            response = self.session.post(
+                self.url,
+                json={"model": model, "messages": messages, "max_tokens": max_tokens, "stream": stream},
+                timeout=timeout,
+                stream=stream
+            )
+        except requests.exceptions.RequestException as e:
+            raise LLMBackendError(str(e), retryable=True)
+
+        if response.status_code != 200:
+            with response:
+                try:
+                    message = response.json()["error"]["message"]
+                except (ValueError, KeyError, TypeError):
+                    message = response.text[:200]
+            raise LLMBackendError(
+                f"{response.status_code}: {message}",
+                retryable=response.status_code in self.RETRYABLE_STATUS,
+                retry_after=retry_after_from_headers(response.headers)
+            )
+        return response
+
+    def complete(self, messages, model, max_tokens, timeout):
+        response = self._post(messages, model, max_tokens, timeout, stream=False)
+        try:
+            body = response.json()
+            usage = body.get("usage") or {}
+            return LLMResult(
+                body["choices"][0]["message"]["content"],
+                usage.get("prompt_tokens"),
+                usage.get("completion_tokens")
+            )
+        except (ValueError, KeyError, IndexError) as e:
+            raise LLMBackendError(f"Resposta inválida do stub: {e}", retryable=True)
+
+    def stream(self, messages, model, max_tokens, timeout):
+        return self._iter_deltas(self._post(messages, model, max_tokens, timeout, stream=True))
+
+    def _iter_deltas(self, response):
+        with response:
+            try:
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith("data: "):
+                        continue
+                    data = line[len("data: "):]
+                    if data == "[DONE]":
+                        return
+                    evento = json.loads(data)
+                    if "error" in evento:
+                        raise LLMBackendError(evento["error"].get("message", "Erro no stream"), retryable=True)
+                    conteudo = evento["choices"][0]["delta"].get("content")
+                    if conteudo:
+                        yield conteudo
+            except requests.exceptions.RequestException as e:
+                raise LLMBackendError(str(e), retryable=True)
+            except (ValueError, KeyError, IndexError) as e:
+                raise LLMBackendError(f"Evento inválido do stub: {e}", retryable=True)
+        raise LLMBackendError("Stream encerrado sem [DONE]", retryable=True)
+
+
+def create_llm_backend(backend=None):
+    """Instancia o backend configurado em LLM_BACKEND ('openai' ou 'stub')."""
+    backend = (backend or Config.LLM_BACKEND).lower()
+    if backend == "openai":
+        return OpenAIBackend()
+    if backend == "stub":
+        logger.warning(f"Usando o backend de LLM local de testes em {Config.LLM_STUB_URL}.")
+        return StubHTTPBackend(Config.LLM_STUB_URL)
+    raise ValueError(f"LLM_BACKEND inválido: {backend}")
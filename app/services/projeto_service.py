@@ -1,9 +1,22 @@
+import hashlib
 import logging
+import mimetypes
+import uuid
+from datetime import datetime, timedelta, timezone
+from io import BytesIO
 import marshmallow
+from werkzeug.utils import secure_filename
+from app.config.config import Config
 from app.repositories.projeto_repository import ProjectRepository
+from app.repositories.upload_repository import FinalizedUploadRepository
+from app.services.arquivo_service import SpooledUpload, StoredFileService
+from app.services.storage_backend import get_storage_backend
 from app.utils.file_utils import FileUtils
+from app.utils.jwt_manager import JWTManager
 from app.validators.projeto_validator import ProjectSchema
-from app.erros.custom_errors import NotFoundError, ConflictError, InternalServerError, ValidationError, ExternalAPIError
+from app.erros.custom_errors import (
+    AppError, NotFoundError, ConflictError, InternalServerError, ValidationError, ExternalAPIError, UnauthorizedError, InvalidTokenError
+)
 from app.erros.error_handler import ErrorHandler
 
 logger = logging.getLogger(__name__)
@@ -13,6 +26,7 @@ class ProjectService:
 
     def __init__(self):
         self.file_utils = FileUtils()
+        self.stored_files = StoredFileService()
         self.schema = ProjectSchema()
 
     def _is_allowed_file(self, filename):
@@ -67,16 +81,53 @@ class ProjectService:
             if not file or not self._is_allowed_file(file.filename):
                 raise ValidationError(field="arquivo", message="Somente arquivos PDF, DOC e DOCX são permitidos.")
 
-            if not self.file_utils.is_valid_document(file, file.filename):
+            texto_extraido, file_url, digest = self._validate_and_store(file)
+            return self._save_new(data, file_url, texto_extraido, digest)
+
+        except ValidationError as err:
+            logger.warning(f"Erro na validação de entrada: {err.message}")
+            raise 
+        except ConflictError as e:
+            logger.warning(f"Conflito ao criar projeto: {e.message}")
+            raise
+        except ExternalAPIError as err:
+            logger.error(f"Erro na integração com Firebase: {err.message}")
+            raise
+        except Exception as e:
+            logger.error(f"Erro inesperado ao criar projeto: {e}")
+            raise InternalServerError("Erro ao criar projeto.")
+
+    def _validate_and_store(self, file):
+        """Valida o arquivo enquanto ele é enviado à quarentena e retorna (texto extraído, url, digest).
+
+        O envio começa antes da extração e da varredura de dados sensíveis, de modo que a latência fica
+        próxima do mais lento dos dois passos e não da soma. Se a validação passar, o objeto é promovido
+        ao caminho definitivo; se falhar, é removido da quarentena.
+
+        O stream da requisição é copiado uma única vez, em blocos, para um SpooledUpload (que calcula o
+        digest durante a cópia); o envio e a extração leem essa cópia, cada um com a sua posição.
+        """
+        spool = SpooledUpload(file.stream)
+        upload = self.stored_files.quarantine(spool, file.filename, file.mimetype or None)
+        try:
+            texto_extraido = self.file_utils.extract_valid_text(spool.reader(), file.filename)
+            if texto_extraido is None:
                 logger.warning("Documento contém dados sensíveis.")
                 raise ValidationError(field="arquivo", message="Documento contém dados sensíveis.")
+        except Exception:
+            upload.discard()
+            raise
 
-            try:
-                file_url = self.file_utils.upload_to_firebase(file, file.filename)
-            except ExternalAPIError as api_error:
-                logger.error(f"Erro ao utilizar Firebase: {api_error.message}")
-                raise
+        try:
+            file_url, digest = upload.promote()
+        except ExternalAPIError as api_error:
+            logger.error(f"Erro ao utilizar Firebase: {api_error.message}")
+            raise
+        return texto_extraido, file_url, digest
 
+    def _save_new(self, data, file_url, texto_extraido, digest):
+        """Cria o projeto com o arquivo já armazenado; se a criação falhar, a referência ao arquivo é liberada."""
+        try:
             data['arquivo'] = file_url
 
             normalized_data = self._normalize_data(data)
@@ -86,22 +137,115 @@ class ProjectService:
             except marshmallow.exceptions.ValidationError as marshmallow_error:
                 ErrorHandler.handle_marshmallow_errors(marshmallow_error.messages)
 
+            # reaproveitado pelas avaliações, que assim não baixam nem reprocessam o arquivo
+            projeto_data['texto_extraido'] = texto_extraido
+            projeto_data['arquivo_digest'] = digest
+
             projeto = ProjectRepository.create(projeto_data)
-            logger.info(f"Projeto criado com sucesso: ID {projeto.id}")
-            return projeto
+        except Exception:
+            self.stored_files.release(digest)
+            raise
+        logger.info(f"Projeto criado com sucesso: ID {projeto.id}")
+        return projeto
+
+    def create_upload(self, filename, usuario_id):
+        """Gera a URL assinada para o cliente enviar o arquivo direto ao bucket e o token que
+        identifica esse upload na finalização."""
+        try:
+            if not filename or not self._is_allowed_file(filename):
+                raise ValidationError(field="nome_arquivo", message="Somente arquivos PDF, DOC e DOCX são permitidos.")
+
+            safe_name = secure_filename(filename) or f"arquivo.{filename.rsplit('.', 1)[1].lower()}"
+            objeto = f"{Config.UPLOAD_PREFIX}/{uuid.uuid4()}/{safe_name}"
+            content_type = mimetypes.guess_type(safe_name)[0] or "application/octet-stream"
+            upload_url, headers = get_storage_backend().generate_upload_url(
+                objeto, content_type, Config.UPLOAD_URL_EXPIRATION, Config.UPLOAD_MAX_BYTES
+            )
+            upload_token = JWTManager.create_upload_token(
+                {"objeto": objeto, "nome_arquivo": filename, "usuario_id": str(usuario_id)}, Config.UPLOAD_URL_EXPIRATION
+            )
+            expira_em = datetime.now(timezone.utc) + timedelta(minutes=Config.UPLOAD_URL_EXPIRATION)
+            logger.info(f"Upload direto autorizado para '{objeto}'.")
+            return {
+                "upload_url": upload_url,
+                "metodo": "PUT",
+                "headers": headers,
+                "upload_token": upload_token,
+                "expira_em": expira_em.isoformat(),
+                "tamanho_maximo": Config.UPLOAD_MAX_BYTES
+            }
 
         except ValidationError as err:
-            logger.warning(f"Erro na validação de entrada: {err.message}")
-            raise 
+            logger.warning(f"Erro na validação do upload: {err.message}")
+            raise
+        except ExternalAPIError as err:
+            logger.error(f"Erro na integração com Firebase: {err.message}")
+            raise
+        except Exception as e:
+            logger.error(f"Erro inesperado ao autorizar upload: {e}")
+            raise InternalServerError("Erro ao autorizar o upload do arquivo.")
+
+    def finalize_upload(self, data, upload_token, usuario_id):
+        """Conclui um upload direto: baixa o arquivo do bucket uma única vez, aplica a mesma validação
+        do POST /projects e cria o projeto. Arquivos recusados na validação são removidos do bucket.
+
+        O upload é reservado antes de qualquer outro trabalho, então o mesmo token cria no máximo um
+        projeto (finalizações repetidas ou simultâneas recebem ConflictError); se a finalização falhar
+        antes de o objeto ser movido para o caminho definitivo, a reserva é desfeita e o cliente pode
+        tentar de novo. Depois da movimentação o objeto enviado não existe mais: a reserva é mantida
+        (o token fica consumido) e `_save_new` libera a referência ao arquivo armazenado.
+        """
+        try:
+            if not data or not isinstance(data, dict):
+                raise ValidationError(field="data", message="Dados de entrada inválidos.")
+
+            upload = JWTManager.decode_upload_token(upload_token)
+            if upload.get("usuario_id") != str(usuario_id):
+                raise UnauthorizedError(action="finalizar upload", message="O upload pertence a outro usuário.")
+            objeto, filename = upload["objeto"], upload["nome_arquivo"]
+
+            FinalizedUploadRepository.claim(objeto)
+            moved = False
+            try:
+                content = get_storage_backend().read_upload(objeto, Config.UPLOAD_MAX_BYTES)
+                try:
+                    texto_extraido = self.file_utils.extract_valid_text(BytesIO(content), filename)
+                except ValidationError:
+                    get_storage_backend().delete_file(objeto)
+                    raise
+                file_url, digest = self.stored_files.store_uploaded(
+                    objeto, hashlib.sha256(content).hexdigest(), len(content), filename, mimetypes.guess_type(filename)[0]
+                )
+                moved = True
+                del content
+
+                return self._save_new(data, file_url, texto_extraido, digest)
+            except Exception:
+                if moved:
+                    logger.warning(f"Falha ao criar o projeto do upload {objeto} após mover o arquivo; é necessário um novo upload.")
+                else:
+                    self._release_upload(objeto)
+                raise
+
+        except (ValidationError, UnauthorizedError, InvalidTokenError) as err:
+            logger.warning(f"Upload direto recusado: {err.message}")
+            raise
         except ConflictError as e:
-            logger.warning(f"Conflito ao criar projeto: {e.message}")
+            logger.warning(f"Conflito ao finalizar upload: {e.message}")
             raise
         except ExternalAPIError as err:
             logger.error(f"Erro na integração com Firebase: {err.message}")
             raise
         except Exception as e:
-            logger.error(f"Erro inesperado ao criar projeto: {e}")
-            raise InternalServerError("Erro ao criar projeto.")
+            logger.error(f"Erro inesperado ao finalizar upload: {e}")
+            raise InternalServerError("Erro ao finalizar o upload do arquivo.")
+
+    @staticmethod
+    def _release_upload(objeto):
+        try:
+            FinalizedUploadRepository.release(objeto)
+        except AppError as e:
+            logger.warning(f"Não foi possível liberar a reserva do upload {objeto}: {e.message}")
 
     def update(self, project_id, data=None, file=None):
         try:
@@ -109,35 +253,38 @@ class ProjectService:
                 raise ValidationError(field="project_id", message="ID inválido.")
 
             projeto = self.get_by_id(project_id)
+            old_digest, new_digest = projeto.arquivo_digest, None
 
             if file:
                 if not self._is_allowed_file(file.filename):
                     raise ValidationError(field="arquivo", message="Somente arquivos PDF, DOC e DOCX são permitidos.")
 
-                if not self.file_utils.is_valid_document(file, file.filename):
-                    logger.warning("Documento contém dados sensíveis.")
-                    raise ValidationError(field="arquivo", message="Documento contém dados sensíveis.")
-
-                try:
-                    file_url = self.file_utils.upload_to_firebase(file, file.filename)
-                except ExternalAPIError as api_error:
-                    logger.error(f"Erro ao utilizar Firebase: {api_error.message}")
-                    raise
+                texto_extraido, file_url, new_digest = self._validate_and_store(file)
 
                 data = data or {}
                 data['arquivo'] = file_url
-                
-            if data:
-                normalized_data = self._normalize_data(data)
-                try:
-                    projeto_data = self.schema.load(normalized_data, partial=True)
-                except marshmallow.exceptions.ValidationError as marshmallow_error:
-                    ErrorHandler.handle_marshmallow_errors(marshmallow_error.messages)
+                projeto.texto_extraido = texto_extraido
+                projeto.arquivo_digest = new_digest
 
-                for key, value in projeto_data.items():
-                    setattr(projeto, key, value)    
+            try:
+                if data:
+                    normalized_data = self._normalize_data(data)
+                    try:
+                        projeto_data = self.schema.load(normalized_data, partial=True)
+                    except marshmallow.exceptions.ValidationError as marshmallow_error:
+                        ErrorHandler.handle_marshmallow_errors(marshmallow_error.messages)
+
+                    for key, value in projeto_data.items():
+                        setattr(projeto, key, value)
+
+                updated_projeto = ProjectRepository.update(projeto)
+            except Exception:
+                self.stored_files.release(new_digest)
+                raise
 
-            updated_projeto = ProjectRepository.update(projeto)
+            # o arquivo anterior só é liberado depois que o projeto deixou de apontar para ele
+            if new_digest:
+                self.stored_files.release(old_digest)
             logger.info(f"Projeto {project_id} atualizado com sucesso.")
             return updated_projeto
 
@@ -192,7 +339,9 @@ class ProjectService:
                 logger.warning(f"Tentativa de deletar projeto com ID {project_id} não encontrado.")
                 raise NotFoundError(resource="Projeto", message="Projeto não encontrado.")
             
+            digest = projeto.arquivo_digest
             ProjectRepository.delete(project_id)
+            self.stored_files.release(digest)
             logger.info(f"Projeto {project_id} deletado com sucesso.")
             return {"message": "Projeto deletado com sucesso."}
         except ValidationError as err:
@@ -0,0 +1,308 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from io import BytesIO
+from app.config.config import Config
+from app.utils.jwt_manager import JWTManager
+from app.erros.custom_errors import ValidationError
+
+logger = logging.getLogger(__name__)
+
+
+class StorageBackend(ABC):
+    """Interface dos backends de armazenamento dos arquivos de projetos.
+
+    Os objetos são identificados pelo caminho no bucket (ex.: "arquivos/<sha256>.pdf") e expostos por
+    uma URL pública, que é o que os projetos guardam e o que as avaliações baixam (via BlobCache, com
+    requisições condicionais). Erros do storage são levantados como ExternalAPIError/InternalServerError
+    e arquivos recusados como ValidationError.
+
+    `serves_files` indica que os objetos são servidos pela própria API em GET /files/<caminho> (backends
+    sem URL própria, usados em desenvolvimento, testes e benchmarks offline).
+    """
+    name = "storage"
+    serves_files = False
+
+    @abstractmethod
+    def upload_stream(self, file_obj, file_name, content_type=None, public=True):
+        """Envia o conteúdo do objeto arquivo e retorna a URL pública do objeto."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def upload_stream_if_absent(self, file_obj, file_name, content_type=None, public=True):
+        """Como upload_stream, mas não transfere nada se o objeto já existir."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def exists(self, file_name):
+        raise NotImplementedError
+
+    @abstractmethod
+    def move_if_absent(self, source_name, file_name, public=True):
+        """Move `source_name` para `file_name` (ou só remove a origem, se o destino já existir)."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_file(self, file_name):
+        """Remove o objeto; um objeto inexistente é ignorado."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def read_upload(self, file_name, max_bytes):
+        """Bytes de um arquivo enviado pelo cliente, recusado se não existir ou passar de `max_bytes`."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def generate_upload_url(self, file_name, content_type, expires_in, max_bytes):
+        """Retorna (URL, cabeçalhos) para o cliente enviar o arquivo com PUT."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def download_file(self, file_name, destination):
+        raise NotImplementedError
+
+
+class ServedStorageBackend(StorageBackend):
+    """Base dos backends servidos pela própria API em STORAGE_PUBLIC_URL/files/<caminho>.
+
+    GET /files responde com ETag (SHA-256 do conteúdo) e Last-Modified, de modo que o BlobCache das
+    avaliações revalida as cópias locais com 304 como faria com o storage do Firebase. A URL de upload
+    direto aponta para PUT /files/<caminho> com um token de upload no lugar da assinatura.
+
+    As subclasses implementam o armazenamento dos bytes e dos metadados de cada objeto
+    (content_type, public, etag, tamanho, atualizado_em). O conteúdo é copiado em blocos de CHUNK_SIZE
+    bytes, com o ETag calculado durante a cópia.
+    """
+    serves_files = True
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def url(self, file_name):
+        return f"{Config.STORAGE_PUBLIC_URL.rstrip('/')}/files/{file_name}"
+
+    @classmethod
+    def _copy(cls, source, target, content_type, public):
+        """Copia `source` para `target` em blocos e retorna os metadados do conteúdo copiado."""
+        digest, size = hashlib.sha256(), 0
+        for chunk in iter(lambda: source.read(cls.CHUNK_SIZE), b""):
+            digest.update(chunk)
+            size += len(chunk)
+            target.write(chunk)
+        return {
+            "content_type": content_type,
+            "public": public,
+            "etag": digest.hexdigest(),
+            "tamanho": size,
+            "atualizado_em": datetime.now(timezone.utc).isoformat()
+        }
+
+    # primitivas de armazenamento
+    @abstractmethod
+    def _put(self, file_name, file_obj, content_type, public):
+        """Grava o conteúdo de `file_obj` (lido em blocos, com _copy) e os seus metadados."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def _make_public(self, file_name):
+        """Marca como público um objeto existente (gravado antes com public=False)."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def _read(self, file_name):
+        raise NotImplementedError
+
+    @abstractmethod
+    def _remove(self, file_name):
+        raise NotImplementedError
+
+    @abstractmethod
+    def stat(self, file_name):
+        """Metadados do objeto, ou None se ele não existir."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def open_file(self, file_name):
+        """Abre o objeto para leitura binária (levanta FileNotFoundError se não existir)."""
+        raise NotImplementedError
+
+    def upload_stream(self, file_obj, file_name, content_type=None, public=True):
+        file_obj.seek(0)
+        self._put(file_name, file_obj, content_type, public)
+        logger.info(f"Arquivo '{file_name}' armazenado ({self.name}).")
+        return self.url(file_name)
+
+    def upload_stream_if_absent(self, file_obj, file_name, content_type=None, public=True):
+        with self._lock:
+            meta = self.stat(file_name)
+            if meta is None:
+                return self.upload_stream(file_obj, file_name, content_type, public)
+            logger.info(f"Arquivo '{file_name}' já existe; envio ignorado.")
+            if public and not meta.get("public"):
+                self._make_public(file_name)
+            return self.url(file_name)
+
+    def exists(self, file_name):
+        return self.stat(file_name) is not None
+
+    def move_if_absent(self, source_name, file_name, public=True):
+        with self._lock:
+            existing = self.stat(file_name)
+            if existing is None:
+                meta = self.stat(source_name)
+                if meta is None:
+                    raise ValidationError(field="arquivo", message="Arquivo não encontrado. Envie o arquivo antes de finalizar.")
+                with self.open_file(source_name) as source:
+                    self._put(file_name, source, meta.get("content_type"), public)
+                logger.info(f"Arquivo '{source_name}' movido para '{file_name}'.")
+            elif public and not existing.get("public"):
+                self._make_public(file_name)
+            self.delete_file(source_name)
+        return self.url(file_name)
+
+    def delete_file(self, file_name):
+        self._remove(file_name)
+
+    def read_upload(self, file_name, max_bytes):
+        meta = self.stat(file_name)
+        if meta is None:
+            raise ValidationError(field="arquivo", message="Arquivo não encontrado. Envie o arquivo antes de finalizar.")
+        if meta["tamanho"] > max_bytes:
+            self.delete_file(file_name)
+            raise ValidationError(field="arquivo", message="O arquivo excede o tamanho máximo permitido.")
+        return self._read(file_name)
+
+    def generate_upload_url(self, file_name, content_type, expires_in, max_bytes):
+        token = JWTManager.create_upload_token(
+            {"objeto": file_name, "tamanho_maximo": max_bytes}, expires_in, audience=JWTManager.UPLOAD_PUT_AUDIENCE
+        )
+        return f"{self.url(file_name)}?token={token}", {"Content-Type": content_type}
+
+    def download_file(self, file_name, destination):
+        with self.open_file(file_name) as source, open(destination, "wb") as target:
+            shutil.copyfileobj(source, target)
+
+
+class LocalStorageBackend(ServedStorageBackend):
+    """Objetos em arquivos sob `directory`, com os metadados em um `.json` ao lado de cada um
+    (compartilhável entre o processo da API e o do worker de avaliações)."""
+    name = "local"
+
+    def __init__(self, directory):
+        super().__init__()
+        self.directory = os.path.abspath(directory)
+
+    def _path(self, file_name):
+        path = os.path.abspath(os.path.join(self.directory, "objetos", file_name))
+        if not path.startswith(os.path.join(self.directory, "objetos") + os.sep):
+            raise ValidationError(field="arquivo", message="Caminho de arquivo inválido.")
+        return path
+
+    def _meta_path(self, file_name):
+        return f"{self._path(file_name)}.json"
+
+    def _put(self, file_name, file_obj, content_type, public):
+        path = self._path(file_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), prefix=".upload-", delete=False) as tmp:
+            meta = self._copy(file_obj, tmp, content_type, public)
+        os.replace(tmp.name, path)
+        with open(self._meta_path(file_name), "w", encoding="utf-8") as meta_file:
+            json.dump(meta, meta_file)
+
+    def _make_public(self, file_name):
+        meta = {**self.stat(file_name), "public": True}
+        with open(self._meta_path(file_name), "w", encoding="utf-8") as meta_file:
+            json.dump(meta, meta_file)
+
+    def _read(self, file_name):
+        with open(self._path(file_name), "rb") as stored:
+            return stored.read()
+
+    def _remove(self, file_name):
+        for path in (self._meta_path(file_name), self._path(file_name)):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+    def stat(self, file_name):
+        try:
+            with open(self._meta_path(file_name), encoding="utf-8") as meta_file:
+                return json.load(meta_file)
+        except (OSError, ValueError):
+            return None
+
+    def open_file(self, file_name):
+        return open(self._path(file_name), "rb")
+
+
+class MemoryStorageBackend(ServedStorageBackend):
+    """Objetos em um dicionário do processo; para testes e benchmarks em um único processo."""
+    name = "memory"
+
+    def __init__(self):
+        super().__init__()
+        self._objects = {}  # caminho -> (bytes, metadados)
+
+    def _put(self, file_name, file_obj, content_type, public):
+        buffer = BytesIO()
+        meta = self._copy(file_obj, buffer, content_type, public)
+        self._objects[file_name] = (buffer.getvalue(), meta)
+
+    def _make_public(self, file_name):
+        content, meta = self._objects[file_name]
+        self._objects[file_name] = (content, {**meta, "public": True})
+
+    def _read(self, file_name):
+        try:
+            return self._objects[file_name][0]
+        except KeyError:
+            raise FileNotFoundError(file_name) from None
+
+    def _remove(self, file_name):
+        self._objects.pop(file_name, None)
+
+    def stat(self, file_name):
+        stored = self._objects.get(file_name)
+        return stored[1] if stored else None
+
+    def open_file(self, file_name):
+        return BytesIO(self._read(file_name))
+
+
+def create_storage_backend(backend=None):
+    """Instancia o backend configurado em STORAGE_BACKEND ('firebase', 'local' ou 'memory')."""
+    backend = (backend or Config.STORAGE_BACKEND).lower()
+    if backend == "firebase":
+        # importado só aqui: os demais backends funcionam sem as dependências e credenciais do Firebase
+        from app.services.firebase_service import FirebaseService
+        return FirebaseService()
+    if backend == "local":
+        logger.warning(f"Usando o armazenamento local em {Config.LOCAL_STORAGE_DIR}.")
+        return LocalStorageBackend(Config.LOCAL_STORAGE_DIR)
+    if backend == "memory":
+        logger.warning("Usando o armazenamento em memória: os arquivos são perdidos ao reiniciar o processo.")
+        return MemoryStorageBackend()
+    raise ValueError(f"STORAGE_BACKEND inválido: {backend}")
+
+
+_storage_backend = None
+_storage_backend_lock = threading.Lock()
+
+
+def get_storage_backend():
+    """Backend compartilhado por todo o processo, criado na primeira utilização (o backend em memória
+    precisa ser a mesma instância em toda a API)."""
+    global _storage_backend
+    with _storage_backend_lock:
+        if _storage_backend is None:
+            _storage_backend = create_storage_backend()
+        return _storage_backend
@@ -0,0 +1,243 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+import requests
+from requests.adapters import HTTPAdapter
+from app.erros.custom_errors import ValidationError
+
+logger = logging.getLogger(__name__)
+
+
+class BlobCache:
+    """Cache LRU em disco para arquivos baixados por URL, limitado em bytes.
+
+    - downloads são gravados em disco em blocos (`chunk_size`), sem manter o corpo inteiro em memória;
+    - entradas existentes são revalidadas com If-None-Match/If-Modified-Since: 304 reaproveita a cópia local;
+    - se a origem estiver inacessível, a cópia local (obsoleta) é servida;
+    - ao ultrapassar `max_bytes`, os arquivos usados há mais tempo são removidos.
+
+    O índice fica em memória e é reconstruído a partir do diretório ao iniciar; cada arquivo tem um
+    `.json` ao lado com ETag/Last-Modified, de modo que processos diferentes podem compartilhar o diretório.
+    """
+
+    def __init__(self, directory, max_bytes, connect_timeout=5, read_timeout=30, pool_size=10, chunk_size=64 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.timeout = (connect_timeout, read_timeout)
+        self.chunk_size = chunk_size
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._entries = OrderedDict()  # chave -> metadados, do menos para o mais recentemente usado
+        self._total_bytes = 0
+        self._loaded = False
+        self._hits = 0
+        self._misses = 0
+        self._revalidated = 0
+        self._stale = 0
+        self._evictions = 0
+
+    @staticmethod
+    def _key(url):
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _data_path(self, key):
+        return os.path.join(self.directory, key)
+
+    def _meta_path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _ensure_loaded(self):
+        """Cria o diretório e reconstrói o índice na primeira utilização (ordem LRU pelo último acesso)."""
+        with self._lock:
+            if self._loaded:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            found = []
+            for name in os.listdir(self.directory):
+                if not name.endswith(".json"):
+                    continue
+                key = name[:-5]
+                try:
+                    with open(self._meta_path(key), encoding="utf-8") as meta_file:
+                        meta = json.load(meta_file)
+                    stat = os.stat(self._data_path(key))
+                except (OSError, ValueError):
+                    continue
+                meta["size"] = stat.st_size
+                found.append((stat.st_atime, key, meta))
+            for _, key, meta in sorted(found):
+                self._entries[key] = meta
+                self._total_bytes += meta["size"]
+            self._loaded = True
+            logger.info(f"Cache de arquivos carregado: {len(self._entries)} entradas, {self._total_bytes} bytes.")
+        self._evict()
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    @contextmanager
+    def open(self, url):
+        """Abre o arquivo da URL para leitura binária, baixando ou revalidando a cópia em cache."""
+        self._ensure_loaded()
+        key = self._key(url)
+        with self._key_lock(key):
+            with self._lock:
+                meta = self._entries.get(key)
+
+            headers = {}
+            if meta:
+                if meta.get("etag"):
+                    headers["If-None-Match"] = meta["etag"]
+                if meta.get("last_modified"):
+                    headers["If-Modified-Since"] = meta["last_modified"]
+
+            try:
+                response = self.session.get(url, headers=headers, stream=True, timeout=self.timeout)
+            except requests.exceptions.RequestException as e:
+                handle = self._open_cached(key) if meta else None
+                if handle is None:
+                    raise
+                logger.warning(f"Origem inacessível ({e}); usando cópia em cache do arquivo {key[:12]}.")
+                self._count("_stale")
+                return_handle = handle
+            else:
+                with response:
+                    return_handle = self._handle_response(key, meta, response)
+                if return_handle is None:
+                    # 304, mas a cópia local foi removida (outro processo despejou): baixa de novo sem condicionais
+                    with self.session.get(url, stream=True, timeout=self.timeout) as response:
+                        return_handle = self._handle_response(key, None, response)
+
+        with return_handle:
+            yield return_handle
+
+    def _handle_response(self, key, meta, response):
+        if response.status_code == 304 and meta:
+            handle = self._open_cached(key)
+            if handle is not None:
+                self._count("_hits")
+                self._count("_revalidated")
+                logger.info(f"Arquivo {key[:12]} revalidado (304), usando cópia em cache.")
+                return handle
+            return None
+
+        if response.status_code != 200:
+            logger.error(f"Erro ao baixar o arquivo: {response.status_code}")
+            raise ValidationError("arquivo", "Não foi possível baixar o arquivo do projeto.")
+
+        self._count("_misses")
+        return self._store(key, response)
+
+    def _open_cached(self, key):
+        """Abre a cópia local e a marca como usada mais recentemente; None se ela não existir mais."""
+        try:
+            handle = open(self._data_path(key), "rb")
+        except OSError:
+            with self._lock:
+                meta = self._entries.pop(key, None)
+                if meta:
+                    self._total_bytes -= meta["size"]
+            return None
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        return handle
+
+    def _store(self, key, response):
+        """Grava o corpo em disco em blocos e o registra no índice. Arquivos maiores que o cache
+        inteiro não são armazenados: ficam em um arquivo temporário removido ao fechar."""
+        declared = int(response.headers.get("Content-Length") or 0)
+        cacheable = self.max_bytes > 0 and declared <= self.max_bytes
+        tmp = tempfile.NamedTemporaryFile(dir=self.directory, prefix=".download-", delete=not cacheable)
+        try:
+            size = 0
+            for chunk in response.iter_content(chunk_size=self.chunk_size):
+                tmp.write(chunk)
+                size += len(chunk)
+            tmp.flush()
+
+            if not cacheable or size > self.max_bytes:
+                logger.info(f"Arquivo {key[:12]} ({size} bytes) maior que o cache; não será armazenado.")
+                if cacheable:
+                    os.unlink(tmp.name)
+                tmp.seek(0)
+                return tmp
+
+            meta = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "size": size
+            }
+            tmp.close()
+            with open(self._meta_path(key), "w", encoding="utf-8") as meta_file:
+                json.dump(meta, meta_file)
+            os.replace(tmp.name, self._data_path(key))
+        except Exception:
+            tmp.close()
+            if cacheable and os.path.exists(tmp.name):
+                os.unlink(tmp.name)
+            raise
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous:
+                self._total_bytes -= previous["size"]
+            self._entries[key] = meta
+            self._total_bytes += size
+        # abre antes de despejar: no Linux o descritor aberto continua válido mesmo se o arquivo for removido
+        handle = open(self._data_path(key), "rb")
+        self._evict(protect=key)
+        return handle
+
+    def _evict(self, protect=None):
+        """Remove as entradas menos usadas recentemente até o total caber em `max_bytes`."""
+        removed = []
+        with self._lock:
+            for key in list(self._entries):
+                if self._total_bytes <= self.max_bytes:
+                    break
+                if key == protect:
+                    continue
+                meta = self._entries.pop(key)
+                self._total_bytes -= meta["size"]
+                self._evictions += 1
+                removed.append(key)
+        for key in removed:
+            for path in (self._data_path(key), self._meta_path(key)):
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+        if removed:
+            logger.info(f"{len(removed)} arquivos removidos do cache por limite de tamanho.")
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self):
+        """Contadores do processo atual e ocupação do cache para o endpoint de métricas."""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "entradas": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total, 4) if total else 0.0,
+                "revalidados": self._revalidated,
+                "copias_obsoletas_servidas": self._stale,
+                "remocoes": self._evictions
+            }
@@ -0,0 +1,109 @@
+import logging
+import threading
+import time
+from collections import deque
+from app.erros.custom_errors import ExternalAPIError
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Circuit breaker por taxa de erro em janela deslizante, compartilhado entre as threads do processo.
+
+    - fechado: chamadas liberadas; abre quando, com pelo menos `min_calls` resultados na janela,
+      a taxa de falhas atinge `failure_rate_threshold`.
+    - aberto: chamadas falham imediatamente com ExternalAPIError até passar `open_seconds`.
+    - semiaberto: uma única chamada de teste; sucesso fecha o circuito, falha reabre.
+    """
+
+    CLOSED = "fechado"
+    OPEN = "aberto"
+    HALF_OPEN = "semiaberto"
+
+    def __init__(self, service, failure_rate_threshold=0.5, window_size=20, min_calls=5, open_seconds=60):
+        self.service = service
+        self.failure_rate_threshold = failure_rate_threshold
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self._results = deque(maxlen=window_size)
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._opened_at = None
+        self._probe_in_flight = False
+        self._rejected = 0
+        self._times_opened = 0
+
+    def _failure_rate(self):
+        if not self._results:
+            return 0.0
+        return self._results.count(False) / len(self._results)
+
+    def _remaining_open_seconds(self):
+        return max(0.0, self.open_seconds - (time.monotonic() - self._opened_at))
+
+    def before_call(self):
+        """Libera a chamada ou levanta ExternalAPIError se o circuito estiver aberto."""
+        with self._lock:
+            if self._state == self.OPEN:
+                remaining = self._remaining_open_seconds()
+                if remaining > 0:
+                    self._rejected += 1
+                    raise ExternalAPIError(
+                        service=self.service,
+                        message="Serviço temporariamente indisponível (circuito aberto)",
+                        retry_after=remaining
+                    )
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+                logger.info(f"Circuito de {self.service} semiaberto: liberando chamada de teste.")
+
+            if self._state == self.HALF_OPEN:
+                if self._probe_in_flight:
+                    self._rejected += 1
+                    raise ExternalAPIError(
+                        service=self.service,
+                        message="Serviço temporariamente indisponível (circuito em teste)",
+                        retry_after=self.open_seconds
+                    )
+                self._probe_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                logger.info(f"Circuito de {self.service} fechado após chamada de teste bem-sucedida.")
+                self._state = self.CLOSED
+                self._results.clear()
+                self._probe_in_flight = False
+            self._results.append(True)
+
+    def record_failure(self):
+        with self._lock:
+            self._results.append(False)
+            if self._state == self.HALF_OPEN:
+                self._open()
+            elif (self._state == self.CLOSED and len(self._results) >= self.min_calls
+                    and self._failure_rate() >= self.failure_rate_threshold):
+                self._open()
+
+    def _open(self):
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._probe_in_flight = False
+        self._times_opened += 1
+        logger.error(
+            f"Circuito de {self.service} aberto por {self.open_seconds} segundos "
+            f"(taxa de falhas {self._failure_rate():.0%})."
+        )
+
+    def snapshot(self):
+        """Estado atual para o endpoint de métricas."""
+        with self._lock:
+            return {
+                "servico": self.service,
+                "estado": self._state,
+                "taxa_falhas": round(self._failure_rate(), 4),
+                "chamadas_na_janela": len(self._results),
+                "rejeitadas": self._rejected,
+                "aberturas": self._times_opened,
+                "segundos_para_teste": round(self._remaining_open_seconds(), 1) if self._state == self.OPEN else 0
+            }
@@ -0,0 +1,198 @@
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from cryptography.fernet import Fernet, InvalidToken
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionCache:
+    """Cache em dois níveis do texto extraído de documentos, chaveado pelo SHA-256 dos bytes do
+    arquivo, pelo tipo e pela versão do extrator (mudar a versão invalida todas as entradas).
+
+    - nível 1: LRU em memória do processo, limitado a `memory_max_bytes` (tamanho do texto em UTF-8);
+    - nível 2: um arquivo `.enc` por entrada em `directory`, LRU limitado a `disk_max_bytes` e
+      compartilhável entre processos (API, worker e pool de extração).
+
+    O texto extraído ainda não passou pela varredura de dados sensíveis, então o disco só guarda
+    entradas cifradas com Fernet (`encryption_key`, a mesma ENCRYPTION_KEY da aplicação), em um
+    diretório 0700; sem chave válida, o nível 2 fica desativado e o texto só existe na memória.
+
+    Limites iguais a 0 desativam o nível correspondente. O índice do disco é reconstruído a partir
+    do diretório na primeira utilização, na ordem do último acesso.
+    """
+
+    def __init__(self, directory, disk_max_bytes, memory_max_bytes, version, encryption_key=None):
+        self.directory = directory
+        self.disk_max_bytes = disk_max_bytes
+        self.memory_max_bytes = memory_max_bytes
+        self.version = version
+
+        self._cipher = None
+        if disk_max_bytes > 0:
+            try:
+                self._cipher = Fernet(encryption_key.encode()) if encryption_key else None
+            except (ValueError, TypeError) as e:
+                logger.error(f"ENCRYPTION_KEY inválida para o cache de extração: {e}")
+            if self._cipher is None:
+                logger.warning("Cache de extração sem chave de criptografia; o texto extraído ficará apenas em memória.")
+                self.disk_max_bytes = 0
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # chave -> texto, do menos para o mais recentemente usado
+        self._memory_bytes = 0
+        self._disk = OrderedDict()    # chave -> tamanho em bytes
+        self._disk_bytes = 0
+        self._loaded = False
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def key(self, file_content, file_type):
+        digest = hashlib.sha256(file_content).hexdigest()
+        return hashlib.sha256(f"{self.version}:{file_type}:{digest}".encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.enc")
+
+    def _ensure_loaded(self):
+        with self._lock:
+            if self._loaded or self.disk_max_bytes <= 0:
+                return
+            try:
+                os.makedirs(self.directory, mode=0o700, exist_ok=True)
+                os.chmod(self.directory, 0o700)
+                found = []
+                for name in os.listdir(self.directory):
+                    path = os.path.join(self.directory, name)
+                    if name.endswith(".txt"):
+                        os.unlink(path)  # entradas de versões anteriores, gravadas sem criptografia
+                    elif name.endswith(".enc"):
+                        stat = os.stat(path)
+                        found.append((stat.st_atime, name[:-4], stat.st_size))
+            except OSError as e:
+                logger.error(f"Erro ao carregar o cache de extração em {self.directory}: {e}")
+                found = []
+            for _, key, size in sorted(found):
+                self._disk[key] = size
+                self._disk_bytes += size
+            self._loaded = True
+            logger.info(f"Cache de extração carregado: {len(self._disk)} entradas, {self._disk_bytes} bytes.")
+        self._evict_disk()
+
+    def get(self, key):
+        """Texto em cache para a chave, ou None. Um acerto no disco promove a entrada para a memória."""
+        with self._lock:
+            text = self._memory.get(key)
+            if text is not None:
+                self._memory.move_to_end(key)
+                self._memory_hits += 1
+                return text
+
+        self._ensure_loaded()
+        text = self._read_disk(key)
+        with self._lock:
+            if text is None:
+                self._misses += 1
+                return None
+            self._disk_hits += 1
+        self._put_memory(key, text)
+        return text
+
+    def put(self, key, text):
+        """Armazena o texto nos dois níveis. Falhas de disco são apenas registradas."""
+        self._put_memory(key, text)
+        if self.disk_max_bytes <= 0:
+            return
+        self._ensure_loaded()
+        data = self._cipher.encrypt(text.encode("utf-8"))
+        if len(data) > self.disk_max_bytes:
+            return
+        try:
+            with tempfile.NamedTemporaryFile(dir=self.directory, prefix=".extracao-", delete=False) as tmp:
+                tmp.write(data)
+            os.replace(tmp.name, self._path(key))
+        except OSError as e:
+            logger.error(f"Erro ao gravar o cache de extração: {e}")
+            return
+        with self._lock:
+            self._disk_bytes += len(data) - self._disk.pop(key, 0)
+            self._disk[key] = len(data)
+        self._evict_disk(protect=key)
+
+    def _read_disk(self, key):
+        """Lê a entrada do disco, inclusive as gravadas por outros processos depois da carga do índice."""
+        if self.disk_max_bytes <= 0:
+            return None
+        try:
+            with open(self._path(key), "rb") as cached:
+                data = cached.read()
+            text = self._cipher.decrypt(data).decode("utf-8")
+            os.utime(self._path(key))  # atualiza o último acesso para a ordem LRU após reinícios
+        except (OSError, InvalidToken, UnicodeDecodeError) as e:
+            if isinstance(e, InvalidToken):
+                try:
+                    os.unlink(self._path(key))  # cifrada com outra chave (ENCRYPTION_KEY trocada)
+                except OSError:
+                    pass
+            with self._lock:
+                self._disk_bytes -= self._disk.pop(key, 0)
+            return None
+        with self._lock:
+            self._disk_bytes += len(data) - self._disk.pop(key, 0)
+            self._disk[key] = len(data)
+        return text
+
+    def _put_memory(self, key, text):
+        size = len(text.encode("utf-8"))
+        if size > self.memory_max_bytes:
+            return
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous.encode("utf-8"))
+            self._memory[key] = text
+            self._memory_bytes += size
+            while self._memory_bytes > self.memory_max_bytes:
+                _, removed = self._memory.popitem(last=False)
+                self._memory_bytes -= len(removed.encode("utf-8"))
+                self._evictions += 1
+
+    def _evict_disk(self, protect=None):
+        removed = []
+        with self._lock:
+            for key in list(self._disk):
+                if self._disk_bytes <= self.disk_max_bytes:
+                    break
+                if key == protect:
+                    continue
+                self._disk_bytes -= self._disk.pop(key)
+                self._evictions += 1
+                removed.append(key)
+        for key in removed:
+            try:
+                os.unlink(self._path(key))
+            except OSError:
+                pass
+
+    def stats(self):
+        """Contadores do processo atual e ocupação de cada nível para o endpoint de métricas."""
+        with self._lock:
+            hits = self._memory_hits + self._disk_hits
+            total = hits + self._misses
+            return {
+                "versao_extrator": self.version,
+                "entradas_memoria": len(self._memory),
+                "bytes_memoria": self._memory_bytes,
+                "entradas_disco": len(self._disk),
+                "bytes_disco": self._disk_bytes,
+                "hits_memoria": self._memory_hits,
+                "hits_disco": self._disk_hits,
+                "misses": self._misses,
+                "hit_rate": round(hits / total, 4) if total else 0.0,
+                "remocoes": self._evictions
+            }
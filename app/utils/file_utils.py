@@ -1,14 +1,13 @@
-import tempfile
-import os
 import re
 import logging
+from contextlib import closing
 from io import BytesIO
 from nh3 import clean_text
-from validate_docbr import CPF, CNPJ
-from app.services.firebase_service import FirebaseService
+from app.config.config import Config
 from app.utils.text_extractor import TextExtractor
+from app.utils.sensitive_scanner import sensitive_scanner
 from app.erros.custom_errors import (
-    InternalServerError, ValidationError, ExternalAPIError
+    InternalServerError, ValidationError
 )
 
 logger = logging.getLogger(__name__)
@@ -16,17 +15,7 @@ logger = logging.getLogger(__name__)
 
 class FileUtils:
     MAX_CHARACTERS = 25000  # limite de caracteres
-    SENSITIVE_PATTERNS = {
-        "CNPJ": r"(?i)\b(?:CNPJ[: ]*)?(\d{2}[.\s]?\d{3}[.\s]?\d{3}[\/\s]?\d{4}[-.\s]?\d{2})\b",
-        "CPF": r"(?i)\b(?:cpf[\s:.]*)?(\d{3}[\s.-]?\d{3}[\s.-]?\d{3}[\s.-]?\d{2})\b",
-        "Email": r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}",
-        "Inscrição Estadual": r"\binscrição estadual[: ]?\d+\b",
-        "Inscrição Municipal": r"\binscrição municipal[: ]?\d+\b",
-    }
-
-    def __init__(self):
-        self.cpf_validator = CPF()
-        self.cnpj_validator = CNPJ()
+    SCAN_OVERLAP = 200  # caracteres do final da página anterior reanalisados com a página seguinte
 
     @staticmethod
     def clean_text(text):
@@ -34,41 +23,29 @@ class FileUtils:
         text = re.sub(r"\s+", " ", text)
         return text.strip().lower()
 
-    def _validate_cpf(self, cpf):
-        """Valida CPF usando a biblioteca validate-docbr."""
-        return self.cpf_validator.validate(cpf)
-
-    def _validate_cnpj(self, cnpj):
-        """Valida CNPJ usando a biblioteca validate-docbr."""
-        return self.cnpj_validator.validate(cnpj)
-
     def _contains_sensitive_data(self, text):
-        """Valida padrões sensíveis no texto extraído."""
+        """Valida padrões sensíveis no texto extraído (varredura única, ver SensitiveDataScanner)."""
         try:
-            text = self.clean_text(text)
-            sensitive_data = {}
-
-            for label, pattern in self.SENSITIVE_PATTERNS.items():
-                matches = re.findall(pattern, text, flags=re.IGNORECASE)
-                if matches:
-                    # validação adicional para CPFs e CNPJs
-                    if label == "CPF":
-                        valid_cpfs = [cpf for cpf in matches if self._validate_cpf(cpf)]
-                        if valid_cpfs:
-                            sensitive_data[label] = valid_cpfs
-                    elif label == "CNPJ":
-                        valid_cnpjs = [cnpj for cnpj in matches if self._validate_cnpj(cnpj)]
-                        if valid_cnpjs:
-                            sensitive_data[label] = valid_cnpjs
-                    else:
-                        sensitive_data[label] = matches
-
-            return sensitive_data
-
+            return sensitive_scanner.scan(text)
         except Exception as e:
             logger.error(f"Erro inesperado ao validar dados sensíveis: {e}")
             raise InternalServerError("Erro inesperado ao validar dados sensíveis no texto.")
 
+    def _redact_sensitive_data(self, text):
+        """Mascara os dados sensíveis do texto (SENSITIVE_DATA_MODE=redact) com uma única varredura."""
+        try:
+            findings = sensitive_scanner.find(text)
+            if not findings:
+                return text
+            counts = {}
+            for label, *_ in findings:
+                counts[label] = counts.get(label, 0) + 1
+            logger.warning(f"Documento contém dados sensíveis, mascarados no texto armazenado: {counts}")
+            return sensitive_scanner.redact(text, findings)
+        except Exception as e:
+            logger.error(f"Erro inesperado ao mascarar dados sensíveis: {e}")
+            raise InternalServerError("Erro inesperado ao mascarar dados sensíveis no texto.")
+
     def _is_within_character_limit(self, text):
         """Verifica se o texto está dentro do limite de caracteres."""
         return len(text) <= self.MAX_CHARACTERS
@@ -93,15 +70,19 @@ class FileUtils:
 
     def is_valid_document(self, file, filename):
         """Valida documentos com base na extensão."""
+        self.extract_valid_text(file, filename)
+        return True
+
+    def extract_valid_text(self, file, filename):
+        """Extrai e valida o texto do documento, retornando-o para ser armazenado com o projeto."""
         try:
             extension = filename.rsplit('.', 1)[1].lower()
             if extension not in {"pdf", "docx"}:
                 raise ValidationError(field="arquivo", message="Formato de arquivo não permitido.")
 
-            text = TextExtractor.extract_text(file.read(), extension)
+            text = self._scan_pages(TextExtractor.iter_pages(file.read(), extension))
             logger.info(f"Texto extraído do documento: {text}")
-            self._validate_text(text)
-            return True
+            return text
         except ValidationError as ve:
             logger.warning(f"Erro de validação detectado: {ve.message}")
             raise
@@ -114,31 +95,39 @@ class FileUtils:
         finally:
             file.seek(0)
 
-    
-    def upload_to_firebase(self, file, filename):
-        """Usa o FirebaseService para fazer upload e obter a URL pública."""
-        temp_file_path = None
-        try:
-            with tempfile.NamedTemporaryFile(delete=False, suffix=f"_{filename}") as temp_file:
-                temp_file.write(file.read())  
-                temp_file_path = temp_file.name
-            
-            public_url = FirebaseService.upload_file(temp_file_path, filename)
-            logger.info(f"Arquivo {filename} enviado ao Firebase com URL: {public_url}")
-            return public_url
-
-        except ExternalAPIError as ve:
-            logger.warning(f"Erro ao acessar o Firebase para o arquivo '{filename}': {ve.message}")
-            raise
-
-        except Exception as e:
-            logger.error(f"Erro ao fazer upload para o Firebase: {e}")
-            raise InternalServerError(f"Erro ao enviar o arquivo '{filename}'.") from e
-
-        finally:
-            if temp_file_path and os.path.exists(temp_file_path):
-                os.remove(temp_file_path)  
-                logger.info(f"Arquivo temporário {temp_file_path} removido.")
-
-
-
+    def _scan_pages(self, pages):
+        """Valida o documento à medida que as páginas são extraídas, interrompendo a extração assim
+        que o limite de caracteres é ultrapassado ou um dado sensível é encontrado.
+
+        Cada página é analisada junto com o final da anterior (a partir de um espaço, para não
+        começar no meio de um número), de modo que padrões divididos entre páginas também são detectados.
+        Com SENSITIVE_DATA_MODE=redact, o documento não é rejeitado: o texto completo é varrido uma
+        vez ao final e retornado com os dados sensíveis mascarados.
+        """
+        redact = Config.SENSITIVE_DATA_MODE == "redact"
+        parts, total, tail = [], 0, ""
+        with closing(pages):
+            for page in pages:
+                total += len(page)
+                if total > self.MAX_CHARACTERS:
+                    logger.warning("Documento excede o limite de caracteres.")
+                    raise ValidationError(field="arquivo", message="Documento excede o limite de caracteres permitido.")
+
+                parts.append(page)
+                if redact:
+                    continue
+
+                window = tail + page
+                sensitive_data = self._contains_sensitive_data(window)
+                if sensitive_data:
+                    logger.warning(f"Documento contém dados sensíveis: {sensitive_data}")
+                    raise ValidationError(field="arquivo", message=f"Documento contém dados sensíveis: {sensitive_data}")
+
+                tail = window[-self.SCAN_OVERLAP:]
+                cut = re.search(r"\s", tail)
+                tail = tail[cut.start():] if cut and len(window) > self.SCAN_OVERLAP else tail
+
+        text = "".join(parts)
+        if not text.strip():
+            raise ValidationError(field="arquivo", message="O arquivo não contém texto válido.")
+        return self._redact_sensitive_data(text) if redact else text
@@ -10,6 +10,8 @@ class JWTManager:
     SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'default_secret_key')
     ACCESS_EXPIRATION = int(os.getenv('ACCESS_EXPIRATION', 60))  # minutos(padrão 60)
     RENEWAL_THRESHOLD = int(os.getenv('RENEWAL_THRESHOLD', 5))   # minutos antes do vencimento para renovação
+    UPLOAD_AUDIENCE = 'upload'          # finalização do upload direto (POST /projects/uploads/finalize)
+    UPLOAD_PUT_AUDIENCE = 'upload-put'  # envio do arquivo à própria API (PUT /files, armazenamento local)
 
     @staticmethod
     def create_token(data, expires_in=None):
@@ -35,3 +37,22 @@ class JWTManager:
         except Exception as e:
             logger.error(f"Erro inesperado na decodificação do token: {e}")
             raise InvalidTokenError("Erro na decodificação do token.")
+
+    @staticmethod
+    def create_upload_token(data, expires_in, audience=UPLOAD_AUDIENCE):
+        """Token de upload direto ao bucket. A audiência impede que ele seja aceito como token de acesso
+        (decode_token o recusa) e que um token de acesso seja usado para finalizar um upload; cada etapa
+        do upload usa a sua, de modo que o token de uma não é aceito na outra."""
+        expiration = datetime.utcnow() + timedelta(minutes=expires_in)
+        return jwt.encode({'data': data, 'exp': expiration, 'aud': audience}, JWTManager.SECRET_KEY, algorithm='HS256')
+
+    @staticmethod
+    def decode_upload_token(token, audience=UPLOAD_AUDIENCE):
+        try:
+            return jwt.decode(token, JWTManager.SECRET_KEY, algorithms=['HS256'], audience=audience)['data']
+        except jwt.ExpiredSignatureError:
+            logger.warning("Token de upload expirado.")
+            raise UnauthorizedError(message="Token de upload expirado.")
+        except jwt.InvalidTokenError:
+            logger.error("Token de upload inválido ou malformado.")
+            raise InvalidTokenError(message="Token de upload inválido ou malformado.")
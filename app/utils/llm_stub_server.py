@@ -0,0 +1,189 @@
+"""Servidor HTTP local que imita /v1/chat/completions da OpenAI para testes de carga do fluxo de avaliação.
+
+As respostas são determinísticas (derivadas do hash das mensagens) e a injeção de erros segue uma
+sequência pseudoaleatória fixa pela semente, de modo que duas execuções com os mesmos parâmetros
+produzem o mesmo resultado. Uso:
+
+    python -m app.utils.llm_stub_server --port 8089 --latency 0.5 --tokens-per-second 40 \\
+        --error-rate 0.05 --rate-limit-rate 0.05 --retry-after 2
+
+E, na API/worker, LLM_BACKEND=stub e LLM_STUB_URL=http://127.0.0.1:8089.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+PALAVRAS = (
+    "projeto inovação tecnológica pesquisa desenvolvimento resultado mercado processo produto "
+    "viabilidade originalidade impacto risco escalabilidade evidência objetivo aplicação empresa"
+).split()
+
+
+class StubSettings:
+    """Parâmetros de comportamento do servidor, compartilhados pelas threads de atendimento."""
+
+    def __init__(self, latency=0.2, jitter=0.0, tokens_per_second=50.0, response_tokens=300,
+                 error_rate=0.0, rate_limit_rate=0.0, retry_after=1.0, stream_cut_rate=0.0, seed=42):
+        self.latency = latency
+        self.jitter = jitter
+        self.tokens_per_second = tokens_per_second
+        self.response_tokens = response_tokens
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.stream_cut_rate = stream_cut_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+
+    def draw(self):
+        """Sorteia, em sequência determinística, o desfecho e a latência de uma requisição."""
+        with self._lock:
+            self.requests += 1
+            sorteio = self._random.random()
+            latencia = self.latency + self._random.uniform(0, self.jitter)
+            corte = self._random.random() < self.stream_cut_rate
+        if sorteio < self.rate_limit_rate:
+            return "rate_limit", latencia, corte
+        if sorteio < self.rate_limit_rate + self.error_rate:
+            return "error", latencia, corte
+        return "ok", latencia, corte
+
+
+def gerar_tokens(messages, quantidade):
+    """Gera `quantidade` tokens determinísticos a partir do conteúdo das mensagens."""
+    semente = hashlib.sha256(json.dumps(messages, sort_keys=True, ensure_ascii=False).encode("utf-8")).digest()
+    gerador = random.Random(semente)
+    return [("" if indice == 0 else " ") + gerador.choice(PALAVRAS) for indice in range(quantidade)]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    settings = StubSettings()
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def _send_json(self, status, body, headers=None):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for nome, valor in (headers or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok", "requisicoes": self.settings.requests})
+        else:
+            self._send_json(404, {"error": {"message": "Rota não encontrada."}})
+
+    def do_POST(self):
+        if self.path != "/v1/chat/completions":
+            self._send_json(404, {"error": {"message": "Rota não encontrada."}})
+            return
+        try:
+            tamanho = int(self.headers.get("Content-Length") or 0)
+            corpo = json.loads(self.rfile.read(tamanho) or b"{}")
+        except ValueError:
+            self._send_json(400, {"error": {"message": "JSON inválido."}})
+            return
+
+        desfecho, latencia, corte = self.settings.draw()
+        time.sleep(latencia)
+        if desfecho == "rate_limit":
+            self._send_json(429, {"error": {"message": "Rate limit simulado."}},
+                            {"Retry-After": str(self.settings.retry_after)})
+            return
+        if desfecho == "error":
+            self._send_json(500, {"error": {"message": "Erro simulado."}})
+            return
+
+        quantidade = min(int(corpo.get("max_tokens") or self.settings.response_tokens), self.settings.response_tokens)
+        tokens = gerar_tokens(corpo.get("messages", []), quantidade)
+        intervalo = 1 / self.settings.tokens_per_second if self.settings.tokens_per_second > 0 else 0
+        modelo = corpo.get("model", "stub")
+        uso = {"prompt_tokens": len(json.dumps(corpo.get("messages", []))) // 4, "completion_tokens": quantidade}
+
+        if corpo.get("stream"):
+            self._stream(tokens, intervalo, modelo, corte)
+            return
+
+        time.sleep(intervalo * quantidade)
+        self._send_json(200, {
+            "object": "chat.completion",
+            "model": modelo,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": "".join(tokens)}, "finish_reason": "stop"}],
+            "usage": {**uso, "total_tokens": uso["prompt_tokens"] + uso["completion_tokens"]}
+        })
+
+    def _stream(self, tokens, intervalo, modelo, corte):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        limite = len(tokens) // 2 if corte else len(tokens)
+        for token in tokens[:limite]:
+            time.sleep(intervalo)
+            evento = {"object": "chat.completion.chunk", "model": modelo,
+                      "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]}
+            self.wfile.write(f"data: {json.dumps(evento)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+        if corte:
+            self.wfile.write(f"data: {json.dumps({'error': {'message': 'Stream interrompido (simulado).'}})}\n\n".encode("utf-8"))
+        else:
+            self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+def create_server(host="127.0.0.1", port=8089, settings=None):
+    """Cria o servidor (sem iniciá-lo); útil para subir o stub dentro de scripts de benchmark."""
+    handler = type("ConfiguredStubHandler", (StubHandler,), {"settings": settings or StubSettings()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor local que simula a API de chat completion da OpenAI.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.2, help="segundos até o primeiro token")
+    parser.add_argument("--jitter", type=float, default=0.0, help="latência adicional aleatória máxima, em segundos")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0, help="0 para responder sem atraso por token")
+    parser.add_argument("--response-tokens", type=int, default=300, help="tokens por resposta (limitado por max_tokens)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fração de respostas 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fração de respostas 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After das respostas 429, em segundos")
+    parser.add_argument("--stream-cut-rate", type=float, default=0.0, help="fração de streams interrompidos no meio")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    settings = StubSettings(
+        latency=args.latency, jitter=args.jitter, tokens_per_second=args.tokens_per_second,
+        response_tokens=args.response_tokens, error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after, stream_cut_rate=args.stream_cut_rate, seed=args.seed
+    )
+    logging.basicConfig(level=logging.INFO)
+    server = create_server(args.host, args.port, settings)
+    logger.info(f"Stub de LLM ouvindo em http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
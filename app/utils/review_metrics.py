@@ -0,0 +1,70 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class ReviewMetrics:
+    """Coleta tokens, chamadas à IA e tempos de cada etapa de uma avaliação.
+
+    Uma instância acompanha uma única avaliação e é repassada pelo ReviewService ao IaService;
+    as análises parciais (map-reduce) rodam em threads, por isso as atualizações são protegidas por lock.
+    """
+
+    STAGES = ("download", "extracao", "llm")
+
+    def __init__(self, origem, modelo=None, backend=None):
+        self.origem = origem
+        self.modelo = modelo
+        self.backend = backend
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.tokens_estimados = False
+        self.chamadas_llm = 0
+        self.retentativas = 0
+        self.cache_hit = False
+        self.texto_armazenado = False
+        self._tempos = {stage: 0.0 for stage in self.STAGES}
+        self._inicio = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, stage):
+        """Soma ao tempo da etapa a duração (relógio de parede) do bloco."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._tempos[stage] += time.perf_counter() - inicio
+
+    def add_usage(self, prompt_tokens, completion_tokens, estimated=False):
+        """Registra uma chamada concluída à IA e os tokens consumidos."""
+        with self._lock:
+            self.chamadas_llm += 1
+            self.prompt_tokens += prompt_tokens or 0
+            self.completion_tokens += completion_tokens or 0
+            self.tokens_estimados = self.tokens_estimados or estimated
+
+    def add_retry(self):
+        with self._lock:
+            self.retentativas += 1
+
+    def as_dict(self):
+        """Valores no formato da tabela avaliacao_metricas (tempos em milissegundos)."""
+        with self._lock:
+            return {
+                "origem": self.origem,
+                "modelo": self.modelo,
+                "backend": self.backend,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "tokens_estimados": self.tokens_estimados,
+                "chamadas_llm": self.chamadas_llm,
+                "retentativas": self.retentativas,
+                "cache_hit": self.cache_hit,
+                "texto_armazenado": self.texto_armazenado,
+                "tempo_download_ms": round(self._tempos["download"] * 1000),
+                "tempo_extracao_ms": round(self._tempos["extracao"] * 1000),
+                "tempo_llm_ms": round(self._tempos["llm"] * 1000),
+                "tempo_total_ms": round((time.perf_counter() - self._inicio) * 1000)
+            }
@@ -0,0 +1,201 @@
+import re
+import string
+import numpy as np
+
+CPF_WEIGHTS = (tuple(range(10, 1, -1)), tuple(range(11, 1, -1)))
+CNPJ_WEIGHTS = ((5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2), (6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2))
+# separadores aceitos pelo validate_docbr em cada documento
+CPF_SEPARATORS = str.maketrans("", "", ".-")
+CNPJ_SEPARATORS = str.maketrans("", "", "./-")
+
+
+def _check_digit(total):
+    rest = total % 11
+    return 0 if rest < 2 else 11 - rest
+
+
+def _digits(candidate, size):
+    """Dígitos do candidato como bytes (b"0"-b"9"), ou None se não tiver exatamente `size` dígitos,
+    tiver outros caracteres além dos separadores ou tiver todos iguais (os critérios do validate_docbr)."""
+    digits = candidate.translate(CPF_SEPARATORS if size == 11 else CNPJ_SEPARATORS)
+    if len(digits) != size or not digits.isdigit() or not digits.isascii() or digits == digits[0] * size:
+        return None
+    return digits.encode("ascii")
+
+
+def _is_valid(candidate, size, weights):
+    digits = _digits(candidate, size)
+    if digits is None:
+        return False
+    values = [d - 48 for d in digits]
+    for weight in weights:
+        if values[len(weight)] != _check_digit(sum(v * w for v, w in zip(values, weight))):
+            return False
+    return True
+
+
+def is_valid_cpf(candidate):
+    return _is_valid(candidate, 11, CPF_WEIGHTS)
+
+
+def is_valid_cnpj(candidate):
+    return _is_valid(candidate, 14, CNPJ_WEIGHTS)
+
+
+def _validate_batch(candidates, size, weights):
+    """Valida os dígitos verificadores de muitos candidatos de uma vez, vetorizado com NumPy."""
+    valid = np.zeros(len(candidates), dtype=bool)
+    rows, positions = [], []
+    for position, candidate in enumerate(candidates):
+        digits = _digits(candidate, size)
+        if digits is not None:
+            rows.append(digits)
+            positions.append(position)
+    if not rows:
+        return valid
+    values = (np.frombuffer(b"".join(rows), dtype=np.uint8) - 48).reshape(-1, size).astype(np.int64)
+    ok = np.ones(len(rows), dtype=bool)
+    for weight in weights:
+        rest = values[:, :len(weight)] @ np.array(weight) % 11
+        ok &= values[:, len(weight)] == np.where(rest < 2, 0, 11 - rest)
+    valid[positions] = ok
+    return valid
+
+
+def validate_cpfs(candidates):
+    """Lista de booleanos indicando quais candidatos são CPFs válidos."""
+    return _validate_batch(candidates, 11, CPF_WEIGHTS).tolist()
+
+
+def validate_cnpjs(candidates):
+    """Lista de booleanos indicando quais candidatos são CNPJs válidos."""
+    return _validate_batch(candidates, 14, CNPJ_WEIGHTS).tolist()
+
+
+class SensitiveDataScanner:
+    """Localiza dados sensíveis (CNPJ, CPF, e-mail, inscrições estadual e municipal) em uma única
+    passada de uma expressão regular combinada e pré-compilada.
+
+    Os candidatos a CPF e CNPJ só são considerados quando os dígitos verificadores conferem; acima de
+    BATCH_MIN_CANDIDATES a verificação é feita em lote com NumPy. Como o validate_docbr nunca aceitou
+    números separados por espaços, os padrões só aceitam ".", "-" e "/" como separadores.
+    """
+    BATCH_MIN_CANDIDATES = 64
+    CPF = r"\d{3}[.-]?\d{3}[.-]?\d{3}[.-]?\d{2}"
+    CNPJ = r"\d{2}\.?\d{3}\.?\d{3}/?\d{4}[-.]?\d{2}"
+    EMAIL_LOCAL_CHARS = string.ascii_letters + string.digits + "._%+-"
+    EMAIL = r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}"
+    # Cada alternativa começa por um lookbehind que falha logo no meio das palavras, de modo que a
+    # expressão só é realmente avaliada no início de cada palavra ou número. (?<!\w) equivale ao \b
+    # inicial dos padrões originais; o do e-mail reproduz o início do casamento mais à esquerda.
+    # As implementações anteriores aplicavam cada padrão ao texto inteiro, então um trecho pode ser de
+    # mais de uma categoria; aqui nenhuma alternativa consome o que outra precisa ver:
+    # - CPF/CNPJ que são o início de um e-mail não casam (NOT_EMAIL), e o e-mail é encontrado na mesma
+    #   posição; os números no nome do usuário são verificados depois;
+    # - as inscrições casam com largura zero (tudo em um lookahead), então o rótulo ainda pode fazer
+    #   parte de um e-mail e o número também é avaliado como CPF/CNPJ. O separador é o `[: ]?`
+    #   original, aplicado a um texto em que cada sequência de espaços virava um só.
+    # - o domínio de um e-mail termina na última sequência de letras após um ponto, então pode engolir o
+    #   começo de outro dado ("a@b.com.CPF..."); as posições após cada ponto ou hífen do domínio são
+    #   avaliadas de novo com DOCUMENT_PATTERN.
+    NOT_EMAIL = rf"(?=\d)(?!{EMAIL})"
+    DOCUMENT_PATTERN = re.compile(
+        rf"(?<!\w)(?:(?:(?i:cnpj)[:\s]*)?{NOT_EMAIL}(?P<CNPJ>{CNPJ})\b|(?:(?i:cpf)[\s:.]*)?{NOT_EMAIL}(?P<CPF>{CPF})\b"
+        r"|(?=(?i:inscrição\s+(?:(?P<IE>estadual)|municipal))(?::|\s+)?(?P<Inscricao>\d+)\b))"
+    )
+    EMAIL_PATTERN = re.compile(rf"(?<![a-zA-Z0-9._%+-])(?P<Email>{EMAIL})")
+    PATTERN = re.compile(f"{EMAIL_PATTERN.pattern}|{DOCUMENT_PATTERN.pattern}")
+    CPF_PATTERN = re.compile(rf"\b{CPF}\b")
+    CNPJ_PATTERN = re.compile(rf"\b{CNPJ}\b")
+    ORDER = ("CNPJ", "CPF", "Email", "Inscrição Estadual", "Inscrição Municipal")
+    PLACEHOLDERS = {
+        "CNPJ": "[CNPJ]",
+        "CPF": "[CPF]",
+        "Email": "[EMAIL]",
+        "Inscrição Estadual": "[INSCRICAO_ESTADUAL]",
+        "Inscrição Municipal": "[INSCRICAO_MUNICIPAL]"
+    }
+
+    def find(self, text):
+        """Dados sensíveis do texto como (categoria, início, fim, valor), na ordem em que aparecem."""
+        findings = set()
+        candidates = {"CNPJ": {}, "CPF": {}}  # (início, fim, valor) ainda sem os dígitos verificados
+        for match in self.PATTERN.finditer(text):
+            self._collect(match, text, findings, candidates)
+
+        cnpjs, cpfs = list(candidates["CNPJ"]), candidates["CPF"]
+        for (start, end, value), valid in zip(cnpjs, self._validate([c[2] for c in cnpjs], is_valid_cnpj, validate_cnpjs)):
+            if valid:
+                findings.add(("CNPJ", start, end, value))
+            else:
+                # sequência que casou como CNPJ inválido ainda pode conter um CPF
+                cpfs.update(dict.fromkeys(self._candidates(self.CPF_PATTERN, value, start)))
+        cpfs = list(cpfs)
+        for (start, end, value), valid in zip(cpfs, self._validate([c[2] for c in cpfs], is_valid_cpf, validate_cpfs)):
+            if valid:
+                findings.add(("CPF", start, end, value))
+        return sorted(findings, key=lambda finding: (finding[1], -finding[2]))
+
+    def _collect(self, match, text, findings, candidates):
+        group = match.lastgroup
+        start, end = match.span(group)
+        if group == "Inscricao":
+            # o trecho mascarado é só o número; o valor informado inclui o rótulo
+            label = "Inscrição Estadual" if match.group("IE") else "Inscrição Municipal"
+            findings.add((label, start, end, text[match.start():end]))
+        elif group == "Email":
+            email = match.group(group)
+            findings.add((group, start, end, email))
+            # números no nome do usuário também são documentos
+            candidates["CNPJ"].update(dict.fromkeys(self._candidates(self.CNPJ_PATTERN, email, start)))
+            candidates["CPF"].update(dict.fromkeys(self._candidates(self.CPF_PATTERN, email, start)))
+            domain = email.index("@") + 1
+            for offset in (domain, *(i + 1 for i in range(domain, len(email)) if email[i] in ".-")):
+                document = self.DOCUMENT_PATTERN.match(text, start + offset)
+                if document:
+                    self._collect(document, text, findings, candidates)
+        else:
+            candidates[group][(start, end, match.group(group))] = None
+            # e-mail que começa no meio do documento ("12.345.678/0001-95.contato@..."): o nome do usuário
+            # vai do último caractere que não pode fazer parte dele até o "@"
+            if end < len(text) and text[end] in self.EMAIL_LOCAL_CHARS + "@":
+                outside = [i for i in range(start, end) if text[i] not in self.EMAIL_LOCAL_CHARS]
+                email = outside and self.EMAIL_PATTERN.match(text, outside[-1] + 1)
+                if email:
+                    self._collect(email, text, findings, candidates)
+
+    @staticmethod
+    def _candidates(pattern, value, offset):
+        return [(offset + match.start(), offset + match.end(), match.group()) for match in pattern.finditer(value)]
+
+    def scan(self, text):
+        """Retorna {categoria: [valores encontrados]} apenas com as categorias presentes no texto."""
+        found = {}
+        for label, _, _, value in self.find(text):
+            found.setdefault(label, []).append(value)
+        return {label: found[label] for label in self.ORDER if label in found}
+
+    def redact(self, text, findings=None):
+        """Substitui cada dado sensível por um marcador do seu tipo (ex.: "[CPF]").
+
+        Recebe o resultado de `find` quando ele já foi calculado, para não varrer o texto de novo.
+        Trechos contidos em outro já mascarado (um CPF dentro de um e-mail) são ignorados.
+        """
+        findings = self.find(text) if findings is None else findings
+        parts, position = [], 0
+        for label, start, end, _ in findings:
+            if start < position:
+                continue
+            parts.append(text[position:start])
+            parts.append(self.PLACEHOLDERS[label])
+            position = end
+        parts.append(text[position:])
+        return "".join(parts)
+
+    def _validate(self, candidates, single, batch):
+        if len(candidates) >= self.BATCH_MIN_CANDIDATES:
+            return batch(candidates)
+        return [single(candidate) for candidate in candidates]
+
+
+sensitive_scanner = SensitiveDataScanner()
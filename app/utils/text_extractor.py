@@ -1,32 +1,75 @@
+import math
+import multiprocessing
+import os
+import re
+import signal
+import threading
+import time
+import zipfile
+from collections import deque
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 import PyPDF2
 import pdfplumber
+import pymupdf
 from io import BytesIO
 from docx import Document
+from xml.etree import ElementTree
 import logging
+from app.config.config import Config
 from app.erros.custom_errors import InternalServerError, ValidationError
+from app.utils.extraction_cache import ExtractionCache
+
+try:
+    import resource
+except ImportError:  # Windows: o sandbox funciona só com o limite de tempo do processo principal
+    resource = None
 
 logger = logging.getLogger(__name__)
 
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+W_P, W_R, W_T, W_TBL, W_TR, W_TC, W_SDT = (f"{W_NS}{name}" for name in ("p", "r", "t", "tbl", "tr", "tc", "sdt"))
+MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+# mesmos equivalentes usados pelo python-docx em Run.text; só valem dentro de um w:r (em w:pPr/w:tabs,
+# por exemplo, w:tab é a definição de uma parada de tabulação, não um caractere)
+DOCX_SPECIAL_CHARS = {
+    f"{W_NS}tab": "\t",
+    f"{W_NS}br": "\n",
+    f"{W_NS}cr": "\n",
+    f"{W_NS}noBreakHyphen": "-",
+    f"{W_NS}ptab": "\t"
+}
+
+SANDBOX_RANGE_PAGES = 10  # páginas por tarefa quando o documento não é dividido entre os processos
+SANDBOX_DOCX_FIRST_RANGE = 64  # trechos da primeira tarefa de um DOCX no sandbox; cada tarefa seguinte lê o dobro
+
+
+class ExtractionLimitError(BaseException):
+    """Levantada no processo de extração quando um limite do sandbox é atingido.
+
+    Deriva de BaseException para não ser engolida por `except Exception` dentro das bibliotecas de PDF.
+    """
+
 
 class TextExtractor:
+    # incrementar sempre que a saída dos extratores mudar: invalida o cache de extração
+    VERSION = "1"
+    LINE_TOLERANCE = 3  # mesma tolerância vertical (pt) usada pelo pdfplumber para agrupar palavras em linhas
+
+    # pool de processos compartilhado para PDFs grandes (a extração é CPU-bound e sofre com o GIL)
+    _pool = None
+    _pool_workers = 0
+    _pool_pids = {}  # pool -> fila em que cada processo do pool informa o próprio PID ao iniciar
+    _pool_lock = threading.Lock()
+
     @staticmethod
     def extract_text(file_content, file_type):
         """Extrai texto de arquivos PDF ou DOCX."""
-        extractors = {
-            "pdf": TextExtractor._extract_text_with_pdfplumber,
-            "docx": TextExtractor._extract_text_with_docx
-        }
-        extractor = extractors.get(file_type)
-
-        if not extractor:
-            raise ValidationError(field="file_type", message="Tipo de arquivo não suportado.")
+        pages = TextExtractor.iter_pages(file_content, file_type)
 
         try:
-            text = extractor(file_content)
-
-            if file_type == "pdf" and not text.strip():
-                logger.warning("pdfplumber não conseguiu extrair texto. Tentando com PyPDF2.")
-                text = TextExtractor._extract_text_with_pypdf2(file_content)
+            text = "".join(pages)
 
             if not text.strip():
                 raise ValidationError(field="arquivo", message="O arquivo não contém texto válido.")
@@ -41,41 +84,489 @@ class TextExtractor:
             raise InternalServerError("Erro ao processar o arquivo.")
 
     @staticmethod
-    def _extract_text_with_pdfplumber(file_content):
-        """Extrai texto de PDFs usando pdfplumber."""
+    def iter_pages(file_content, file_type):
+        """Gera o texto do documento aos poucos: página a página no PDF e parágrafo a parágrafo no DOCX.
+
+        A concatenação dos trechos ("".join) é idêntica ao retorno de extract_text, e quem consome
+        pode interromper a leitura a qualquer momento (ex.: ao encontrar dados sensíveis), poupando
+        o processamento do restante do arquivo.
+        """
+        iterators = {
+            "pdf": TextExtractor._iter_pdf_pages,
+            "docx": TextExtractor._iter_docx_paragraphs
+        }
+        iterator = iterators.get(file_type)
+
+        if not iterator:
+            raise ValidationError(field="file_type", message="Tipo de arquivo não suportado.")
+
+        return TextExtractor._iter_cached(iterator, file_content, file_type)
+
+    @staticmethod
+    def _iter_cached(iterator, file_content, file_type):
+        """Entrega o texto do cache de extração em um único trecho ou extrai e o armazena.
+
+        Só leituras completas e com texto são armazenadas: uma extração interrompida por quem
+        consome ou que terminou vazia (possivelmente por falha transitória) não fica no cache.
+        """
+        key = extraction_cache.key(file_content, file_type)
+        cached = extraction_cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        parts = []
+        for text in iterator(file_content):
+            parts.append(text)
+            yield text
+        text = "".join(parts)
+        if text.strip():
+            extraction_cache.put(key, text)
+
+    @staticmethod
+    def _pdf_engines():
+        """Mecanismos de extração de PDF na ordem de PDF_EXTRACTION_ENGINES."""
+        engines = {
+            "pymupdf": TextExtractor._iter_pages_with_pymupdf,
+            "pdfplumber": TextExtractor._iter_pages_with_pdfplumber,
+            "pypdf2": TextExtractor._iter_pages_with_pypdf2
+        }
+        selected = []
+        for name in Config.PDF_EXTRACTION_ENGINES.split(","):
+            name = name.strip().lower()
+            if name in engines:
+                selected.append((name, engines[name]))
+            elif name:
+                logger.warning(f"Mecanismo de extração de PDF desconhecido ignorado: {name}")
+        return selected or [("pdfplumber", engines["pdfplumber"])]
+
+    @classmethod
+    def _iter_pdf_pages(cls, file_content):
+        """Gera as páginas com o primeiro mecanismo configurado que produzir texto.
+
+        Se um mecanismo falhar no meio do documento, o próximo continua a partir da primeira
+        página ainda não entregue; se ele terminar sem texto algum, o próximo recomeça do início.
+        """
+        page_count = cls._count_pages(file_content)
+        delivered = 0
+        has_text = False
+        for name, engine in cls._pdf_engines():
+            try:
+                for pages_done, text in cls._iter_engine(engine, file_content, page_count, delivered):
+                    delivered = pages_done
+                    has_text = has_text or bool(text.strip())
+                    yield text
+                if has_text:
+                    return
+                logger.warning(f"{name} não conseguiu extrair texto. Tentando o próximo mecanismo.")
+            except ValidationError:
+                raise  # limite do sandbox atingido: os outros mecanismos não são tentados
+            except Exception as e:
+                logger.error(f"Erro ao usar {name} para extrair texto: {e}")
+            if not has_text:
+                delivered = 0
+
+    @classmethod
+    def _count_pages(cls, file_content):
+        if Config.EXTRACTION_SANDBOX:
+            return cls._run_sandboxed(cls._count_pages_with_pymupdf, file_content)
+        return cls._count_pages_with_pymupdf(file_content)
+
+    @staticmethod
+    def _count_pages_with_pymupdf(file_content):
         try:
-            text = ""
-            with pdfplumber.open(BytesIO(file_content)) as pdf:
-                for page in pdf.pages:
-                    extracted_text = page.extract_text()
-                    if extracted_text:
-                        text += extracted_text
-            return text
-        except Exception as e:
-            logger.error(f"Erro ao usar pdfplumber para extrair texto: {e}")
-            return ""  
+            with pymupdf.open(stream=file_content, filetype="pdf") as pdf:
+                return pdf.page_count
+        except Exception:
+            return 0  # documento ilegível pelo PyMuPDF: cada mecanismo lê o arquivo inteiro e trata o erro
+
+    @classmethod
+    def _get_pool(cls):
+        """Pool de processos compartilhado, criado na primeira extração paralela.
+
+        Usa 'spawn' para não herdar locks e threads do processo web/worker via fork. Os processos
+        são reaproveitados entre extrações e, com EXTRACTION_SANDBOX, nascem com o limite de memória.
+        """
+        with cls._pool_lock:
+            if cls._pool is None:
+                workers = Config.PDF_EXTRACTION_WORKERS or os.cpu_count() or 1
+                context = multiprocessing.get_context("spawn")
+                pids = context.SimpleQueue()
+                cls._pool = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=context,
+                    initializer=cls._init_sandbox,
+                    initargs=(cls._limits()[0], pids)
+                )
+                cls._pool_pids[cls._pool] = pids
+                cls._pool_workers = workers
+                logger.info(f"Pool de extração de PDF iniciado com {workers} processos.")
+            return cls._pool, cls._pool_workers
+
+    @classmethod
+    def _reset_pool(cls, pool):
+        with cls._pool_lock:
+            if cls._pool is pool:
+                cls._pool = None
+            cls._pool_pids.pop(pool, None)
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    @classmethod
+    def _kill_pool(cls, pool):
+        """Encerra à força os processos do pool (tarefa travada fora do alcance dos sinais).
+
+        As extrações de outros arquivos em andamento no mesmo pool recebem BrokenProcessPool e são
+        repetidas uma vez em um pool novo. Os processos são identificados pelos PIDs que informaram ao
+        iniciar (o executor não expõe os seus processos).
+        """
+        with cls._pool_lock:
+            pids = cls._pool_pids.get(pool)
+        while pids is not None and not pids.empty():
+            try:
+                os.kill(pids.get(), getattr(signal, "SIGKILL", signal.SIGTERM))
+            except OSError:
+                pass  # processo já encerrado
+        cls._reset_pool(pool)
 
     @staticmethod
-    def _extract_text_with_pypdf2(file_content):
+    def _limits():
+        """(memória em bytes, segundos de CPU, segundos de relógio) por tarefa; zeros sem o sandbox."""
+        if not Config.EXTRACTION_SANDBOX:
+            return 0, 0, 0
+        return Config.EXTRACTION_MEMORY_MB * 1024 * 1024, Config.EXTRACTION_CPU_SECONDS, Config.EXTRACTION_TIMEOUT
+
+    @staticmethod
+    def _init_sandbox(memory_bytes, pids):
+        """Inicializador dos processos do pool: informa o PID, aplica o limite de espaço de endereçamento
+        e instala os tratadores de sinal."""
+        pids.put(os.getpid())
+        if resource is None:
+            return
+        if memory_bytes:
+            resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, resource.getrlimit(resource.RLIMIT_AS)[1]))
+        signal.signal(signal.SIGXCPU, TextExtractor._on_limit)
+        signal.signal(signal.SIGALRM, TextExtractor._on_limit)
+
+    @staticmethod
+    def _on_limit(signum, frame):
+        raise ExtractionLimitError("tempo de CPU" if signum == signal.SIGXCPU else "tempo")
+
+    @staticmethod
+    def _run_limited(cpu_seconds, timeout, function, *args):
+        """Executado nos processos do pool: roda `function` com limites de CPU e de tempo próprios.
+
+        O limite de CPU do processo é cumulativo, então o limite flexível é reposicionado a cada tarefa
+        a partir do tempo já consumido; ao estourá-lo, o SIGXCPU interrompe a extração.
+        """
+        limited = resource is not None
+        if limited and cpu_seconds:
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            hard = resource.getrlimit(resource.RLIMIT_CPU)[1]
+            soft = int(usage.ru_utime + usage.ru_stime) + cpu_seconds
+            resource.setrlimit(resource.RLIMIT_CPU, (soft if hard == resource.RLIM_INFINITY else min(soft, hard), hard))
+        if limited and timeout:
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+        try:
+            return function(*args)
+        except MemoryError:
+            raise ExtractionLimitError("memória")
+        finally:
+            if limited:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+                if cpu_seconds:
+                    resource.setrlimit(resource.RLIMIT_CPU, (hard, hard))
+
+    @classmethod
+    def _submit(cls, pool, function, *args):
+        _, cpu_seconds, timeout = cls._limits()
+        return pool.submit(cls._run_limited, cpu_seconds, timeout, function, *args)
+
+    @classmethod
+    def _await(cls, pool, future):
+        """Aguarda uma tarefa do pool, convertendo limites atingidos em ValidationError.
+
+        O próprio processo interrompe a tarefa no limite de tempo; se ele não responder (travado em
+        código nativo), o pool é encerrado à força. A espera conta a partir do momento em que a tarefa
+        entra na fila de execução do pool, que comporta uma tarefa além das em andamento, daí o dobro.
+        """
+        timeout = cls._limits()[2]
+        deadline = None
+        while not wait([future], timeout=1 if timeout else None).done:
+            if deadline is None and future.running():
+                deadline = time.monotonic() + 2 * timeout + 5
+            elif deadline is not None and time.monotonic() > deadline:
+                logger.error("Extração não respondeu ao limite de tempo; encerrando o pool de extração.")
+                cls._kill_pool(pool)
+                raise ValidationError(field="arquivo", message="A extração do arquivo excedeu o tempo limite.")
+        try:
+            return future.result()
+        except ExtractionLimitError as e:
+            logger.warning(f"Extração interrompida pelo sandbox: limite de {e} atingido.")
+            raise ValidationError(field="arquivo", message=f"O arquivo excedeu o limite de {e} durante a extração.")
+
+    @classmethod
+    def _run_sandboxed(cls, function, *args):
+        """Executa `function` no pool, repetindo uma vez em um pool novo se o atual for interrompido
+        (possivelmente por causa de outro arquivo)."""
+        for attempt in range(2):
+            pool, _ = cls._get_pool()
+            try:
+                return cls._await(pool, cls._submit(pool, function, *args))
+            except BrokenProcessPool:
+                logger.warning("Pool de extração interrompido; recriando.")
+                cls._reset_pool(pool)
+        raise ValidationError(field="arquivo", message="O arquivo interrompeu o processo de extração.")
+
+    @staticmethod
+    def _page_ranges(start, page_count, parts):
+        """Divide [start, page_count) em até `parts` intervalos contíguos de tamanho semelhante."""
+        size = max(1, -(-(page_count - start) // parts))
+        return [(first, min(first + size, page_count)) for first in range(start, page_count, size)]
+
+    @staticmethod
+    def _extract_range(engine, file_content, start, stop):
+        """Executado nos processos do pool: (páginas lidas, texto) de um intervalo de páginas."""
+        pages = list(engine(file_content, start, stop))
+        return len(pages), "".join(pages)
+
+    @classmethod
+    def _iter_engine(cls, engine, file_content, page_count, start):
+        """Gera (páginas concluídas, texto) a partir da página `start`.
+
+        Com EXTRACTION_SANDBOX, toda a extração roda no pool de processos, sob limites de memória,
+        CPU e tempo, em intervalos de páginas entregues na ordem (a partir de PDF_PARALLEL_MIN_PAGES,
+        divididos entre os processos). Sem o sandbox, só os documentos grandes usam o pool. Poucos
+        intervalos ficam em execução por vez, de modo que interromper a leitura cancela o restante.
+        """
+        parallel = page_count >= Config.PDF_PARALLEL_MIN_PAGES
+        if not Config.EXTRACTION_SANDBOX and (not parallel or cls._get_pool()[1] < 2):
+            yield from cls._iter_serial(engine, file_content, start)
+            return
+
+        next_page, restarted = start, False
+        while not page_count or next_page < page_count:
+            pool, workers = cls._get_pool()
+            if not page_count:
+                ranges = [(next_page, None)]  # total de páginas desconhecido: o mecanismo lê até o fim
+            elif parallel and workers > 1:
+                ranges = cls._page_ranges(next_page, page_count, workers * 4)
+            else:
+                ranges = cls._page_ranges(next_page, page_count, math.ceil((page_count - next_page) / SANDBOX_RANGE_PAGES))
+            try:
+                for pages_done, text in cls._iter_ranges(pool, engine, file_content, ranges, max(2, workers * 2)):
+                    next_page = pages_done
+                    yield pages_done, text
+                return
+            except BrokenProcessPool:
+                cls._reset_pool(pool)
+                if not Config.EXTRACTION_SANDBOX:
+                    logger.error("Pool de extração de PDF interrompido; recriando e extraindo o restante em série.")
+                    yield from cls._iter_serial(engine, file_content, next_page)
+                    return
+                if restarted:
+                    raise ValidationError(field="arquivo", message="O arquivo interrompeu o processo de extração.")
+                logger.warning("Pool de extração interrompido; repetindo o restante do arquivo em um pool novo.")
+                restarted = True
+
+    @staticmethod
+    def _iter_serial(engine, file_content, start):
+        for page_number, text in enumerate(engine(file_content, start, None), start + 1):
+            yield page_number, text
+
+    @classmethod
+    def _iter_ranges(cls, pool, engine, file_content, ranges, window):
+        """Submete os intervalos ao pool, com no máximo `window` em andamento, e os entrega na ordem."""
+        ranges, pending = deque(ranges), deque()
+        try:
+            while ranges or pending:
+                while ranges and len(pending) < window:
+                    first, stop = ranges.popleft()
+                    pending.append((first, cls._submit(pool, cls._extract_range, engine, file_content, first, stop)))
+                first, future = pending[0]
+                count, text = cls._await(pool, future)
+                pending.popleft()
+                yield first + count, text
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    @staticmethod
+    def _iter_pages_with_pymupdf(file_content, start=0, stop=None):
+        """Extrai texto de PDFs usando PyMuPDF, reconstruindo as linhas como o pdfplumber
+        (palavras agrupadas pelo topo, ordenadas por x e separadas por um espaço)."""
+        with pymupdf.open(stream=file_content, filetype="pdf") as pdf:
+            for page_number in range(start, pdf.page_count if stop is None else stop):
+                words = sorted(pdf[page_number].get_text("words"), key=lambda word: (word[1], word[0]))
+                lines, line, last_top = [], [], None
+                for word in words:
+                    if line and word[1] - last_top > TextExtractor.LINE_TOLERANCE:
+                        lines.append(line)
+                        line = []
+                    line.append(word)
+                    last_top = word[1]
+                if line:
+                    lines.append(line)
+                yield "\n".join(
+                    " ".join(word[4] for word in sorted(line, key=lambda word: word[0])) for line in lines
+                )
+
+    @staticmethod
+    def _iter_pages_with_pdfplumber(file_content, start=0, stop=None):
+        """Extrai texto de PDFs usando pdfplumber."""
+        with pdfplumber.open(BytesIO(file_content)) as pdf:
+            for page in pdf.pages[start:stop]:
+                yield page.extract_text() or ""
+                page.close()  # libera o cache de objetos da página já processada
+
+    @staticmethod
+    def _iter_pages_with_pypdf2(file_content, start=0, stop=None):
         """Extrai texto de PDFs usando PyPDF2 como fallback."""
+        pdf_reader = PyPDF2.PdfReader(BytesIO(file_content))
+        for page_number in range(start, len(pdf_reader.pages) if stop is None else stop):
+            yield pdf_reader.pages[page_number].extract_text() or ""
+
+    @classmethod
+    def _iter_docx_paragraphs(cls, file_content):
+        """Extrai texto de arquivos DOCX, um trecho não vazio por vez (separados por quebra de linha).
+
+        Lê o XML diretamente do zip em streaming (cabeçalhos, corpo e rodapés), incluindo tabelas;
+        se o pacote não puder ser lido assim, recorre ao python-docx.
+        """
+        sandbox = Config.EXTRACTION_SANDBOX
+        separator = ""
         try:
-            pdf_reader = PyPDF2.PdfReader(BytesIO(file_content))
-            text = ""
-            for page in pdf_reader.pages:
-                extracted_text = page.extract_text()
-                if extracted_text:
-                    text += extracted_text
-            return text
-        except Exception as e:
-            logger.error(f"Erro ao usar PyPDF2 para extrair texto: {e}")
-            return ""  
+            for text in cls._iter_docx_ranges(file_content) if sandbox else cls._iter_docx_xml(file_content):
+                yield separator + text
+                separator = "\n"
+            return
+        except (zipfile.BadZipFile, KeyError, ElementTree.ParseError) as e:
+            if separator:
+                # parte do texto já foi entregue: recomeçar duplicaria trechos, e parar omitiria o restante
+                logger.error(f"Erro ao ler o XML do DOCX após o início da extração: {e}")
+                raise ValidationError(field="arquivo", message="Não foi possível ler o documento DOCX.")
+            logger.warning(f"Leitura em streaming do DOCX falhou ({e}). Tentando com python-docx.")
+
+        for text in cls._run_sandboxed(cls._read_docx_with_python_docx, file_content) if sandbox \
+                else cls._read_docx_with_python_docx(file_content):
+            yield separator + text
+            separator = "\n"
+
+    @classmethod
+    def _iter_docx_ranges(cls, file_content):
+        """Lê o DOCX no pool em intervalos de trechos entregues na ordem, como as páginas do PDF, de
+        modo que quem consome pode interromper a leitura logo após o primeiro intervalo.
+
+        O iterparse não pode ser retomado em outro processo, então cada tarefa percorre o XML desde o
+        início; como cada intervalo tem o dobro do anterior, a leitura completa custa cerca do dobro.
+        """
+        start, size = 0, SANDBOX_DOCX_FIRST_RANGE
+        while True:
+            parts = cls._run_sandboxed(cls._read_docx_range, file_content, start, start + size)
+            yield from parts
+            if len(parts) < size:
+                return
+            start, size = start + size, size * 2
 
     @staticmethod
-    def _extract_text_with_docx(file_content):
-        """Extrai texto de arquivos DOCX."""
+    def _read_docx_range(file_content, start, stop):
+        """Executado nos processos do pool: trechos [start, stop) do XML do DOCX."""
+        return list(islice(TextExtractor._iter_docx_xml(file_content), start, stop))
+
+    @staticmethod
+    def _read_docx_with_python_docx(file_content):
         try:
             doc = Document(BytesIO(file_content))
-            return "\n".join(paragraph.text for paragraph in doc.paragraphs if paragraph.text.strip())
+            return [paragraph.text for paragraph in doc.paragraphs if paragraph.text.strip()]
         except Exception as e:
             logger.error(f"Erro ao usar docx para extrair texto: {e}")
-            return ""  
+            return []
+
+    @staticmethod
+    def _docx_parts(names):
+        """Partes com texto na ordem de leitura: cabeçalhos, corpo e rodapés."""
+        def numbered(prefix):
+            parts = [name for name in names if re.fullmatch(rf"word/{prefix}\d*\.xml", name)]
+            return sorted(parts, key=lambda name: int(re.sub(r"\D", "", name) or 0))
+        return numbered("header") + ["word/document.xml"] + numbered("footer")
+
+    @staticmethod
+    def _iter_docx_xml(file_content):
+        """Percorre os XMLs do DOCX com iterparse, gerando o texto de cada parágrafo e de cada linha
+        de tabela (células separadas por " | ") na ordem do documento.
+
+        Os elementos já processados são descartados, então a memória não cresce com o tamanho do arquivo.
+        Conteúdo alternativo (mc:Fallback) é ignorado para não duplicar caixas de texto.
+        """
+        with zipfile.ZipFile(BytesIO(file_content)) as package:
+            names = set(package.namelist())
+            for part in TextExtractor._docx_parts(names):
+                if part not in names:
+                    if part == "word/document.xml":
+                        raise KeyError(part)
+                    continue
+                with package.open(part) as xml:
+                    yield from TextExtractor._iter_docx_part(xml)
+
+    @staticmethod
+    def _iter_docx_part(xml):
+        paragraphs = []   # buffers dos parágrafos abertos (caixas de texto podem aninhar parágrafos)
+        cells = []        # parágrafos da célula aberta, por nível de tabela
+        rows = []         # células da linha aberta, por nível de tabela
+        parents = []
+        fallback_depth = 0
+
+        for event, element in ElementTree.iterparse(xml, events=("start", "end")):
+            tag = element.tag
+            if event == "start":
+                parents.append(element)
+                if tag == MC_FALLBACK:
+                    fallback_depth += 1
+                elif fallback_depth:
+                    continue
+                elif tag == W_P:
+                    paragraphs.append([])
+                elif tag == W_TR:
+                    rows.append([])
+                elif tag == W_TC:
+                    cells.append([])
+                continue
+
+            parents.pop()
+            if tag == MC_FALLBACK:
+                fallback_depth -= 1
+            elif fallback_depth:
+                pass
+            elif tag == W_T and paragraphs:
+                paragraphs[-1].append(element.text or "")
+            elif tag in DOCX_SPECIAL_CHARS and paragraphs and parents[-1].tag == W_R:
+                paragraphs[-1].append(DOCX_SPECIAL_CHARS[tag])
+            elif tag == W_P:
+                text = "".join(paragraphs.pop())
+                if cells:
+                    if text.strip():
+                        cells[-1].append(text)
+                elif text.strip():
+                    yield text
+            elif tag == W_TC:
+                rows[-1].append(" ".join(cells.pop()))
+            elif tag == W_TR:
+                row = " | ".join(cell for cell in rows.pop() if cell.strip())
+                if cells:
+                    if row:
+                        cells[-1].append(row)  # tabela aninhada: a linha vira texto da célula externa
+                elif row:
+                    yield row
+
+            # descarta o elemento processado (e a referência do pai) para manter a memória constante
+            if parents and tag in (W_P, W_TBL, W_TR, W_TC, W_SDT):
+                element.clear()
+                parents[-1].remove(element)
+
+
+extraction_cache = ExtractionCache(
+    directory=Config.EXTRACTION_CACHE_DIR,
+    disk_max_bytes=Config.EXTRACTION_CACHE_MAX_BYTES,
+    memory_max_bytes=Config.EXTRACTION_CACHE_MEMORY_BYTES,
+    version=f"{TextExtractor.VERSION}:{Config.PDF_EXTRACTION_ENGINES}",
+    encryption_key=Config.ENCRYPTION_KEY
+)
@@ -0,0 +1,73 @@
+import logging
+import signal
+import threading
+import click
+from app.config.config import Config
+
+logger = logging.getLogger(__name__)
+
+class ReviewWorkerPool:
+    """Pool de threads que consome a fila avaliacao_jobs fora do ciclo HTTP."""
+
+    def __init__(self, app, concurrency=None, poll_interval=None):
+        self.app = app
+        self.concurrency = concurrency or Config.REVIEW_WORKERS
+        self.poll_interval = poll_interval or Config.REVIEW_JOB_POLL_INTERVAL
+        self._stop_event = threading.Event()
+        self._threads = []
+
+    def start(self):
+        for index in range(self.concurrency):
+            thread = threading.Thread(target=self._run, name=f"review-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"{self.concurrency} workers de avaliação iniciados.")
+
+    def request_stop(self):
+        self._stop_event.set()
+
+    def stop(self):
+        self.request_stop()
+        for thread in self._threads:
+            thread.join()
+        logger.info("Workers de avaliação finalizados.")
+
+    def wait(self):
+        while not self._stop_event.is_set():
+            self._stop_event.wait(1)
+
+    def _run(self):
+        from app.services.avaliacao_job_service import ReviewJobService
+
+        while not self._stop_event.is_set():
+            try:
+                # um app context (e portanto uma sessão do SQLAlchemy) por job
+                with self.app.app_context():
+                    processed = ReviewJobService().process_next()
+            except Exception as e:
+                logger.error(f"Erro inesperado no worker de avaliação: {e}", exc_info=True)
+                processed = False
+
+            if not processed:
+                self._stop_event.wait(self.poll_interval)
+
+
+def init_review_worker(app):
+    """Registra o comando `flask review-worker` para processar a fila de avaliações."""
+
+    @app.cli.command("review-worker")
+    @click.option("--concurrency", type=int, default=None, help="Número de jobs processados em paralelo.")
+    @click.option("--poll-interval", type=float, default=None, help="Segundos de espera quando a fila está vazia.")
+    def review_worker(concurrency, poll_interval):
+        pool = ReviewWorkerPool(app, concurrency, poll_interval)
+
+        def _shutdown(signum, frame):
+            logger.info("Sinal de parada recebido, aguardando jobs em andamento...")
+            pool.request_stop()
+
+        signal.signal(signal.SIGINT, _shutdown)
+        signal.signal(signal.SIGTERM, _shutdown)
+
+        pool.start()
+        pool.wait()
+        pool.stop()
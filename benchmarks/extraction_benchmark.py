@@ -0,0 +1,386 @@
+"""Benchmark reprodutível da extração de texto e da validação de documentos.
+
+Gera localmente um corpus sintético de PDFs e DOCX (tamanhos, tabelas e CPF/CNPJ válidos
+controlados por semente) e mede, para cada mecanismo de extração e para a varredura de dados
+sensíveis, a latência (p50/p95/máx), a vazão e o pico de memória (RSS). Cada caso roda em um
+processo novo, para que o pico de RSS de um não contamine o outro, e com o cache de extração
+desativado. O resultado é um JSON comparável entre commits:
+
+    python -m benchmarks.extraction_benchmark --output resultados.json
+    python -m benchmarks.extraction_benchmark --sizes 1 10 --repeat 1 --engines pymupdf extrator
+    python -m benchmarks.extraction_benchmark --compare base.json --output atual.json
+    python -m benchmarks.extraction_benchmark --check-docx
+
+Os casos de validação importam o FileUtils e usam as mesmas variáveis de ambiente da API (.env);
+o armazenamento não é acessado, então não precisam de credenciais do Firebase.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+SIZES = (1, 10, 50, 150, 300)
+PDF_ENGINES = ("pymupdf", "pdfplumber", "pypdf2", "extrator")
+DOCX_ENGINES = ("extrator", "python-docx")
+SCAN_CASES = ("varredura", "validacao")
+PARAGRAPHS_PER_PAGE = 6
+WORDS = (
+    "projeto inovação tecnológica pesquisa desenvolvimento resultado mercado processo produto "
+    "viabilidade originalidade impacto risco escalabilidade evidência objetivo aplicação empresa "
+    "cronograma orçamento equipe protótipo validação cliente receita patente indicador meta"
+).split()
+
+
+def _check_digits(digits, weights):
+    total = sum(int(d) * w for d, w in zip(digits, weights))
+    rest = total % 11
+    return "0" if rest < 2 else str(11 - rest)
+
+
+def gerar_cpf(rng):
+    digits = "".join(str(rng.randint(0, 9)) for _ in range(9))
+    digits += _check_digits(digits, range(10, 1, -1))
+    digits += _check_digits(digits, range(11, 1, -1))
+    return f"{digits[:3]}.{digits[3:6]}.{digits[6:9]}-{digits[9:]}"
+
+
+def gerar_cnpj(rng):
+    digits = "".join(str(rng.randint(0, 9)) for _ in range(8)) + "0001"
+    digits += _check_digits(digits, (5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2))
+    digits += _check_digits(digits, (6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2))
+    return f"{digits[:2]}.{digits[2:5]}.{digits[5:8]}/{digits[8:12]}-{digits[12:]}"
+
+
+def _paragraph(rng):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 70))).capitalize() + "."
+
+
+def _table_rows(rng, page, cnpj=None):
+    rows = [["Item", "Fornecedor", "Valor (R$)"]]
+    for index in range(3):
+        fornecedor = cnpj if cnpj and index == 0 else f"Fornecedor {page}-{index}"
+        rows.append([f"{rng.choice(WORDS)} {page}.{index}", fornecedor, f"{rng.randint(1000, 99999)},00"])
+    return rows
+
+
+def _document_content(pages, tables, sensitive, seed):
+    """Conteúdo de cada página: parágrafos e, opcionalmente, uma tabela de orçamento.
+
+    Os dados sensíveis ficam na última página (CPF no texto, CNPJ na tabela quando houver),
+    o pior caso para a validação, que precisa ler o documento inteiro antes de encontrá-los.
+    """
+    rng = random.Random(seed)
+    content = []
+    for page in range(pages):
+        last = page == pages - 1
+        paragraphs = [_paragraph(rng) for _ in range(PARAGRAPHS_PER_PAGE)]
+        cnpj = gerar_cnpj(rng) if sensitive and last else None
+        if sensitive and last:
+            paragraphs.append(f"Responsável técnico: CPF {gerar_cpf(rng)}.")
+            if not tables:
+                paragraphs.append(f"Empresa proponente: CNPJ {cnpj}.")
+        content.append((paragraphs, _table_rows(rng, page + 1, cnpj) if tables else None))
+    return content
+
+
+def _write_pdf(path, content):
+    import pymupdf
+
+    doc = pymupdf.open()
+    for paragraphs, rows in content:
+        page = doc.new_page()  # A4 por padrão no PyMuPDF (595 x 842 pt)
+        y = 60
+        for paragraph in paragraphs:
+            page.insert_textbox(pymupdf.Rect(50, y, 545, y + 95), paragraph, fontsize=10, fontname="helv")
+            y += 95
+        for row in rows or ():
+            for column, cell in enumerate(row):
+                page.draw_rect(pymupdf.Rect(50 + column * 165, y, 215 + column * 165, y + 18), width=0.5)
+                page.insert_text((54 + column * 165, y + 13), cell, fontsize=9, fontname="helv")
+            y += 18
+    doc.save(path)
+    doc.close()
+
+
+def _write_docx(path, content):
+    from docx import Document
+    from docx.enum.text import WD_BREAK
+
+    doc = Document()
+    for index, (paragraphs, rows) in enumerate(content):
+        for paragraph in paragraphs:
+            doc.add_paragraph(paragraph)
+        if rows:
+            table = doc.add_table(rows=len(rows), cols=len(rows[0]))
+            for r, row in enumerate(rows):
+                for c, cell in enumerate(row):
+                    table.cell(r, c).text = cell
+        if index < len(content) - 1:
+            doc.add_paragraph().add_run().add_break(WD_BREAK.PAGE)
+    doc.save(path)
+
+
+def _docx_parity_documents():
+    """Documentos pequenos com a marcação de parágrafo que o extrator precisa tratar como o python-docx."""
+    from docx import Document
+    from docx.shared import Inches
+
+    documents = {}
+    doc = Document()
+    doc.add_paragraph("Nome").paragraph_format.tab_stops.add_tab_stop(Inches(1))
+    paragraph = doc.add_paragraph("Valor:\t10")
+    paragraph.paragraph_format.tab_stops.add_tab_stop(Inches(2))
+    paragraph.paragraph_format.tab_stops.add_tab_stop(Inches(3))
+    documents["paradas_de_tabulacao"] = doc
+
+    doc = Document()
+    run = doc.add_paragraph().add_run("Nome:\tvalor")
+    run.add_break()
+    run.add_text("segunda linha")
+    documents["tabulacao_e_quebra_de_linha"] = doc
+    return documents
+
+
+def verificar_docx():
+    """Compara o texto extraído de cada documento de _docx_parity_documents com o Paragraph.text do
+    python-docx e retorna as divergências como {documento: (esperado, extraído)}."""
+    from io import BytesIO
+    from docx import Document
+    from app.utils.text_extractor import TextExtractor
+
+    divergences = {}
+    for name, doc in _docx_parity_documents().items():
+        buffer = BytesIO()
+        doc.save(buffer)
+        expected = "\n".join(p.text for p in Document(BytesIO(buffer.getvalue())).paragraphs if p.text.strip())
+        extracted = TextExtractor.extract_text(buffer.getvalue(), "docx")
+        if extracted != expected:
+            divergences[name] = (expected, extracted)
+    return divergences
+
+
+def gerar_corpus(directory, sizes, seed):
+    """Gera (ou reaproveita, se já existir) o corpus e retorna a descrição de cada documento."""
+    os.makedirs(directory, exist_ok=True)
+    documents = []
+    for fmt in ("pdf", "docx"):
+        for pages in sizes:
+            for tables in (False, True):
+                for sensitive in (False, True):
+                    name = f"{fmt}-{pages:03d}p-{'tabelas' if tables else 'texto'}-{'sensivel' if sensitive else 'limpo'}"
+                    path = os.path.join(directory, f"{name}-s{seed}.{fmt}")
+                    if not os.path.exists(path):
+                        content = _document_content(pages, tables, sensitive, f"{seed}:{name}")
+                        (_write_pdf if fmt == "pdf" else _write_docx)(path, content)
+                    documents.append({
+                        "documento": name, "formato": fmt, "paginas": pages, "tabelas": tables,
+                        "dados_sensiveis": sensitive, "caminho": path, "bytes": os.path.getsize(path)
+                    })
+    return documents
+
+
+def _peak_rss_mb():
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _percentile(values, fraction):
+    """Percentil pelo método do posto mais próximo (sem interpolação)."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def _operation(case, file_content):
+    """Função medida no caso (preparações, como a extração do texto a varrer, ficam fora da medição)."""
+    from app.utils.text_extractor import TextExtractor
+
+    engine, fmt = case["motor"], case["formato"]
+    if engine == "extrator":
+        return lambda: TextExtractor.extract_text(file_content, fmt)
+    if engine == "python-docx":
+        from io import BytesIO
+        from docx import Document
+
+        def legacy_docx():
+            doc = Document(BytesIO(file_content))
+            parts = [p.text for p in doc.paragraphs if p.text.strip()]
+            parts += [cell.text for table in doc.tables for row in table.rows for cell in row.cells]
+            return "\n".join(parts)
+        return legacy_docx
+    if engine in ("varredura", "validacao"):
+        from io import BytesIO
+        from app.erros.custom_errors import ValidationError
+        from app.utils.file_utils import FileUtils
+
+        file_utils = FileUtils()
+        if engine == "varredura":
+            text = TextExtractor.extract_text(file_content, fmt)
+            case["caracteres"] = len(text)
+            return lambda: file_utils._contains_sensitive_data(text)
+
+        def validate():
+            try:
+                file_utils.extract_valid_text(BytesIO(file_content), f"documento.{fmt}")
+                return "aceito"
+            except ValidationError as e:
+                return f"rejeitado: {e.message[:60]}"
+        return validate
+    iterator = getattr(TextExtractor, f"_iter_pages_with_{engine}")
+    return lambda: "".join(iterator(file_content))
+
+
+def run_case(case):
+    """Executado no processo filho: mede um caso e imprime o resultado em JSON."""
+    with open(case["caminho"], "rb") as document:
+        file_content = document.read()
+    result = dict(case)
+    try:
+        operation = _operation(result, file_content)
+        rss_before = _peak_rss_mb()
+        output = operation()  # aquecimento: importações tardias, fontes, caches do sistema
+        timings = []
+        for _ in range(case["repeticoes"]):
+            start = time.perf_counter()
+            output = operation()
+            timings.append(time.perf_counter() - start)
+        mean = sum(timings) / len(timings)
+        result.update({
+            "latencia_ms": {
+                "p50": round(_percentile(timings, 0.50) * 1000, 2),
+                "p95": round(_percentile(timings, 0.95) * 1000, 2),
+                "max": round(max(timings) * 1000, 2),
+                "media": round(mean * 1000, 2)
+            },
+            "paginas_por_segundo": round(case["paginas"] / mean, 1) if mean else None,
+            "mb_por_segundo": round(case["bytes"] / mean / 1e6, 2) if mean else None,
+            "pico_rss_mb": _peak_rss_mb(),
+            "pico_rss_incremento_mb": round(_peak_rss_mb() - rss_before, 1)
+        })
+        if case["motor"] == "validacao":
+            result["resultado"] = output
+        elif case["motor"] == "varredura":
+            result["dados_encontrados"] = sorted(output)
+            result["caracteres_por_segundo"] = round(result["caracteres"] / mean) if mean else None
+        else:
+            result["caracteres"] = len(output)
+    except Exception as e:
+        result["erro"] = f"{type(e).__name__}: {e}"
+    print(json.dumps(result, ensure_ascii=False))
+
+
+def _spawn_case(case, timeout):
+    env = dict(os.environ, EXTRACTION_CACHE_MAX_BYTES="0", EXTRACTION_CACHE_MEMORY_BYTES="0")
+    try:
+        completed = subprocess.run(
+            [sys.executable, "-m", "benchmarks.extraction_benchmark", "--run-case", json.dumps(case)],
+            capture_output=True, text=True, timeout=timeout, env=env
+        )
+    except subprocess.TimeoutExpired:
+        return dict(case, erro=f"tempo limite de {timeout}s excedido")
+    lines = [line for line in completed.stdout.splitlines() if line.startswith("{")]
+    if completed.returncode != 0 or not lines:
+        return dict(case, erro=(completed.stderr.strip().splitlines() or ["falha sem saída"])[-1])
+    return json.loads(lines[-1])
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _case_id(result):
+    return f"{result['documento']}:{result['motor']}"
+
+
+def compare(base_path, results):
+    """Imprime a razão atual/base da latência p50 e do pico de RSS para os casos em comum."""
+    with open(base_path, encoding="utf-8") as base_file:
+        base = {_case_id(r): r for r in json.load(base_file)["resultados"] if "erro" not in r}
+    print(f"\n{'caso':<52} {'p50 base':>10} {'p50 atual':>10} {'razão':>7} {'RSS razão':>10}")
+    for result in results:
+        previous = base.get(_case_id(result))
+        if not previous or "erro" in result:
+            continue
+        p50, p50_base = result["latencia_ms"]["p50"], previous["latencia_ms"]["p50"]
+        rss_ratio = result["pico_rss_mb"] / previous["pico_rss_mb"] if previous["pico_rss_mb"] else 0
+        print(f"{_case_id(result):<52} {p50_base:>10.1f} {p50:>10.1f} {p50 / p50_base if p50_base else 0:>7.2f} {rss_ratio:>10.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark da extração de texto e da validação de documentos.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="páginas por documento")
+    parser.add_argument("--engines", nargs="+", default=None,
+                        help=f"casos a medir (padrão: todos): {', '.join(sorted(set(PDF_ENGINES + DOCX_ENGINES + SCAN_CASES)))}")
+    parser.add_argument("--formats", nargs="+", default=["pdf", "docx"], choices=["pdf", "docx"])
+    parser.add_argument("--repeat", type=int, default=3, help="medições por caso, após um aquecimento")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--corpus-dir", default=os.path.join(tempfile.gettempdir(), "softex-benchmark-corpus"))
+    parser.add_argument("--timeout", type=int, default=900, help="segundos por caso")
+    parser.add_argument("--output", default=None, help="arquivo JSON de saída (padrão: benchmark-<commit>.json)")
+    parser.add_argument("--compare", default=None, help="JSON de uma execução anterior para comparação")
+    parser.add_argument("--check-docx", action="store_true", help="só confere o texto dos DOCX com o python-docx")
+    parser.add_argument("--run-case", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.check_docx:
+        divergences = verificar_docx()
+        for name, (expected, extracted) in divergences.items():
+            print(f"{name}: esperado {expected!r}, extraído {extracted!r}")
+        print("DOCX: texto igual ao do python-docx" if not divergences else f"DOCX: {len(divergences)} divergência(s)")
+        sys.exit(1 if divergences else 0)
+
+    if args.run_case:
+        run_case(json.loads(args.run_case))
+        return
+
+    documents = [d for d in gerar_corpus(args.corpus_dir, args.sizes, args.seed) if d["formato"] in args.formats]
+    cases = []
+    for document in documents:
+        engines = (PDF_ENGINES if document["formato"] == "pdf" else DOCX_ENGINES) + SCAN_CASES
+        for engine in engines:
+            if args.engines is None or engine in args.engines:
+                cases.append(dict(document, motor=engine, repeticoes=args.repeat))
+
+    results = []
+    for index, case in enumerate(cases, start=1):
+        result = _spawn_case(case, args.timeout)
+        results.append(result)
+        if "erro" in result:
+            resumo = f"ERRO {result['erro']}"
+        else:
+            resumo = f"p50 {result['latencia_ms']['p50']:.1f} ms, {result['paginas_por_segundo']} pág/s, RSS {result['pico_rss_mb']} MB"
+        print(f"[{index}/{len(cases)}] {_case_id(result)}: {resumo}", flush=True)
+
+    commit = _git_commit()
+    report = {
+        "commit": commit,
+        "data": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "parametros": {"sizes": args.sizes, "repeat": args.repeat, "seed": args.seed},
+        "resultados": results
+    }
+    output = args.output or f"benchmark-{commit or 'local'}.json"
+    with open(output, "w", encoding="utf-8") as output_file:
+        json.dump(report, output_file, ensure_ascii=False, indent=2)
+    print(f"Resultados gravados em {output}")
+
+    if args.compare:
+        compare(args.compare, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""Compara a varredura de dados sensíveis atual (SensitiveDataScanner) com a implementação anterior
+(texto normalizado, uma chamada de re.findall por categoria e validação com validate_docbr).
+
+Os textos sintéticos têm o tamanho máximo aceito no upload (25 mil caracteres) e cobrem os casos
+típicos: texto limpo, texto com muitos números (orçamentos, datas, telefones) e texto com CPF, CNPJ
+e e-mail. Além da latência, confere que as duas implementações encontram as mesmas categorias, nesses
+textos e em textos curtos que juntam rótulos, documentos e e-mails (ex.: um CPF logo depois de
+"Inscrição Estadual", ou colado a um e-mail). Nos curtos, a implementação atual pode encontrar a mais
+um CNPJ que a anterior perdia (o padrão antigo aceitava espaços no meio e engolia um número vizinho),
+mas nunca a menos.
+
+    python -m benchmarks.sensitive_scanner_benchmark --repeat 200 --output scanner.json
+"""
+import argparse
+import json
+import random
+import re
+import time
+from validate_docbr import CPF, CNPJ
+from app.utils.sensitive_scanner import SensitiveDataScanner, validate_cpfs, is_valid_cpf
+from benchmarks.extraction_benchmark import WORDS, gerar_cpf, gerar_cnpj, _percentile
+
+TEXT_SIZE = 25000
+PARITY_CASES = (
+    "Inscrição Estadual\n459.246.357-91",
+    "Inscrição Municipal 48314618144",
+    "inscrição estadual: 529.982.247-25",
+    "Inscrição Estadual529.982.247-25a@b.com",
+    "CNPJ:11.222.333/0001-81a@b.com",
+    "11.222.333/0001-81.contato@empresa.com.br",
+    "529.982.247-25.contato@empresa.com.br",
+    "contato@empresa.com.CPF52998224725",
+    "x.y@emp.com.br.Inscrição Estadual 123456",
+)
+PARITY_TOKENS = ("Inscrição Estadual", "inscrição municipal", "CNPJ", "CPF", "cpf:", "CNPJ:", "a@b.com",
+                 "x.y@emp.com.br", "@", "contato", ":", "-", ".", "/", " ", "\n", "\t")
+
+LEGACY_PATTERNS = {
+    "CNPJ": r"(?i)\b(?:CNPJ[: ]*)?(\d{2}[.\s]?\d{3}[.\s]?\d{3}[\/\s]?\d{4}[-.\s]?\d{2})\b",
+    "CPF": r"(?i)\b(?:cpf[\s:.]*)?(\d{3}[\s.-]?\d{3}[\s.-]?\d{3}[\s.-]?\d{2})\b",
+    "Email": r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}",
+    "Inscrição Estadual": r"\binscrição estadual[: ]?\d+\b",
+    "Inscrição Municipal": r"\binscrição municipal[: ]?\d+\b",
+}
+
+
+def legacy_scan(text, cpf_validator=CPF(), cnpj_validator=CNPJ()):
+    """Implementação anterior de FileUtils._contains_sensitive_data, mantida como referência."""
+    text = re.sub(r"\s+", " ", text).strip().lower()
+    sensitive_data = {}
+    for label, pattern in LEGACY_PATTERNS.items():
+        matches = re.findall(pattern, text, flags=re.IGNORECASE)
+        if label == "CPF":
+            matches = [cpf for cpf in matches if cpf_validator.validate(cpf)]
+        elif label == "CNPJ":
+            matches = [cnpj for cnpj in matches if cnpj_validator.validate(cnpj)]
+        if matches:
+            sensitive_data[label] = matches
+    return sensitive_data
+
+
+def _text(rng, kind):
+    parts, size = [], 0
+    while size < TEXT_SIZE:
+        roll = rng.random()
+        if kind == "numerico" and roll < 0.25:
+            token = rng.choice([
+                f"R$ {rng.randint(1000, 999999)},00", f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2024",
+                f"(11) 9{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}", str(rng.randint(10 ** 10, 10 ** 11 - 1)),
+                str(rng.randint(10 ** 13, 10 ** 14 - 1))
+            ])
+        elif kind == "sensivel" and roll < 0.01:
+            token = rng.choice([f"CPF {gerar_cpf(rng)}", f"CNPJ: {gerar_cnpj(rng)}", "contato.projeto@empresa.com.br",
+                                f"Inscrição Estadual: {rng.randint(10 ** 8, 10 ** 9)}"])
+        else:
+            token = rng.choice(WORDS)
+        parts.append(token)
+        size += len(token) + 1
+    return " ".join(parts)[:TEXT_SIZE]
+
+
+def _parity_text(rng):
+    parts = []
+    for _ in range(rng.randint(1, 8)):
+        cpf, cnpj = gerar_cpf(rng), gerar_cnpj(rng)
+        parts.append(rng.choice((cpf, re.sub(r"\D", "", cpf), cnpj, re.sub(r"\D", "", cnpj),
+                                 str(rng.randint(1, 10 ** 12)), *PARITY_TOKENS)))
+        parts.append(rng.choice(("", "", " ", "\n", ":", ": ")))
+    return "".join(parts)
+
+
+def _check_parity(scanner, seed, count):
+    """Textos em que a implementação atual deixa de encontrar uma categoria que a anterior encontrava."""
+    rng = random.Random(f"{seed}:paridade")
+    texts = [*PARITY_CASES, *(_parity_text(rng) for _ in range(count))]
+    missing = [text for text in texts if not set(legacy_scan(text)) <= set(scanner.scan(text))]
+    return {"textos": len(texts), "categorias_perdidas": len(missing), "exemplos": missing[:10]}
+
+
+def _measure(function, text, repeat):
+    function(text)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(text)
+        timings.append(time.perf_counter() - start)
+    return {
+        "p50_ms": round(_percentile(timings, 0.5) * 1000, 3),
+        "p95_ms": round(_percentile(timings, 0.95) * 1000, 3),
+        "media_ms": round(sum(timings) / len(timings) * 1000, 3)
+    }
+
+
+def _measure_checksums(repeat, count=10000):
+    rng = random.Random(7)
+    candidates = [gerar_cpf(rng) if i % 2 else f"{rng.randint(10 ** 10, 10 ** 11 - 1)}" for i in range(count)]
+    validator = CPF()
+    result = {}
+    for name, function in (
+        ("validate_docbr", lambda: [validator.validate(c) for c in candidates]),
+        ("aritmetica", lambda: [is_valid_cpf(c) for c in candidates]),
+        ("numpy_lote", lambda: validate_cpfs(candidates)),
+    ):
+        start = time.perf_counter()
+        for _ in range(max(1, repeat // 20)):
+            function()
+        result[name] = round((time.perf_counter() - start) / max(1, repeat // 20) * 1000, 3)
+    return {"candidatos": count, "ms_por_lote": result}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark da varredura de dados sensíveis.")
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--parity", type=int, default=20000, help="textos curtos gerados para a paridade")
+    parser.add_argument("--output", default=None, help="arquivo JSON de saída")
+    args = parser.parse_args(argv)
+
+    scanner = SensitiveDataScanner()
+    results = []
+    for kind in ("limpo", "numerico", "sensivel"):
+        text = _text(random.Random(f"{args.seed}:{kind}"), kind)
+        legacy, current = legacy_scan(text), scanner.scan(text)
+        antes = _measure(legacy_scan, text, args.repeat)
+        depois = _measure(scanner.scan, text, args.repeat)
+        results.append({
+            "texto": kind,
+            "caracteres": len(text),
+            "anterior": antes,
+            "atual": depois,
+            "aceleracao_p50": round(antes["p50_ms"] / depois["p50_ms"], 2) if depois["p50_ms"] else None,
+            "categorias_anterior": sorted(legacy),
+            "categorias_atual": sorted(current),
+            "mesmas_categorias": sorted(legacy) == sorted(current)
+        })
+        print(f"{kind:<10} anterior {antes['p50_ms']:8.3f} ms  atual {depois['p50_ms']:8.3f} ms  "
+              f"{results[-1]['aceleracao_p50']}x  categorias {'ok' if results[-1]['mesmas_categorias'] else 'DIFERENTES'}")
+
+    parity = _check_parity(scanner, args.seed, args.parity)
+    print(f"paridade: {parity['categorias_perdidas']} de {parity['textos']} textos com categorias perdidas")
+    for text in parity["exemplos"]:
+        print(f"  {text!r}")
+    checksums = _measure_checksums(args.repeat)
+    print(f"dígitos verificadores ({checksums['candidatos']} CPFs): {checksums['ms_por_lote']}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump({"varredura": results, "paridade": parity, "digitos_verificadores": checksums}, output_file,
+                      ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()